@@ -0,0 +1,153 @@
+"""Statistical analysis of traces of observables: equilibration, autocorrelation and effective samples."""
+from math import sqrt
+
+import numpy as np
+
+WINDOW_FACTOR = 6.0         # the window of summed autocorrelations is at least WINDOW_FACTOR*tau_int
+CHECK_GROWTH = 1.25         # a monitor analyses its traces whenever they grow by that factor
+MAX_BLOCKS = 1 << 17        # blocks kept by a monitor, pairs of blocks are merged when it is full
+
+
+def autocorrelation(series: np.ndarray) -> np.ndarray:
+    """Returns the normalized autocorrelation function rho(t) of the series, computed by FFT."""
+    deviations = np.asarray(series, dtype=np.float64) - np.mean(series)
+    length = len(deviations)
+    size = 1 << (2*length - 1).bit_length()             # zero padding against the circular correlation
+    spectrum = np.fft.rfft(deviations, size)
+    correlation = np.fft.irfft(spectrum*np.conj(spectrum), size)[:length]
+    if correlation[0] <= 0:
+        return np.zeros(length)
+    return correlation/correlation[0]
+
+
+def integrated_time(series: np.ndarray) -> float:
+    """
+    Returns the integrated autocorrelation time tau_int = 1/2 + sum of rho(t) over 1 <= t <= W of the series,
+    with the automatic window of Sokal: the least W >= WINDOW_FACTOR*tau_int(W).
+    Uncorrelated samples give tau_int = 1/2, and a constant series too.
+    """
+    if len(series) < 2:
+        return 0.5
+    rho = autocorrelation(series)
+    if not rho[0]:
+        return 0.5
+    taus = np.cumsum(rho) - 0.5                         # tau_int(W) for every window W
+    windows = np.flatnonzero(np.arange(0, len(taus)) >= WINDOW_FACTOR*taus)
+    return max(0.5, float(taus[windows[0]] if len(windows) else taus[-1]))
+
+
+def error(series: np.ndarray, tau: float | None = None) -> float:
+    """Returns the standard error of the mean of correlated samples sqrt(2*tau_int*var/n)."""
+    if tau is None:
+        tau = integrated_time(series)
+    return sqrt(2*tau*float(np.var(series))/len(series)) if len(series) else float('nan')
+
+
+def equilibration(series: np.ndarray, candidates: int = 20, z: float = 2.0) -> int | None:
+    """
+    Returns the first sample of the equilibrated part of the series, or None if it is not equilibrated.
+
+    Sequential tests of means: for the starts 0, n/(2*candidates), ... up to n/2, the mean of the first 20%
+    of the rest of the series is compared with the mean of its last 50% (Geweke), and the first start whose
+    means differ by at most z standard errors is returned. Both errors use tau_int of the last 50%,
+    as a drift of the first part would inflate its own tau_int.
+    """
+    series = np.asarray(series, dtype=np.float64)
+    length = len(series)
+    for start in range(0, length//2 + 1, max(1, length//(2*candidates))):
+        rest = series[start:]
+        head, tail = rest[:len(rest)//5], rest[len(rest)//2:]
+        if len(head) < 2:
+            break
+        tau = integrated_time(tail)
+        if abs(np.mean(head) - np.mean(tail)) <= z*sqrt(error(head, tau)**2 + error(tail, tau)**2):
+            return start
+    return None
+
+
+def monitor(effective_samples: int, first_check: int = 1000) -> dict[str, object]:
+    """
+    Returns an empty monitor of traces of |m| and e, stopping a run at the given number of effective samples.
+
+    Traces are analysed (see the function analyse) when they reach first_check samples
+    and then whenever they grow by CHECK_GROWTH, so the analyses cost O(n log n) in total.
+    The memory is bounded: traces are kept as means of blocks of MCSs, a block of a single MCS until MAX_BLOCKS
+    blocks are filled, then neighbouring blocks are merged and blocks hold twice as many MCSs.
+    """
+    return {'effective_samples': effective_samples,
+            'next_check': first_check,
+            'samples': 0,                               # MCSs observed
+            'block': 1,                                 # MCSs in a block
+            'blocks': 0,                                # full blocks in the traces
+            'traces': np.zeros((4, MAX_BLOCKS)),        # means of |m|, e, m^2 and e^2 in blocks
+            'partial': np.zeros(4),                     # sums of the block being filled
+            'result': None}                             # the last analysis
+
+
+def observe(monitor: dict[str, object], magnetization: float, energy: float) -> bool:
+    """Adds a sample of magnetization m and energy per spin e, returns whether the effective samples are collected."""
+    partial = monitor['partial']
+    partial += (abs(magnetization), energy, magnetization*magnetization, energy*energy)
+    monitor['samples'] += 1
+    if monitor['samples'] % monitor['block'] == 0:
+        traces = monitor['traces']
+        traces[:, monitor['blocks']] = partial/monitor['block']
+        partial[:] = 0.0
+        monitor['blocks'] += 1
+        if monitor['blocks'] == MAX_BLOCKS:
+            traces[:, :MAX_BLOCKS//2] = (traces[:, 0::2] + traces[:, 1::2])/2
+            monitor['blocks'] = MAX_BLOCKS//2
+            monitor['block'] *= 2
+    if monitor['samples'] < monitor['next_check']:
+        return False
+
+    monitor['next_check'] = int(monitor['samples']*CHECK_GROWTH) + 1
+    monitor['result'] = analyse(monitor)
+    return monitor['result']['N_eff'] >= monitor['effective_samples']
+
+
+def analyse(monitor: dict[str, object]) -> dict[str, float]:
+    """
+    Returns the analysis of the traces of the monitor (the full blocks).
+
+    Blocks of several MCSs are analysed as samples, and tau_int of their means is converted to MCSs
+    by the variance of single MCSs: tau_int = block*tau_int(blocks)*var(blocks)/var(MCSs), so the errors
+    and N_eff do not depend on the size of blocks.
+
+    ### Returns
+    dict[str, float]
+        "equilibrated at" - the first equilibrated MCS (the later one of |m| and e), nan if not equilibrated,
+        "tau_int(|m|)", "tau_int(e)" - integrated autocorrelation times [MCS] of the equilibrated part,
+        "N_eff" - number of effectively independent samples n/(2*max tau_int), 0 if not equilibrated,
+        "<|m|>", "d<|m|>", "<e>", "d<e>" - means of the equilibrated part and their standard errors.
+    """
+    block = monitor['block']
+    m_abs, e, m2, e2 = monitor['traces'][:, :monitor['blocks']]
+    starts = [equilibration(m_abs), equilibration(e)]
+    if None in starts:
+        return dict.fromkeys(['equilibrated at', 'tau_int(|m|)', 'tau_int(e)', 'N_eff',
+                              '<|m|>', 'd<|m|>', '<e>', 'd<e>'], float('nan')) | {'N_eff': 0.0}
+
+    start = max(starts)
+    m_abs, e = m_abs[start:], e[start:]
+    tau_m, tau_e = integrated_time(m_abs), integrated_time(e)
+    error_m, error_e = error(m_abs, tau_m), error(e, tau_e)
+    if block > 1:
+        tau_m = _in_mcss(tau_m, m_abs, m2[start:], block)
+        tau_e = _in_mcss(tau_e, e, e2[start:], block)
+    return {'equilibrated at': start*block + 1,          # traces start after the first MCS
+            'tau_int(|m|)': tau_m,
+            'tau_int(e)': tau_e,
+            'N_eff': len(e)*block/(2*max(tau_m, tau_e)),
+            '<|m|>': float(np.mean(m_abs)),
+            'd<|m|>': error_m,
+            '<e>': float(np.mean(e)),
+            'd<e>': error_e}
+
+
+def _in_mcss(tau: float, means: np.ndarray, squares: np.ndarray, block: int) -> float:
+    """Returns tau_int [MCS] of a trace given tau_int of its means of blocks and the means of squares of its MCSs."""
+    variance = float(np.mean(squares)) - float(np.mean(means))**2     # of single MCSs
+    if variance <= 0:
+        return 0.5
+    return max(0.5, block*tau*float(np.var(means))/variance)
@@ -0,0 +1,347 @@
+"""ABOUT
+The program benchmarks the engines of the Monte Carlo method in 2D Ising model and checks their results
+against the exact solution of Onsager.
+
+COMMAND LINE INTERFACE
+py benchmark.py [-bl|--baseline <path>] [-e|--engine <string>[,<string>...]] [-h|--external-magnetic-field <grid>] [--help] [-K|--K|--steps <int>] [-L|--length <grid>] [-s|--seed <int>] [-sm|--save-magnetization [<path>]] [-T*|--temperature-reduced <grid>] [-w|--workers <int>]
+
+MANUAL
+A <grid> of values is given as in sweep.py: a range <start>:<stop>:<step> with both ends included,
+a list <value>,<value>,... or a single <value>.
+
+-bl <path>
+--baseline <path>
+    Compares the timings with the ones of a saved benchmark ".json", e.g. "benchmark_baseline.json",
+    and reports combinations slower than REGRESSION times their baseline. Only timings of the same K, workers
+    and compilation of 'jit' are compared, never the ones of 'jit' without Numba (the loops of 'python').
+    The baseline is a record of a single machine: when its Python, NumPy or number of CPUs differ, the speeds
+    are reported with a warning but do not count as regressions.
+
+-e <string>[,<string>...]
+--engine <string>[,<string>...]
+    Engines to benchmark: 'python', 'numpy', 'multispin', 'nfold', 'shared' and 'jit'.
+    The default is all of them.
+
+-h <grid>
+--external-magnetic-field <grid>
+    Values of an external magnetic field h of the timings.
+    The default is 0.0,0.1.
+
+--help
+    Prints that text, without executing the program.
+
+-K <int>
+--K <int>
+--steps <int>
+    Number of timed MCSs of every combination.
+    The default is 100.
+
+-L <grid>
+--length <grid>
+    Lengths L of the lattice LxL of the timings.
+    The default is 16,64.
+
+-s <int>
+--seed <int>
+    A seed for the random number generator.
+    The default is 255.
+
+-sm [<path>]
+--save-magnetization [<path>]
+    Saves the results in a given directory <path> as "benchmark (<n>).json".
+    The dafault is "./" (the path of this module).
+
+-T* <grid>
+--temperature-reduced <grid>
+    Reduced temperatures T* of the timings.
+    The default is 2.0,2.5.
+
+-w <int>
+--workers <int>
+    Number of processes of the 'shared' engine.
+    The default is the number of CPUs.
+
+Every combination of 'metropolis' and 'glauber', the engines, h, L and T* is timed over K MCSs after a warm-up MCS
+(which compiles the kernels of 'jit'), the median of REPEATS runs, and its wall time per MCS and spin-flip attempts per second (N per MCS of every
+system, the 64 replicas of 'multispin' included) are reported. Then every engine of both algorithms is checked
+at the points CHECK_POINTS of h = 0: the mean |m| (below T_c) and the mean energy per spin of configurations sampled
+every SEGMENT MCSs must agree with the exact values of the infinite lattice within CHECK_Z standard errors.
+The program exits with the status 1 when a check fails or a combination is slower than its baseline.
+"""
+import math
+import os
+import platform
+import time
+
+import numpy as np
+
+import analysis
+import engine_jit
+import engine_multispin
+import lattice
+import main
+import rng
+
+CRITICAL_TEMPERATURE = 2/math.log(1 + math.sqrt(2))     # T_c* of the square lattice
+CHECK_POINTS = [(32, 1.8), (32, 3.0)]                   # (L, T*) of the checks
+CHECK_MCSS = 3000                                       # MCSs of a check after its burn-in
+CHECK_BURN_IN = 500                                     # MCSs skipped by a check
+SEGMENT = 10                                            # MCSs between samples of a check
+CHECK_Z = 4.0                                           # allowed deviation from the exact value in standard errors
+REGRESSION = 0.5                                        # a combination slower than that part of its baseline regresses
+REPEATS = 5                                             # timed runs of a combination, the median one is reported
+KEY = ('algorithm', 'engine', 'h', 'L', 'T*', 'K', 'workers', 'numba')     # a combination of the timings
+MACHINE = ('python', 'numpy', 'cpus')                   # parameters of the machine of comparable timings
+
+
+def onsager_magnetization(reduced_temperature: float) -> float:
+    """Returns the exact spontaneous magnetization per spin of the infinite square lattice (0 above T_c)."""
+    if reduced_temperature >= CRITICAL_TEMPERATURE:
+        return 0.0
+    return (1 - math.sinh(2/reduced_temperature)**-4)**0.125
+
+
+def onsager_energy(reduced_temperature: float) -> float:
+    """
+    Returns the exact energy per spin [J] of the infinite square lattice without external magnetic field,
+    -coth(2K)*(1 + 2/pi*(2tanh(2K)^2 - 1)*K1(q)) of K = 1/T* and q = 2sinh(2K)/cosh(2K)^2, where the complete
+    elliptic integral of the first kind K1(q) = pi/(2*AGM(1, sqrt(1 - q^2))) is computed by the arithmetic-geometric mean.
+    """
+    coupling = 1/reduced_temperature
+    modulus = 2*math.sinh(2*coupling)/math.cosh(2*coupling)**2
+    arithmetic, geometric = 1.0, math.sqrt(max(0.0, 1 - modulus*modulus))
+    if not geometric:
+        return -1/math.tanh(2*coupling)                 # T_c, where the elliptic integral is multiplied by zero
+    while abs(arithmetic - geometric) > 1e-15*arithmetic:
+        arithmetic, geometric = (arithmetic + geometric)/2, math.sqrt(arithmetic*geometric)
+    elliptic = math.pi/(2*arithmetic)
+    return -1/math.tanh(2*coupling)*(1 + 2/math.pi*(2*math.tanh(2*coupling)**2 - 1)*elliptic)
+
+
+def configurations(engine: str, lattice_length: int, magnetization0: float, seed: int) -> list[list[list[int]]]:
+    """Returns the initial systems of the engine, all replicas of 'multispin' or a single one."""
+    return [main.initial_configuration(lattice_length, magnetization0, seed + replica)
+            for replica in range(0, engine_multispin.REPLICAS if engine == "multispin" else 1)]
+
+
+def timing(algorithm: str,
+           engine: str,
+           emf: float,
+           lattice_length: int,
+           red_temperature: float,
+           mcss: int,
+           seed: int,
+           workers: int
+          ) -> dict[str, object]:
+    """Returns the timing of K MCSs of the combination, the median of REPEATS runs after a warm-up MCS."""
+    beta = 1/red_temperature
+    configs = configurations(engine, lattice_length, 0.0, seed)
+    main.evolve([[row[:] for row in config] for config in configs], 1, red_temperature, emf, beta, seed, algorithm,
+                engine, 'block', None, workers=workers)
+
+    repeats = []
+    for repeat in range(0, REPEATS):
+        copies = [[row[:] for row in config] for config in configs]
+        start = time.perf_counter()
+        main.evolve(copies, mcss, red_temperature, emf, beta, seed, algorithm, engine, 'block', None, workers=workers)
+        repeats.append(time.perf_counter() - start)
+    seconds = float(np.median(repeats))
+    return {'algorithm': algorithm,
+            'engine': engine,
+            'h': emf,
+            'L': lattice_length,
+            'T*': red_temperature,
+            'K': mcss,
+            'workers': workers if engine == "shared" else 1,
+            'numba': engine_jit.numba is not None if engine == "jit" else None,
+            'systems': len(configs),
+            'seconds': seconds,
+            'seconds per MCS': seconds/mcss,
+            'attempts per second': len(configs)*lattice_length*lattice_length*mcss/seconds}
+
+
+def check(algorithm: str,
+          engine: str,
+          lattice_length: int,
+          red_temperature: float,
+          seed: int,
+          workers: int
+         ) -> dict[str, object]:
+    """
+    Returns the check of the engine at the point (L, T*) of h = 0.
+
+    The systems start ordered and evolve by segments of SEGMENT MCSs, every segment drawing from its own seed
+    of the key of the segment (see rng.derived_seed). The means of |m| and of the energy per spin of the systems
+    at the ends of the segments after the burn-in are compared with the exact values, their standard errors
+    are given by the integrated autocorrelation times of the series of the segments.
+    """
+    beta = 1/red_temperature
+    nodes_number = lattice_length*lattice_length
+    geometry = lattice.square(lattice_length)
+    configs = configurations(engine, lattice_length, 1.0, seed)
+    m_abs, e = [], []                                   # samples of the ends of segments, averaged over the systems
+    for segment in range(0, (CHECK_BURN_IN + CHECK_MCSS)//SEGMENT):
+        configs, magnetizations = main.evolve(configs, SEGMENT, red_temperature, 0.0, beta,
+                                              rng.derived_seed(seed, segment), algorithm, engine, 'block', None,
+                                              workers=workers)
+        configs = [config.tolist() if isinstance(config, np.ndarray) else config for config in configs]
+        if (segment + 1)*SEGMENT > CHECK_BURN_IN:
+            m_abs.append(float(np.mean([abs(sum([sum(row) for row in config]))/nodes_number for config in configs])))
+            e.append(float(np.mean([lattice.energy(geometry, config, 1.0, 0.0)/nodes_number for config in configs])))
+
+    result = {'algorithm': algorithm, 'engine': engine, 'L': lattice_length, 'T*': red_temperature}
+    passed = True
+    for name, samples, exact in (('<|m|>', m_abs, onsager_magnetization(red_temperature)),
+                                 ('<e>', e, onsager_energy(red_temperature))):
+        if name == '<|m|>' and red_temperature >= CRITICAL_TEMPERATURE:
+            continue                                    # |m| of a finite lattice does not vanish above T_c
+        mean, error = float(np.mean(samples)), analysis.error(samples)
+        result[name] = mean
+        result[''.join(['d', name])] = error
+        result[''.join([name, ' exact'])] = exact
+        passed = passed and abs(mean - exact) <= CHECK_Z*error
+    result['passed'] = passed
+    return result
+
+
+def machine_differences(parameters: dict[str, object], baseline: dict[str, object]) -> list[str]:
+    """Returns the parameters MACHINE in which the benchmark differs from the baseline."""
+    return [name for name in MACHINE if parameters[name] != baseline['parameters'].get(name)]
+
+
+def compare(timings: list[dict[str, object]], baseline: dict[str, object], counted: bool = True) -> list[dict[str, object]]:
+    """
+    Returns the timings of the combinations KEY also found in the baseline, with their speed relative to the baseline.
+    The timings of 'jit' without Numba are not compared. Regressions are flagged only if counted.
+    """
+    previous = {tuple(entry.get(name) for name in KEY): entry for entry in baseline['timings']}
+    comparisons = []
+    for entry in timings:
+        if entry['numba'] is False:
+            continue                                    # the loops of 'python', not the compiled engine
+        old = previous.get(tuple(entry[name] for name in KEY))
+        if old:
+            ratio = entry['attempts per second']/old['attempts per second']
+            comparisons.append({name: entry[name] for name in KEY} | {'speed': ratio,
+                                                                      'regression': counted and ratio < REGRESSION})
+    return comparisons
+
+
+def timings_table(timings: list[dict[str, object]], comparisons: list[dict[str, object]]) -> str:
+    """Returns the table of the timings, with their speed relative to the baseline if compared."""
+    speeds = {tuple(entry[name] for name in KEY): entry['speed'] for entry in comparisons}
+    lines = [''.join(['algorithm'.rjust(12), 'engine'.rjust(11), 'h'.rjust(6), 'L'.rjust(6), 'T*'.rjust(7),
+                      'ms/MCS'.rjust(12), 'attempts/s'.rjust(14), 'baseline'.rjust(10)])]
+    for entry in timings:
+        speed = speeds.get(tuple(entry[name] for name in KEY))
+        lines.append(''.join([entry['algorithm'].rjust(12),
+                              entry['engine'].rjust(11),
+                              str(entry['h']).rjust(6),
+                              str(entry['L']).rjust(6),
+                              str(entry['T*']).rjust(7),
+                              str(round(1000*entry['seconds per MCS'], 4)).rjust(12),
+                              str(round(entry['attempts per second'])).rjust(14),
+                              ('' if speed is None else ''.join(['x', str(round(speed, 2))])).rjust(10)]))
+    return '\n'.join(lines) + '\n'
+
+
+def checks_table(checks: list[dict[str, object]]) -> str:
+    """Returns the table of the checks, the means with their standard errors and the exact values."""
+    lines = [''.join(['algorithm'.rjust(12), 'engine'.rjust(11), 'L'.rjust(6), 'T*'.rjust(7),
+                      '<|m|>'.rjust(22), 'exact'.rjust(10), '<e>'.rjust(22), 'exact'.rjust(10), 'passed'.rjust(8)])]
+    for entry in checks:
+        columns = [entry['algorithm'].rjust(12), entry['engine'].rjust(11), str(entry['L']).rjust(6), str(entry['T*']).rjust(7)]
+        for name in ('<|m|>', '<e>'):
+            if name in entry:
+                columns.append(''.join([str(round(entry[name], 5)), ' +- ', str(round(entry[''.join(['d', name])], 5))]).rjust(22))
+                columns.append(str(round(entry[''.join([name, ' exact'])], 5)).rjust(10))
+            else:
+                columns.append('-'.rjust(22))
+                columns.append('-'.rjust(10))
+        columns.append(str(entry['passed']).rjust(8))
+        lines.append(''.join(columns))
+    return '\n'.join(lines) + '\n'
+
+
+if __name__ == '__main__':
+    import json
+    import sys
+
+    import init
+    import storage
+
+    argv = sys.argv
+
+    if '--help' in argv:
+        print(__doc__)
+        sys.exit()
+
+    # initializing parameters
+    seed = init.seed_from(argv)                                         # for random trajectories
+    engines = init.engines_from(argv)                                   # engines to benchmark
+    lattice_lengths = init.lattice_lengths_from(argv)                   # lengths of the lattice
+    red_temperatures = init.reduced_temperatures_from(argv)             # reduced temperatures T*
+    emfs = init.external_magnetic_fields_from(argv)                     # external magnetic fields h
+    mcss = init.mcss_from(argv)                                         # number of timed Monte Carlo steps
+    workers = init.workers_from(argv)                                   # number of processes of the shared engine
+    baseline_path = init.baseline_path_from(argv)                       # path to the baseline
+    save_magnetization_dir = init.save_magnetization_path_from(argv)    # path to save the results
+
+    if not any(arg in argv for arg in ['-L', '--length']):
+        lattice_lengths = [16, 64]
+    if not any(arg in argv for arg in ['-T*', '--temperature-reduced']):
+        red_temperatures = [2.0, 2.5]
+    if not any(arg in argv for arg in ['-h', '--external-magnetic-field']):
+        emfs = [0.0, 0.1]
+    if not any(arg in argv for arg in ['-K', '--K', '--steps']):
+        mcss = 100
+
+    # timings, the checkerboard engines need even L
+    timings = []
+    for algorithm in ['metropolis', 'glauber']:
+        for engine in engines:
+            for emf in emfs:
+                for lattice_length in lattice_lengths:
+                    if lattice_length % 2 and engine in ['numpy', 'multispin', 'shared']:
+                        continue
+                    for red_temperature in red_temperatures:
+                        timings.append(timing(algorithm, engine, emf, lattice_length, red_temperature, mcss, seed, workers))
+
+    parameters = {'seed': seed,
+                  'workers': workers,
+                  'python': platform.python_version(),
+                  'numpy': np.__version__,
+                  'numba': engine_jit.numba is not None,
+                  'cpus': os.cpu_count()}
+    comparisons = []
+    if baseline_path:
+        with open(baseline_path, encoding='UTF-8') as file:
+            baseline = json.load(file)
+        differences = machine_differences(parameters, baseline)
+        if differences:
+            print(''.join(['the baseline is of another machine (', ', '.join(differences),
+                           '), its speeds are not counted as regressions']))
+        comparisons = compare(timings, baseline, not differences)
+    print(timings_table(timings, comparisons), end='')
+
+    # checks against the exact solution
+    checks = [check(algorithm, engine, lattice_length, red_temperature, seed, workers)
+              for algorithm in ['metropolis', 'glauber']
+              for engine in engines
+              for lattice_length, red_temperature in CHECK_POINTS]
+    print()
+    print(checks_table(checks), end='')
+
+    results = {'parameters': parameters,
+               'timings': timings,
+               'comparisons': comparisons,
+               'checks': checks}
+    if save_magnetization_dir:
+        with open(storage.free_path(save_magnetization_dir, 'benchmark', '.json'), 'w', encoding='UTF-8') as file:
+            json.dump(results, file, indent=1)
+
+    regressions = [entry for entry in comparisons if entry['regression']]
+    failures = [entry for entry in checks if not entry['passed']]
+    if regressions or failures:
+        print(''.join([str(len(regressions)), ' regressions, ', str(len(failures)), ' failed checks']))
+        sys.exit(1)
@@ -0,0 +1,157 @@
+"""Periodic checkpoints of simulations and their resumption."""
+import os
+import time
+
+import rng
+import storage
+import trajectories
+
+
+def schedule(file_path: str,
+             every_mcs: int,
+             every_seconds: float,
+             argv: list[str],
+             parameters: dict[str, object],
+             resumed: dict[str, object] | None = None
+            ) -> dict[str, object]:
+    """
+    Returns a schedule of checkpoints to pass to the core functions.
+
+    ### Parameters
+    file_path
+    str
+        A file overwritten by every checkpoint.
+    every_mcs
+    int
+        Number of MCSs between checkpoints, 0 for none.
+    every_seconds
+    float
+        Number of seconds between checkpoints, 0 for none.
+    argv
+    list[str]
+        Arguments of the run, parsed again by the resumed run.
+    parameters
+    dict[str, object]
+        Parameters of the run, saved for inspection.
+    resumed
+    dict[str, object] | None
+        The header of a checkpoint returned by the function load, if the run is resumed.
+
+    ### Returns
+    dict[str, object]
+        The schedule.
+    """
+    return {'file_path': file_path,
+            'every_mcs': every_mcs,
+            'every_seconds': every_seconds,
+            'argv': argv,
+            'parameters': parameters,
+            'resumed': resumed,
+            'saved': False,
+            'last_time': time.monotonic()}
+
+
+def start(checkpoint: dict[str, object], generator: object) -> int:
+    """Restores the state of the generator of a resumed run and returns the MCS to continue from (0 for a new run)."""
+    resumed = checkpoint['resumed']
+    if not resumed:
+        return 0
+    rng.set_state(generator, resumed['generator'])
+    return resumed['mcs']
+
+
+def due(checkpoint: dict[str, object], mcs: int) -> bool:
+    """Returns whether a checkpoint is due after the given number of MCSs."""
+    if checkpoint['every_mcs'] and mcs % checkpoint['every_mcs'] == 0:
+        return True
+    return bool(checkpoint['every_seconds']) and time.monotonic() - checkpoint['last_time'] >= checkpoint['every_seconds']
+
+
+def save(checkpoint: dict[str, object],
+         mcs: int,
+         configuration: list[list[int]],
+         generator: object,
+         accumulator: dict[str, float] | None,
+         mag: list[float] | storage.MagnetizationWriter,
+         trajectory: dict[str, object] | None = None
+        ) -> None:
+    """
+    Saves a checkpoint after the given number of MCSs.
+
+    The checkpoint is a configuration in the packed binary format of storage, with the state of the run
+    in its header: arguments and parameters, the MCS, the state of the generator, the accumulator of observables
+    and the lengths of the streamed trace of magnetization and of the log of the trajectory (both flushed first). It is written to a temporary file
+    and renamed over the previous checkpoint, so a crash never leaves a broken checkpoint.
+    """
+    trace_path, trace_length = None, None
+    if isinstance(mag, storage.MagnetizationWriter):
+        mag.flush()
+        os.fsync(mag.file.fileno())
+        trace_path, trace_length = mag.file_path, len(mag)
+    trajectory_path, trajectory_length = None, None
+    if trajectory is not None:
+        trajectory_path, trajectory_length = trajectory['file_path'], trajectories.flush(trajectory)
+
+    header = {'argv': checkpoint['argv'],
+              'parameters': checkpoint['parameters'],
+              'mcs': mcs,
+              'generator': rng.state(generator),
+              'accumulator': accumulator,
+              'trace_path': trace_path,
+              'trace_length': trace_length,
+              'trajectory_path': trajectory_path,
+              'trajectory_length': trajectory_length}
+
+    temporary_path = checkpoint['file_path'] + '.tmp'
+    storage.save_configuration_packed(temporary_path, configuration, header)
+    with open(temporary_path, 'rb') as file:
+        os.fsync(file.fileno())
+    os.replace(temporary_path, checkpoint['file_path'])
+    checkpoint['saved'] = True
+    checkpoint['last_time'] = time.monotonic()
+
+
+def complete(checkpoint: dict[str, object]) -> None:
+    """
+    Marks the last checkpoint of a finished run as completed, so it is never resumed (see the function check).
+    The streamed trace of magnetization it refers to may be removed after the run.
+    """
+    if not (checkpoint['saved'] or checkpoint['resumed']) or not os.path.isfile(checkpoint['file_path']):
+        return          # no checkpoint of the run on the disk
+    header, configuration = load(checkpoint['file_path'])
+    header['completed'] = True
+    temporary_path = checkpoint['file_path'] + '.tmp'
+    storage.save_configuration_packed(temporary_path, configuration, header)
+    os.replace(temporary_path, checkpoint['file_path'])
+
+
+def check(header: dict[str, object]) -> None:
+    """
+    Raises ValueError if the checkpoint can not be resumed: its run is completed, or the streamed trace
+    of magnetization or the log of the trajectory it refers to is missing or shorter than saved.
+    Called before a resumed run opens (and truncates) any of the files.
+    """
+    if header.get('completed'):
+        raise ValueError('the run of the checkpoint is completed, there is nothing to resume')
+    if header['mcs'] > header['parameters']['K']:
+        raise ValueError('the checkpoint is past the number of MCSs of its run')
+    if header['trace_path'] is not None:
+        if not os.path.isfile(header['trace_path']):
+            raise ValueError(''.join(['the trace of magnetization of the checkpoint is missing: ', header['trace_path']]))
+        try:
+            trace_length = len(storage.read_magnetization_npy(header['trace_path']))
+        except ValueError:
+            trace_length = -1
+        if trace_length < header['trace_length']:
+            raise ValueError(''.join(['the trace of magnetization of the checkpoint is broken: ', header['trace_path']]))
+    if header['trajectory_path'] is not None:
+        if not os.path.isfile(header['trajectory_path']):
+            raise ValueError(''.join(['the log of the trajectory of the checkpoint is missing: ', header['trajectory_path']]))
+        if os.path.getsize(header['trajectory_path']) < header['trajectory_length']:
+            raise ValueError(''.join(['the log of the trajectory of the checkpoint is broken: ', header['trajectory_path']]))
+
+
+def load(file_path: str) -> tuple[dict[str, object], list[list[int]]]:
+    """Returns the header (see the functions save and complete) and the configuration of a checkpoint."""
+    header, packed = storage.read_configuration_packed(file_path)
+    return header, storage.unpack_rows(packed, header['L']).tolist()
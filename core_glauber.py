@@ -1,15 +1,31 @@
-"""Glauber algorithms for the Monte Carlo method in the 2D Ising model."""
+"""Glauber algorithms for the Monte Carlo method in the Ising model (the lattices of the module lattice)."""
 from math import exp
-import random
 
+import checkpoints
+import lattice
+import rng
 import utils
 
 
+def acceptance(delta: float, beta: float) -> float:
+    """Returns the Glauber probability of flipping a spin for the given change of energy."""
+    return 1/(1 + exp(delta*beta))
+
+
 def mc_raw(configuration: list[list[int]],
            monte_carlo_steps: int,
            reduced_temperature: float,
            beta: float,
-           seed: int
+           seed: int,
+           random_stream: str = 'block',
+           accumulator: dict[str, float] | None = None,
+           trace: list[float] | None = None,
+           checkpoint: dict[str, object] | None = None,
+           trajectory: dict[str, object] | None = None,
+           movie: dict[str, object] | None = None,
+           monitor: dict[str, object] | None = None,
+           histogram: dict[str, object] | None = None,
+           geometry: dict[str, object] | None = None
           ) -> tuple[list[list[int]], list[float]]:
     """
     A raw Monte Carlo method.
@@ -30,36 +46,67 @@ def mc_raw(configuration: list[list[int]],
     seed
     int
         For generatng random numbers.
-
+    random_stream
+    str
+        "block" or "legacy" - a supply of random numbers, see rng.generator.
+    accumulator
+    dict[str, float] | None
+        Moments of observables updated after every MCS, see observables.accumulator.
+    trace
+    list[float] | None
+        A sink of magnetization with the method append, used instead of a new list (see storage.MagnetizationWriter).
+    checkpoint
+    dict[str, object] | None
+        A schedule of checkpoints, see checkpoints.schedule. A resumed run continues from its checkpoint.
+    trajectory
+    dict[str, object] | None
+        A recorder of the trajectory, see trajectories.recorder.
+    movie
+    dict[str, object] | None
+        A recorder of the movie, see movies.recorder.
+    monitor
+    dict[str, object] | None
+        A monitor of traces stopping the run at its effective samples, see analysis.monitor.
+    histogram
+    dict[str, object] | None
+        A joint histogram of energy and magnetization updated after every MCS, see reweighting.histogram.
+    geometry
+    dict[str, object] | None
+        The lattice of the configuration, see lattice.geometry. The square lattice of its rows if None.
 
     ### Returns
     list[list[int]]
         The final configuration.
     list[float]
-        Evolution of magnetization.
+        Evolution of magnetization (the given trace).
     """
-    random.seed(seed)
+    generator = rng.generator(seed, random_stream)
 
-    lattice_length = len(configuration)                     # number of rows and columns in the lattice
-    nodes_number = lattice_length*lattice_length            # number of nodes
+    if geometry is None:
+        geometry = lattice.square(len(configuration))
+    rows_number, columns_number = geometry['shape']         # number of rows and columns of the configuration
+    nodes_number = geometry['nodes']                        # number of nodes
     interaction_parameter = 1/beta/reduced_temperature      # parameter of interaction
+    table = utils.acceptance_table(acceptance, interaction_parameter, 0.0, beta, geometry['coordination'])   # probabilities of flips
 
-    mag = [utils.magnetization(nodes_number, configuration)]      # initial state of magnetization
+    total_spin = sum([sum(row) for row in configuration])   # sum of all spins
+    bonds = lattice.bonds(geometry, configuration)          # sum of products of the nearest neighbours
+    first_mcs = checkpoints.start(checkpoint, generator) if checkpoint is not None else 0  # MCSs done before
+    mag = trace if trace is not None else []                # evolution of magnetization
+    if not first_mcs:
+        mag.append(1/nodes_number*total_spin)               # initial state of magnetization
 
     # evolution
-    for mcs in range(0, monte_carlo_steps):
-        for iteration in range(0, nodes_number):
-            ir = random.randrange(lattice_length)       # index of a random row
-            ic = random.randrange(lattice_length)       # index of a random column
+    for mcs in range(first_mcs, monte_carlo_steps):
+        sites, uniform = rng.sites(generator, rows_number, columns_number, nodes_number)
+        flips = [] if trajectory is not None else None   # flipped sites of the MCS
+        spin_change, bonds_change = lattice.sweep(geometry, configuration, sites, uniform, table, False, flips)
+        total_spin += spin_change
+        bonds += bonds_change
 
-            delta = 2*interaction_parameter*configuration[ir][ic]\
-                    *(configuration[ir-1][ic] + configuration[ir][(ic+1)%lattice_length]\
-                    + configuration[(ir+1)%lattice_length][ic] + configuration[ir][ic-1])
-
-            if random.random() <= 1/(1 + exp(delta*beta)):
-                configuration[ir][ic] *= -1
-
-        mag.append(utils.magnetization(nodes_number, configuration))
+        if utils.record_mcs(mcs + 1, configuration, nodes_number, total_spin, bonds, interaction_parameter, 0.0,
+                            generator, mag, flips, accumulator, checkpoint, trajectory, movie, monitor, histogram):
+            break                                       # the effective samples are collected
 
     return configuration, mag
 
@@ -69,7 +116,16 @@ def mc_h(configuration: list[list[int]],
          reduced_temperature: float,
          external_magnetic_field: float,
          beta: float,
-         seed: int
+         seed: int,
+         random_stream: str = 'block',
+         accumulator: dict[str, float] | None = None,
+         trace: list[float] | None = None,
+         checkpoint: dict[str, object] | None = None,
+         trajectory: dict[str, object] | None = None,
+         movie: dict[str, object] | None = None,
+         monitor: dict[str, object] | None = None,
+         histogram: dict[str, object] | None = None,
+         geometry: dict[str, object] | None = None
         ) -> tuple[list[list[int]], list[float]]:
     """
     Monte Carlo method with incorporated external magnetic field.
@@ -93,36 +149,67 @@ def mc_h(configuration: list[list[int]],
     seed
     int
         For generatng random numbers.
+    random_stream
+    str
+        "block" or "legacy" - a supply of random numbers, see rng.generator.
+    accumulator
+    dict[str, float] | None
+        Moments of observables updated after every MCS, see observables.accumulator.
+    trace
+    list[float] | None
+        A sink of magnetization with the method append, used instead of a new list (see storage.MagnetizationWriter).
+    checkpoint
+    dict[str, object] | None
+        A schedule of checkpoints, see checkpoints.schedule. A resumed run continues from its checkpoint.
+    trajectory
+    dict[str, object] | None
+        A recorder of the trajectory, see trajectories.recorder.
+    movie
+    dict[str, object] | None
+        A recorder of the movie, see movies.recorder.
+    monitor
+    dict[str, object] | None
+        A monitor of traces stopping the run at its effective samples, see analysis.monitor.
+    histogram
+    dict[str, object] | None
+        A joint histogram of energy and magnetization updated after every MCS, see reweighting.histogram.
+    geometry
+    dict[str, object] | None
+        The lattice of the configuration, see lattice.geometry. The square lattice of its rows if None.
 
     ### Returns
     list[list[int]]
         The final configuration.
     list[float]
-        Evolution of magnetization.
+        Evolution of magnetization (the given trace).
     """
-    random.seed(seed)
+    generator = rng.generator(seed, random_stream)
 
-    lattice_length = len(configuration)                     # number of rows and columns in the lattice
-    nodes_number = lattice_length*lattice_length            # number of nodes
+    if geometry is None:
+        geometry = lattice.square(len(configuration))
+    rows_number, columns_number = geometry['shape']         # number of rows and columns of the configuration
+    nodes_number = geometry['nodes']                        # number of nodes
     interaction_parameter = 1/beta/reduced_temperature      # parameter of interaction
-
-    mag = [utils.magnetization(nodes_number, configuration)]      # initial state of magnetization
+    table = utils.acceptance_table(acceptance, interaction_parameter, external_magnetic_field, beta, geometry['coordination'])   # probabilities of flips
+
+    total_spin = sum([sum(row) for row in configuration])   # sum of all spins
+    bonds = lattice.bonds(geometry, configuration)          # sum of products of the nearest neighbours
+    first_mcs = checkpoints.start(checkpoint, generator) if checkpoint is not None else 0  # MCSs done before
+    mag = trace if trace is not None else []                # evolution of magnetization
+    if not first_mcs:
+        mag.append(1/nodes_number*total_spin)               # initial state of magnetization
     
     # evolution
-    for mcs in range(0, monte_carlo_steps):
-        for iteration in range(0, nodes_number):
-            ir = random.randrange(lattice_length)       # index of a random row
-            ic = random.randrange(lattice_length)       # index of a random column
-
-            delta = 2*interaction_parameter*configuration[ir][ic]\
-                    *(configuration[ir-1][ic] + configuration[ir][(ic+1)%lattice_length]\
-                    + configuration[(ir+1)%lattice_length][ic] + configuration[ir][ic-1])\
-                    + 2*external_magnetic_field*configuration[ir][ic]
+    for mcs in range(first_mcs, monte_carlo_steps):
+        sites, uniform = rng.sites(generator, rows_number, columns_number, nodes_number)
+        flips = [] if trajectory is not None else None   # flipped sites of the MCS
+        spin_change, bonds_change = lattice.sweep(geometry, configuration, sites, uniform, table, False, flips)
+        total_spin += spin_change
+        bonds += bonds_change
 
-            if random.random() <= 1/(1 + exp(delta*beta)):
-                configuration[ir][ic] *= -1
-
-        mag.append(utils.magnetization(nodes_number, configuration))
+        if utils.record_mcs(mcs + 1, configuration, nodes_number, total_spin, bonds, interaction_parameter, external_magnetic_field,
+                            generator, mag, flips, accumulator, checkpoint, trajectory, movie, monitor, histogram):
+            break                                       # the effective samples are collected
 
     return configuration, mag
 
@@ -132,7 +219,16 @@ def mc_v(configuration: list[list[int]],
          reduced_temperature: float,
          beta: float,
          seed: int,
-         visualization_markers: tuple[str, str]
+         visualization_markers: tuple[str, str],
+         random_stream: str = 'block',
+         accumulator: dict[str, float] | None = None,
+         trace: list[float] | None = None,
+         checkpoint: dict[str, object] | None = None,
+         trajectory: dict[str, object] | None = None,
+         movie: dict[str, object] | None = None,
+         monitor: dict[str, object] | None = None,
+         histogram: dict[str, object] | None = None,
+         geometry: dict[str, object] | None = None
         ) -> tuple[list[list[int]], list[float]]:
     """
     Monte Carlo method on the Glauber algorithm with visualization.
@@ -156,42 +252,74 @@ def mc_v(configuration: list[list[int]],
     visualization_markers
     tuple[str, str]
         A pair of markers used for denote "up" spins and "down" spins.
+    random_stream
+    str
+        "block" or "legacy" - a supply of random numbers, see rng.generator.
+    accumulator
+    dict[str, float] | None
+        Moments of observables updated after every MCS, see observables.accumulator.
+    trace
+    list[float] | None
+        A sink of magnetization with the method append, used instead of a new list (see storage.MagnetizationWriter).
+    checkpoint
+    dict[str, object] | None
+        A schedule of checkpoints, see checkpoints.schedule. A resumed run continues from its checkpoint.
+    trajectory
+    dict[str, object] | None
+        A recorder of the trajectory, see trajectories.recorder.
+    movie
+    dict[str, object] | None
+        A recorder of the movie, see movies.recorder.
+    monitor
+    dict[str, object] | None
+        A monitor of traces stopping the run at its effective samples, see analysis.monitor.
+    histogram
+    dict[str, object] | None
+        A joint histogram of energy and magnetization updated after every MCS, see reweighting.histogram.
+    geometry
+    dict[str, object] | None
+        The lattice of the configuration, see lattice.geometry. The square lattice of its rows if None.
 
     ### Returns
     list[list[int]]
         The final configuration.
     list[float]
-        Evolution of magnetization.
+        Evolution of magnetization (the given trace).
     """
-    random.seed(seed)
+    generator = rng.generator(seed, random_stream)
 
-    lattice_length = len(configuration)                     # number of rows and columns in the lattice
-    nodes_number = lattice_length*lattice_length            # number of nodes
+    if geometry is None:
+        geometry = lattice.square(len(configuration))
+    rows_number, columns_number = geometry['shape']         # number of rows and columns of the configuration
+    nodes_number = geometry['nodes']                        # number of nodes
     interaction_parameter = 1/beta/reduced_temperature      # parameter of interaction
+    table = utils.acceptance_table(acceptance, interaction_parameter, 0.0, beta, geometry['coordination'])   # probabilities of flips
 
-    mag = [utils.magnetization(nodes_number, configuration)]      # initial state of magnetization
+    total_spin = sum([sum(row) for row in configuration])   # sum of all spins
+    bonds = lattice.bonds(geometry, configuration)          # sum of products of the nearest neighbours
+    first_mcs = checkpoints.start(checkpoint, generator) if checkpoint is not None else 0  # MCSs done before
+    mag = trace if trace is not None else []                # evolution of magnetization
+    if not first_mcs:
+        mag.append(1/nodes_number*total_spin)               # initial state of magnetization
 
     am_up   = visualization_markers[0]     # marker of spins "up"
     am_down = visualization_markers[1]     # marker of spins "down"
 
-    print_function = utils.chose_print_function(lattice_length)
+    print_function = utils.chose_print_function(rows_number)
     print_function(configuration, am_up, am_down)
 
     # evolution
-    for mcs in range(0, monte_carlo_steps):
-        for iteration in range(0, nodes_number):
-            ir = random.randrange(lattice_length)       # index of a random row
-            ic = random.randrange(lattice_length)       # index of a random column
-
-            delta = 2*interaction_parameter*configuration[ir][ic]\
-                    *(configuration[ir-1][ic] + configuration[ir][(ic+1)%lattice_length]\
-                    + configuration[(ir+1)%lattice_length][ic] + configuration[ir][ic-1])
+    for mcs in range(first_mcs, monte_carlo_steps):
+        sites, uniform = rng.sites(generator, rows_number, columns_number, nodes_number)
+        flips = [] if trajectory is not None else None   # flipped sites of the MCS
+        spin_change, bonds_change = lattice.sweep(geometry, configuration, sites, uniform, table, False, flips)
+        total_spin += spin_change
+        bonds += bonds_change
 
-            if random.random() <= 1/(1 + exp(delta*beta)):
-                configuration[ir][ic] *= -1
-
-        mag.append(utils.magnetization(nodes_number, configuration))
         print_function(configuration, am_up, am_down)
+        if utils.record_mcs(mcs + 1, configuration, nodes_number, total_spin, bonds, interaction_parameter, 0.0,
+                            generator, mag, flips, accumulator, checkpoint, trajectory, movie, monitor, histogram):
+            break                                       # the effective samples are collected
 
     return configuration, mag
 
@@ -202,7 +330,16 @@ def mc_h_v(configuration: list[list[int]],
            external_magnetic_field: float,
            beta: float,
            seed: int,
-           visualization_markers: tuple[str, str]
+           visualization_markers: tuple[str, str],
+           random_stream: str = 'block',
+           accumulator: dict[str, float] | None = None,
+           trace: list[float] | None = None,
+           checkpoint: dict[str, object] | None = None,
+           trajectory: dict[str, object] | None = None,
+           movie: dict[str, object] | None = None,
+           monitor: dict[str, object] | None = None,
+           histogram: dict[str, object] | None = None,
+           geometry: dict[str, object] | None = None
           ) -> tuple[list[list[int]], list[float]]:
     """
     Monte Carlo method with visualization and external magnetic.
@@ -229,42 +366,73 @@ def mc_h_v(configuration: list[list[int]],
     visualization_markers
     tuple[str, str]
         A pair of markers used for denote "up" spins and "down" spins.
+    random_stream
+    str
+        "block" or "legacy" - a supply of random numbers, see rng.generator.
+    accumulator
+    dict[str, float] | None
+        Moments of observables updated after every MCS, see observables.accumulator.
+    trace
+    list[float] | None
+        A sink of magnetization with the method append, used instead of a new list (see storage.MagnetizationWriter).
+    checkpoint
+    dict[str, object] | None
+        A schedule of checkpoints, see checkpoints.schedule. A resumed run continues from its checkpoint.
+    trajectory
+    dict[str, object] | None
+        A recorder of the trajectory, see trajectories.recorder.
+    movie
+    dict[str, object] | None
+        A recorder of the movie, see movies.recorder.
+    monitor
+    dict[str, object] | None
+        A monitor of traces stopping the run at its effective samples, see analysis.monitor.
+    histogram
+    dict[str, object] | None
+        A joint histogram of energy and magnetization updated after every MCS, see reweighting.histogram.
+    geometry
+    dict[str, object] | None
+        The lattice of the configuration, see lattice.geometry. The square lattice of its rows if None.
 
     ### Returns
     list[list[int]]
         The final configuration.
     list[float]
-        Evolution of magnetization.
+        Evolution of magnetization (the given trace).
     """
-    random.seed(seed)
+    generator = rng.generator(seed, random_stream)
 
-    lattice_length = len(configuration)                     # number of rows and columns in the lattice
-    nodes_number = lattice_length*lattice_length            # number of nodes
+    if geometry is None:
+        geometry = lattice.square(len(configuration))
+    rows_number, columns_number = geometry['shape']         # number of rows and columns of the configuration
+    nodes_number = geometry['nodes']                        # number of nodes
     interaction_parameter = 1/beta/reduced_temperature      # parameter of interaction
+    table = utils.acceptance_table(acceptance, interaction_parameter, external_magnetic_field, beta, geometry['coordination'])   # probabilities of flips
     
-    mag = [utils.magnetization(nodes_number, configuration)]      # initial state of magnetization
+    total_spin = sum([sum(row) for row in configuration])   # sum of all spins
+    bonds = lattice.bonds(geometry, configuration)          # sum of products of the nearest neighbours
+    first_mcs = checkpoints.start(checkpoint, generator) if checkpoint is not None else 0  # MCSs done before
+    mag = trace if trace is not None else []                # evolution of magnetization
+    if not first_mcs:
+        mag.append(1/nodes_number*total_spin)               # initial state of magnetization
 
     am_up   = visualization_markers[0]     # marker of spins "up"
     am_down = visualization_markers[1]     # marker of spins "down"
 
-    print_function = utils.chose_print_function(lattice_length)
+    print_function = utils.chose_print_function(rows_number)
     print_function(configuration, am_up, am_down)
 
     # evolution
-    for mcs in range(0, monte_carlo_steps):
-        for iteration in range(0, nodes_number):
-            ir = random.randrange(lattice_length)       # index of a random row
-            ic = random.randrange(lattice_length)       # index of a random column
-
-            delta = 2*interaction_parameter*configuration[ir][ic]\
-                    *(configuration[ir-1][ic] + configuration[ir][(ic+1)%lattice_length]\
-                    + configuration[(ir+1)%lattice_length][ic] + configuration[ir][ic-1])\
-                    + 2*external_magnetic_field*configuration[ir][ic]
-
-            if random.random() <= 1/(1 + exp(delta*beta)):
-                configuration[ir][ic] *= -1
+    for mcs in range(first_mcs, monte_carlo_steps):
+        sites, uniform = rng.sites(generator, rows_number, columns_number, nodes_number)
+        flips = [] if trajectory is not None else None   # flipped sites of the MCS
+        spin_change, bonds_change = lattice.sweep(geometry, configuration, sites, uniform, table, False, flips)
+        total_spin += spin_change
+        bonds += bonds_change
 
-        mag.append(utils.magnetization(nodes_number, configuration))
         print_function(configuration, am_up, am_down)
+        if utils.record_mcs(mcs + 1, configuration, nodes_number, total_spin, bonds, interaction_parameter, external_magnetic_field,
+                            generator, mag, flips, accumulator, checkpoint, trajectory, movie, monitor, histogram):
+            break                                       # the effective samples are collected
 
     return configuration, mag
@@ -0,0 +1,253 @@
+"""Swendsen-Wang multi-cluster algorithms for the Monte Carlo method in the 2D Ising model."""
+import numpy as np
+
+import rng
+import utils
+
+
+def mc_raw(configuration: list[list[int]],
+           monte_carlo_steps: int,
+           reduced_temperature: float,
+           beta: float,
+           seed: int
+          ) -> tuple[list[list[int]], list[float]]:
+    """
+    A raw Monte Carlo method flipping all Swendsen-Wang clusters of the lattice at every MCS.
+
+    ### Parameters
+    configuration
+    list[list[int]]
+        A lattice-wise system of spins.
+    monte_carlo_steps
+    int
+        Number of iterations.
+    reduced_temperature
+    float
+        J*T/beta - thermodynamic parameter.
+    beta
+    float
+        1/kT - thermodynamic parameter.
+    seed
+    int
+        For generatng random numbers.
+
+    ### Returns
+    list[list[int]]
+        The final configuration.
+    list[float]
+        Evolution of magnetization.
+    """
+    return _evolve(configuration, monte_carlo_steps, reduced_temperature, 0.0, beta, seed, None)
+
+
+def mc_h(configuration: list[list[int]],
+         monte_carlo_steps: int,
+         reduced_temperature: float,
+         external_magnetic_field: float,
+         beta: float,
+         seed: int
+        ) -> tuple[list[list[int]], list[float]]:
+    """
+    Swendsen-Wang clusters with incorporated external magnetic field.
+
+    A cluster of the spin S and the size n is flipped with the Glauber probability of its change of energy 2*h*S*n.
+
+    ### Parameters
+    configuration
+    list[list[int]]
+        A lattice-wise system of spins.
+    monte_carlo_steps
+    int
+        Number of iterations.
+    reduced_temperature
+    float
+        J*T/beta - thermodynamic parameter.
+    external_magnetic_field
+    float
+        Influence on energy change. Incorporated member + 2*h*S*n.
+    beta
+    float
+        1/kT - thermodynamic parameter.
+    seed
+    int
+        For generatng random numbers.
+
+    ### Returns
+    list[list[int]]
+        The final configuration.
+    list[float]
+        Evolution of magnetization.
+    """
+    return _evolve(configuration, monte_carlo_steps, reduced_temperature, external_magnetic_field, beta, seed, None)
+
+
+def mc_v(configuration: list[list[int]],
+         monte_carlo_steps: int,
+         reduced_temperature: float,
+         beta: float,
+         seed: int,
+         visualization_markers: tuple[str, str]
+        ) -> tuple[list[list[int]], list[float]]:
+    """
+    Swendsen-Wang clusters with visualization.
+
+    ### Parameters
+    configuration
+    list[list[int]]
+        A lattice-wise system of spins.
+    monte_carlo_steps
+    int
+        Number of iterations.
+    reduced_temperature
+    float
+        J*T/beta - thermodynamic parameter.
+    beta
+    float
+        1/kT - thermodynamic parameter.
+    seed
+    int
+        For generatng random numbers.
+    visualization_markers
+    tuple[str, str]
+        A pair of markers used for denote "up" spins and "down" spins.
+
+    ### Returns
+    list[list[int]]
+        The final configuration.
+    list[float]
+        Evolution of magnetization.
+    """
+    return _evolve(configuration, monte_carlo_steps, reduced_temperature, 0.0, beta, seed, visualization_markers)
+
+
+def mc_h_v(configuration: list[list[int]],
+           monte_carlo_steps: int,
+           reduced_temperature: float,
+           external_magnetic_field: float,
+           beta: float,
+           seed: int,
+           visualization_markers: tuple[str, str]
+          ) -> tuple[list[list[int]], list[float]]:
+    """
+    Swendsen-Wang clusters with visualization and external magnetic field.
+
+    ### Parameters
+    configuration
+    list[list[int]]
+        A lattice-wise system of spins.
+    monte_carlo_steps
+    int
+        Number of iterations.
+    reduced_temperature
+    float
+        J*T/beta - thermodynamic parameter.
+    external_magnetic_field
+    float
+        Influence on energy change. Incorporated member + 2*h*S*n.
+    beta
+    float
+        1/kT - thermodynamic parameter.
+    seed
+    int
+        For generatng random numbers.
+    visualization_markers
+    tuple[str, str]
+        A pair of markers used for denote "up" spins and "down" spins.
+
+    ### Returns
+    list[list[int]]
+        The final configuration.
+    list[float]
+        Evolution of magnetization.
+    """
+    return _evolve(configuration, monte_carlo_steps, reduced_temperature, external_magnetic_field, beta, seed,
+                   visualization_markers)
+
+
+def active_bonds(lattice: np.ndarray,
+                 add_probability: float,
+                 generator: np.random.Generator
+                ) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns flat indices of both ends of active bonds.
+
+    Every site has a bond to its right and to its lower neighbour, with periodic boundaries.
+    A bond between aligned spins is activated with the probability 1 - exp(-2*beta*J).
+    """
+    index = np.arange(lattice.size).reshape(lattice.shape)
+    firsts, seconds = [], []
+    for axis in (0, 1):
+        neighbour = np.roll(index, -1, axis=axis)
+        active = (lattice == lattice.flat[neighbour]) & (generator.random(lattice.shape) < add_probability)
+        firsts.append(index[active])
+        seconds.append(neighbour[active])
+    return np.concatenate(firsts), np.concatenate(seconds)
+
+
+def label_clusters(nodes_number: int, firsts: np.ndarray, seconds: np.ndarray) -> np.ndarray:
+    """
+    Returns for every site the smallest flat index in its cluster.
+
+    A union-find over a flat array of parents, run for all bonds at once: the higher root of every bond
+    is hooked under the lower one, then parents are replaced by grandparents until every site points at its root.
+    Bonds inside a single cluster are dropped and the rounds repeat until no bond is left.
+    """
+    parent = np.arange(nodes_number)
+    while firsts.size:
+        lower = np.minimum(parent[firsts], parent[seconds])
+        higher = np.maximum(parent[firsts], parent[seconds])
+        linking = lower != higher
+        firsts, seconds, lower, higher = firsts[linking], seconds[linking], lower[linking], higher[linking]
+
+        np.minimum.at(parent, higher, lower)
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+
+    return parent
+
+
+def _evolve(configuration: list[list[int]],
+            monte_carlo_steps: int,
+            reduced_temperature: float,
+            external_magnetic_field: float,
+            beta: float,
+            seed: int,
+            visualization_markers: tuple[str, str] | None
+           ) -> tuple[list[list[int]], list[float]]:
+    """Common evolution of the Swendsen-Wang algorithm used by all of the mc_* variants."""
+    generator = rng.generator(seed, 'block')
+
+    lattice = np.array(configuration, dtype=np.int8)        # contiguous lattice of spins
+    lattice_length = lattice.shape[0]                       # number of rows and columns in the lattice
+    nodes_number = lattice.size                             # number of nodes
+    interaction_parameter = 1/beta/reduced_temperature      # parameter of interaction
+    add_probability = -np.expm1(-2*beta*interaction_parameter)  # probability of activating a bond
+
+    mag = [float(lattice.mean(dtype=np.float64))]           # initial state of magnetization
+
+    if visualization_markers:
+        am_up   = visualization_markers[0]     # marker of spins "up"
+        am_down = visualization_markers[1]     # marker of spins "down"
+
+        print_function = utils.chose_print_function(lattice_length)
+        print_function(lattice.tolist(), am_up, am_down)
+
+    # evolution
+    for mcs in range(0, monte_carlo_steps):
+        roots = label_clusters(nodes_number, *active_bonds(lattice, add_probability, generator))
+        spins = lattice.ravel()
+
+        # Glauber probability of flipping a whole cluster, 1/(1 + exp(2*beta*h*S*n)), which is 1/2 without the field
+        sizes = np.bincount(roots, minlength=nodes_number)
+        flip_probability = 0.5*(1 - np.tanh(beta*external_magnetic_field*spins*sizes[roots]))
+        flips = generator.random(nodes_number) < flip_probability
+        np.negative(spins, out=spins, where=flips[roots])
+
+        mag.append(float(lattice.mean(dtype=np.float64)))
+        if visualization_markers:
+            print_function(lattice.tolist(), am_up, am_down)
+
+    return lattice.tolist(), mag
@@ -0,0 +1,273 @@
+"""Wang-Landau sampling of the density of states g(E) of the 2D Ising model, without external magnetic field."""
+from concurrent.futures import ProcessPoolExecutor
+from math import exp, log
+
+import numpy as np
+
+import lattice
+import reweighting
+import rng
+
+INITIAL_MODIFICATION = 1.0      # ln f of the first stage
+FLATNESS = 0.8                  # a histogram is flat when its least count is at least FLATNESS*its mean count
+CHECK_INTERVAL = 100            # MCSs between checks of the flatness
+OVERLAP = 0.5                   # a part of a window shared with the next one
+
+
+def levels(lattice_length: int) -> list[int]:
+    """
+    Returns the reachable levels of energy of the lattice LxL (even L) with periodic boundaries.
+
+    The level k = (2N - bonds)/4 counts the energy 4J above the ground state, 0 <= k <= N.
+    The levels 1 and N - 1 (bonds = +-(2N - 4)) are not reachable, a single flip changes bonds of an ordered
+    (or a checkerboard) lattice by 8.
+    """
+    nodes_number = lattice_length*lattice_length
+    return [level for level in range(0, nodes_number + 1) if level not in (1, nodes_number - 1)]
+
+
+def windows(lattice_length: int, windows_number: int, overlap: float = OVERLAP) -> list[tuple[int, int]]:
+    """Returns the levels (low, high) of the windows of energy covering all levels, each shares overlap with the next one."""
+    nodes_number = lattice_length*lattice_length
+    width = -(-(nodes_number + 1)//(1 + (windows_number - 1)*(1 - overlap)))   # levels in a window
+    step = (nodes_number + 1 - width)/(windows_number - 1) if windows_number > 1 else 0
+    bounds = [(round(window*step), round(window*step) + int(width) - 1) for window in range(0, windows_number)]
+    bounds[-1] = (bounds[-1][0], nodes_number)
+    for (low, high), (next_low, next_high) in zip(bounds, bounds[1:]):
+        if high - next_low < 4:
+            raise ValueError('windows of energy must overlap in at least 5 levels, decrease the number of windows')
+    return bounds
+
+
+def walk(lattice_length: int,
+         low: int,
+         high: int,
+         final_modification: float,
+         seed: int,
+         random_stream: str = 'block'
+        ) -> tuple[np.ndarray, int]:
+    """
+    Wang-Landau random walk in the window of levels of energy, in a worker process.
+
+    The walk starts from the ordered lattice (windows of the lower half of levels) or the checkerboard one
+    and flips spins of random sites, accepting flips not going farther from the window, until it enters the window.
+    Then a flip from the level k to k' inside the window is accepted with the probability min(1, g(k)/g(k')),
+    and after every attempt ln g(k) of the current level is increased by ln f and its histogram by one.
+    When the histogram of the reachable levels is flat (checked every CHECK_INTERVAL MCSs), it is reset and ln f halved.
+    Once ln f falls to 1/t, where the time t is the number of attempts per reachable level, it follows 1/t (Belardinelli
+    and Pereyra), as further halvings would freeze the error of ln g. The walk ends when ln f falls below final_modification.
+
+    ### Parameters
+    lattice_length
+    int
+        Number of rows and columns in the lattice, even.
+    low
+    int
+        The lowest level of the window, see the function levels.
+    high
+    int
+        The highest level of the window.
+    final_modification
+    float
+        ln f of the last stage.
+    seed
+    int
+        For generatng random numbers.
+    random_stream
+    str
+        "block" or "legacy" - a supply of random numbers, see rng.generator.
+
+    ### Returns
+    np.ndarray
+        ln g of all levels up to a constant, nan outside of the window and on the unreachable levels.
+    int
+        Number of MCSs of the walk.
+    """
+    generator = rng.generator(seed, random_stream)
+    geometry = lattice.square(lattice_length)
+
+    nodes_number = lattice_length*lattice_length            # number of nodes
+    reachable = [level for level in levels(lattice_length) if low <= level <= high]
+    if low < nodes_number - high:
+        configuration = [[1]*lattice_length for row in range(0, lattice_length)]
+        level = 0                                           # the current level of energy
+    else:
+        configuration = [[1 - 2*((row + column)%2) for column in range(0, lattice_length)]
+                         for row in range(0, lattice_length)]
+        level = nodes_number
+
+    # entering the window
+    while not low <= level <= high:
+        sites, uniform = rng.sites(generator, lattice_length, lattice_length, nodes_number)
+        for ir, ic in sites:                                # indices of a random row and column
+            spin = configuration[ir][ic]
+            new_level = level + spin*lattice.neighbours_sum(geometry, configuration, ir, ic)//2
+            if max(low - new_level, new_level - high) <= max(low - level, level - high):
+                configuration[ir][ic] = -spin
+                level = new_level
+                if low <= level <= high:
+                    break
+
+    ln_g = [0.0]*(nodes_number + 1)                         # ln g of the levels
+    counts = [0]*(nodes_number + 1)                         # the histogram of the current stage
+    ln_f = INITIAL_MODIFICATION                             # the modification factor
+    inverse_time = False                                    # whether ln f follows 1/t
+    mcs = 0
+    while ln_f >= final_modification:
+        sites, uniform = rng.sites(generator, lattice_length, lattice_length, nodes_number)
+        for ir, ic in sites:
+            spin = configuration[ir][ic]
+            new_level = level + spin*lattice.neighbours_sum(geometry, configuration, ir, ic)//2
+
+            if low <= new_level <= high:
+                difference = ln_g[level] - ln_g[new_level]
+                if difference >= 0 or uniform() < exp(difference):
+                    configuration[ir][ic] = -spin
+                    level = new_level
+            ln_g[level] += ln_f
+            counts[level] += 1
+        mcs += 1
+
+        if inverse_time:
+            ln_f = len(reachable)/(mcs*nodes_number)
+        elif mcs%CHECK_INTERVAL == 0:
+            window_counts = [counts[level] for level in reachable]
+            if min(window_counts) >= FLATNESS*sum(window_counts)/len(window_counts):
+                counts = [0]*(nodes_number + 1)
+                ln_f /= 2
+                inverse_time = ln_f <= len(reachable)/(mcs*nodes_number)
+
+    result = np.full(nodes_number + 1, np.nan)
+    result[reachable] = np.array(ln_g)[reachable]
+    return result, mcs
+
+
+def stitch(parts: list[np.ndarray], bounds: list[tuple[int, int]]) -> np.ndarray:
+    """
+    Returns ln g of all levels joined from the windows (see the function walk), up to a constant.
+
+    Every next window is shifted to the joined ln g at the level of their overlap where their slopes
+    d ln g/dk differ least, and replaces the joined ln g above that level.
+    """
+    joined = parts[0].copy()
+    for part, (low, high), (previous_low, previous_high) in zip(parts[1:], bounds[1:], bounds):
+        overlap = [level for level in range(low, previous_high + 1) if not np.isnan(part[level])]
+        best, best_difference = None, np.inf
+        for previous, level, following in zip(overlap, overlap[1:], overlap[2:]):
+            difference = abs((joined[following] - joined[previous]) - (part[following] - part[previous]))
+            if difference < best_difference:
+                best, best_difference = level, difference
+        joined[best + 1:high + 1] = part[best + 1:high + 1] + joined[best] - part[best]
+    return joined
+
+
+def density_of_states(lattice_length: int,
+                      windows_number: int,
+                      final_modification: float,
+                      seed: int,
+                      workers: int,
+                      random_stream: str = 'block'
+                     ) -> tuple[np.ndarray, np.ndarray, list[int]]:
+    """
+    Returns the density of states of the lattice LxL sampled by Wang-Landau walks in windows of energy.
+
+    The windows (see the function windows) are walked independently by a pool of processes, every walk
+    gets its own seed of the key of its window (see rng.derived_seed), so results do not depend on the number of workers.
+    The joined ln g is normalized to the number of all states 2^N.
+
+    ### Parameters
+    lattice_length
+    int
+        Number of rows and columns in the lattice, even.
+    windows_number
+    int
+        Number of windows of energy.
+    final_modification
+    float
+        ln f of the last stage of the walks.
+    seed
+    int
+        For generatng random numbers.
+    workers
+    int
+        Number of processes walking the windows.
+    random_stream
+    str
+        "block" or "legacy" - a supply of random numbers, see rng.generator.
+
+    ### Returns
+    np.ndarray
+        Sums of products of the nearest neighbours of the reachable levels, E = -J*bonds.
+    np.ndarray
+        ln g of the levels.
+    list[int]
+        Number of MCSs of every window.
+    """
+    if lattice_length%2:
+        raise ValueError('the Wang-Landau sampling needs an even length of the lattice')
+    bounds = windows(lattice_length, windows_number)
+    seeds = [rng.derived_seed(seed, window) for window in range(0, windows_number)]
+
+    workers = max(1, min(workers, windows_number))
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    mapper = executor.map if executor else map
+    try:
+        results = list(mapper(walk,
+                              [lattice_length]*windows_number,
+                              [low for low, high in bounds],
+                              [high for low, high in bounds],
+                              [final_modification]*windows_number,
+                              seeds,
+                              [random_stream]*windows_number))
+    finally:
+        if executor:
+            executor.shutdown()
+
+    nodes_number = lattice_length*lattice_length
+    reachable = levels(lattice_length)
+    ln_g = stitch([result[0] for result in results], bounds)[reachable]
+    ln_g += nodes_number*log(2) - reweighting.logsumexp(ln_g)
+    bonds = 2*nodes_number - 4*np.array(reachable, dtype=np.int64)
+    return bonds, ln_g, [result[1] for result in results]
+
+
+def thermodynamics(bonds: np.ndarray,
+                   ln_g: np.ndarray,
+                   lattice_length: int,
+                   reduced_temperature: float,
+                   interaction_parameter: float
+                  ) -> dict[str, float]:
+    """
+    Returns thermodynamic quantities per spin at the temperature from the density of states:
+    <e>, <e^2>, the heat capacity C_v, the free energy f = -ln Z/(beta N) and the entropy s = beta(<e> - f).
+    """
+    nodes_number = lattice_length*lattice_length
+    beta = 1/interaction_parameter/reduced_temperature
+    energies = -interaction_parameter*bonds
+    ln_weights = ln_g - beta*energies
+    ln_partition = reweighting.logsumexp(ln_weights)
+    weights = np.exp(ln_weights - ln_partition)             # probabilities of the levels
+
+    e = energies/nodes_number
+    e1 = float(weights@e)
+    e2 = float(weights@(e*e))
+    f = -ln_partition/beta/nodes_number
+    return {'<e>': e1,
+            '<e^2>': e2,
+            'C_v': beta*beta*nodes_number*(e2 - e1*e1),
+            'f': f,
+            's': beta*(e1 - f)}
+
+
+def table(bonds: np.ndarray, ln_g: np.ndarray, interaction_parameter: float) -> str:
+    """Returns the table of the energies E and ln g(E)."""
+    lines = [''.join(['E'.rjust(12), 'ln g(E)'.rjust(24)])]
+    for bond, value in zip(bonds.tolist(), ln_g.tolist()):
+        lines.append(''.join([str(-interaction_parameter*bond).rjust(12), repr(value).rjust(24)]))
+    return '\n'.join(lines) + '\n'
+
+
+def load(file_path: str, interaction_parameter: float) -> tuple[np.ndarray, np.ndarray]:
+    """Returns the sums of products of the nearest neighbours and ln g of the table saved by main.py, see the function table."""
+    energies, ln_g = np.loadtxt(file_path, skiprows=1, unpack=True)
+    return np.rint(-energies/interaction_parameter).astype(np.int64), ln_g
@@ -0,0 +1,358 @@
+"""Wolff single-cluster algorithms for the Monte Carlo method in the 2D Ising model."""
+from collections.abc import Callable
+from math import expm1
+
+import core_metropolis
+import rng
+import utils
+
+
+def grow_cluster(configuration: list[list[int]],
+                 ir: int,
+                 ic: int,
+                 add_probability: float,
+                 uniform: Callable[[], float]
+                ) -> list[tuple[int, int]]:
+    """
+    Flips a cluster grown from the site (ir, ic) and returns its sites.
+
+    A site is flipped as soon as it joins the cluster, which also marks it as visited.
+    The frontier is kept on a stack, so large clusters do not hit the recursion limit.
+    """
+    lattice_length = len(configuration)
+    spin = configuration[ir][ic]
+
+    configuration[ir][ic] = -spin
+    cluster = [(ir, ic)]
+    frontier = [(ir, ic)]
+    while frontier:
+        ir, ic = frontier.pop()
+        for nr, nc in (((ir-1)%lattice_length, ic), ((ir+1)%lattice_length, ic),
+                       (ir, (ic-1)%lattice_length), (ir, (ic+1)%lattice_length)):
+            if configuration[nr][nc] == spin and uniform() < add_probability:
+                configuration[nr][nc] = -spin
+                cluster.append((nr, nc))
+                frontier.append((nr, nc))
+
+    return cluster
+
+
+def mc_raw(configuration: list[list[int]],
+           monte_carlo_steps: int,
+           reduced_temperature: float,
+           beta: float,
+           seed: int,
+           random_stream: str = 'block'
+          ) -> tuple[list[list[int]], list[float]]:
+    """
+    A raw Monte Carlo method flipping Wolff clusters.
+
+    Magnetization is recorded once per "equivalent MCS": a batch of clusters covering on average
+    as many sites as the lattice has, so it costs as much work as an MCS of the single-spin algorithms.
+    The size of a batch follows the mean size of all clusters grown so far rather than the sizes of its own clusters,
+    since stopping on the cluster that crosses the lattice size would favour large clusters and bias the samples.
+    The first record waits until the clusters cover the lattice once, so the mean size is known by then.
+
+    ### Parameters
+    configuration
+    list[list[int]]
+        A lattice-wise system of spins.
+    monte_carlo_steps
+    int
+        Number of equivalent MCSs.
+    reduced_temperature
+    float
+        J*T/beta - thermodynamic parameter.
+    beta
+    float
+        1/kT - thermodynamic parameter.
+    seed
+    int
+        For generatng random numbers.
+    random_stream
+    str
+        "block" or "legacy" - a supply of random numbers, see rng.generator.
+
+    ### Returns
+    list[list[int]]
+        The final configuration.
+    list[float]
+        Evolution of magnetization.
+    """
+    generator = rng.generator(seed, random_stream)
+
+    lattice_length = len(configuration)                     # number of rows and columns in the lattice
+    nodes_number = lattice_length*lattice_length            # number of nodes
+    interaction_parameter = 1/beta/reduced_temperature      # parameter of interaction
+    add_probability = -expm1(-2*beta*interaction_parameter) # probability of adding an aligned neighbour
+    uniform = rng.uniforms(generator, nodes_number)
+
+    total_spin = sum([sum(row) for row in configuration])   # sum of all spins
+    mag = [total_spin/nodes_number]                         # initial state of magnetization
+    covered = 0                                             # sites of all grown clusters
+    clusters = 0                                            # number of all grown clusters
+    record_at = 1                                           # number of clusters at the next record, once the lattice is covered
+
+    # evolution
+    while len(mag) <= monte_carlo_steps:
+        ir = int(uniform()*lattice_length)      # index of a random row
+        ic = int(uniform()*lattice_length)      # index of a random column
+        spin = configuration[ir][ic]
+
+        cluster = grow_cluster(configuration, ir, ic, add_probability, uniform)
+        total_spin -= 2*spin*len(cluster)
+
+        covered += len(cluster)
+        clusters += 1
+        if covered >= nodes_number and clusters >= record_at:
+            record_at = clusters + max(1, round(nodes_number*clusters/covered))
+            mag.append(total_spin/nodes_number)
+
+    return configuration, mag
+
+
+def mc_h(configuration: list[list[int]],
+         monte_carlo_steps: int,
+         reduced_temperature: float,
+         external_magnetic_field: float,
+         beta: float,
+         seed: int,
+         random_stream: str = 'block'
+        ) -> tuple[list[list[int]], list[float]]:
+    """
+    Wolff clusters with incorporated external magnetic field.
+
+    Clusters grow as without the field; the flip of a cluster is then accepted with the Metropolis probability
+    of its change of energy in the field, 2*h*S*size.
+
+    ### Parameters
+    configuration
+    list[list[int]]
+        A lattice-wise system of spins.
+    monte_carlo_steps
+    int
+        Number of equivalent MCSs.
+    reduced_temperature
+    float
+        J*T/beta - thermodynamic parameter.
+    external_magnetic_field
+    float
+        Influence on energy change. Incorporated member + 2*h*S*size.
+    beta
+    float
+        1/kT - thermodynamic parameter.
+    seed
+    int
+        For generatng random numbers.
+    random_stream
+    str
+        "block" or "legacy" - a supply of random numbers, see rng.generator.
+
+    ### Returns
+    list[list[int]]
+        The final configuration.
+    list[float]
+        Evolution of magnetization.
+    """
+    generator = rng.generator(seed, random_stream)
+
+    lattice_length = len(configuration)                     # number of rows and columns in the lattice
+    nodes_number = lattice_length*lattice_length            # number of nodes
+    interaction_parameter = 1/beta/reduced_temperature      # parameter of interaction
+    add_probability = -expm1(-2*beta*interaction_parameter) # probability of adding an aligned neighbour
+    uniform = rng.uniforms(generator, nodes_number)
+
+    total_spin = sum([sum(row) for row in configuration])   # sum of all spins
+    mag = [total_spin/nodes_number]                         # initial state of magnetization
+    covered = 0                                             # sites of all grown clusters
+    clusters = 0                                            # number of all grown clusters
+    record_at = 1                                           # number of clusters at the next record, once the lattice is covered
+
+    # evolution
+    while len(mag) <= monte_carlo_steps:
+        ir = int(uniform()*lattice_length)      # index of a random row
+        ic = int(uniform()*lattice_length)      # index of a random column
+        spin = configuration[ir][ic]
+
+        cluster = grow_cluster(configuration, ir, ic, add_probability, uniform)
+        probability = core_metropolis.acceptance(2*external_magnetic_field*spin*len(cluster), beta)
+        if probability > 1 or uniform() < probability:
+            total_spin -= 2*spin*len(cluster)
+        else:
+            for nr, nc in cluster:
+                configuration[nr][nc] = spin
+
+        covered += len(cluster)
+        clusters += 1
+        if covered >= nodes_number and clusters >= record_at:
+            record_at = clusters + max(1, round(nodes_number*clusters/covered))
+            mag.append(total_spin/nodes_number)
+
+    return configuration, mag
+
+
+def mc_v(configuration: list[list[int]],
+         monte_carlo_steps: int,
+         reduced_temperature: float,
+         beta: float,
+         seed: int,
+         visualization_markers: tuple[str, str],
+         random_stream: str = 'block'
+        ) -> tuple[list[list[int]], list[float]]:
+    """
+    Wolff clusters with visualization.
+
+    ### Parameters
+    configuration
+    list[list[int]]
+        A lattice-wise system of spins.
+    monte_carlo_steps
+    int
+        Number of equivalent MCSs.
+    reduced_temperature
+    float
+        J*T/beta - thermodynamic parameter.
+    beta
+    float
+        1/kT - thermodynamic parameter.
+    seed
+    int
+        For generatng random numbers.
+    visualization_markers
+    tuple[str, str]
+        A pair of markers used for denote "up" spins and "down" spins.
+    random_stream
+    str
+        "block" or "legacy" - a supply of random numbers, see rng.generator.
+
+    ### Returns
+    list[list[int]]
+        The final configuration.
+    list[float]
+        Evolution of magnetization.
+    """
+    generator = rng.generator(seed, random_stream)
+
+    lattice_length = len(configuration)                     # number of rows and columns in the lattice
+    nodes_number = lattice_length*lattice_length            # number of nodes
+    interaction_parameter = 1/beta/reduced_temperature      # parameter of interaction
+    add_probability = -expm1(-2*beta*interaction_parameter) # probability of adding an aligned neighbour
+    uniform = rng.uniforms(generator, nodes_number)
+
+    total_spin = sum([sum(row) for row in configuration])   # sum of all spins
+    mag = [total_spin/nodes_number]                         # initial state of magnetization
+    covered = 0                                             # sites of all grown clusters
+    clusters = 0                                            # number of all grown clusters
+    record_at = 1                                           # number of clusters at the next record, once the lattice is covered
+
+    am_up   = visualization_markers[0]     # marker of spins "up"
+    am_down = visualization_markers[1]     # marker of spins "down"
+
+    print_function = utils.chose_print_function(lattice_length)
+    print_function(configuration, am_up, am_down)
+
+    # evolution
+    while len(mag) <= monte_carlo_steps:
+        ir = int(uniform()*lattice_length)      # index of a random row
+        ic = int(uniform()*lattice_length)      # index of a random column
+        spin = configuration[ir][ic]
+
+        cluster = grow_cluster(configuration, ir, ic, add_probability, uniform)
+        total_spin -= 2*spin*len(cluster)
+
+        covered += len(cluster)
+        clusters += 1
+        if covered >= nodes_number and clusters >= record_at:
+            record_at = clusters + max(1, round(nodes_number*clusters/covered))
+            mag.append(total_spin/nodes_number)
+            print_function(configuration, am_up, am_down)
+
+    return configuration, mag
+
+
+def mc_h_v(configuration: list[list[int]],
+           monte_carlo_steps: int,
+           reduced_temperature: float,
+           external_magnetic_field: float,
+           beta: float,
+           seed: int,
+           visualization_markers: tuple[str, str],
+           random_stream: str = 'block'
+          ) -> tuple[list[list[int]], list[float]]:
+    """
+    Wolff clusters with visualization and external magnetic field.
+
+    ### Parameters
+    configuration
+    list[list[int]]
+        A lattice-wise system of spins.
+    monte_carlo_steps
+    int
+        Number of equivalent MCSs.
+    reduced_temperature
+    float
+        J*T/beta - thermodynamic parameter.
+    external_magnetic_field
+    float
+        Influence on energy change. Incorporated member + 2*h*S*size.
+    beta
+    float
+        1/kT - thermodynamic parameter.
+    seed
+    int
+        For generatng random numbers.
+    visualization_markers
+    tuple[str, str]
+        A pair of markers used for denote "up" spins and "down" spins.
+    random_stream
+    str
+        "block" or "legacy" - a supply of random numbers, see rng.generator.
+
+    ### Returns
+    list[list[int]]
+        The final configuration.
+    list[float]
+        Evolution of magnetization.
+    """
+    generator = rng.generator(seed, random_stream)
+
+    lattice_length = len(configuration)                     # number of rows and columns in the lattice
+    nodes_number = lattice_length*lattice_length            # number of nodes
+    interaction_parameter = 1/beta/reduced_temperature      # parameter of interaction
+    add_probability = -expm1(-2*beta*interaction_parameter) # probability of adding an aligned neighbour
+    uniform = rng.uniforms(generator, nodes_number)
+
+    total_spin = sum([sum(row) for row in configuration])   # sum of all spins
+    mag = [total_spin/nodes_number]                         # initial state of magnetization
+    covered = 0                                             # sites of all grown clusters
+    clusters = 0                                            # number of all grown clusters
+    record_at = 1                                           # number of clusters at the next record, once the lattice is covered
+
+    am_up   = visualization_markers[0]     # marker of spins "up"
+    am_down = visualization_markers[1]     # marker of spins "down"
+
+    print_function = utils.chose_print_function(lattice_length)
+    print_function(configuration, am_up, am_down)
+
+    # evolution
+    while len(mag) <= monte_carlo_steps:
+        ir = int(uniform()*lattice_length)      # index of a random row
+        ic = int(uniform()*lattice_length)      # index of a random column
+        spin = configuration[ir][ic]
+
+        cluster = grow_cluster(configuration, ir, ic, add_probability, uniform)
+        probability = core_metropolis.acceptance(2*external_magnetic_field*spin*len(cluster), beta)
+        if probability > 1 or uniform() < probability:
+            total_spin -= 2*spin*len(cluster)
+        else:
+            for nr, nc in cluster:
+                configuration[nr][nc] = spin
+
+        covered += len(cluster)
+        clusters += 1
+        if covered >= nodes_number and clusters >= record_at:
+            record_at = clusters + max(1, round(nodes_number*clusters/covered))
+            mag.append(total_spin/nodes_number)
+            print_function(configuration, am_up, am_down)
+
+    return configuration, mag
@@ -0,0 +1,202 @@
+"""
+Compiled single-spin-flip engine for the Monte Carlo method in the 2D Ising model: the loops of core_metropolis
+and core_glauber compiled by Numba, or those loops themselves when Numba is not installed.
+"""
+import numpy as np
+
+import core_glauber
+import core_metropolis
+import engine_numpy
+import rng
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
+def mc_raw(configuration: list[list[int]],
+           monte_carlo_steps: int,
+           reduced_temperature: float,
+           beta: float,
+           seed: int,
+           algorithm: str
+          ) -> tuple[list[list[int]], list[float]]:
+    """
+    A raw Monte Carlo method of random-site updates, compiled.
+
+    ### Parameters
+    configuration
+    list[list[int]]
+        A lattice-wise system of spins.
+    monte_carlo_steps
+    int
+        Number of iterations.
+    reduced_temperature
+    float
+        J*T/beta - thermodynamic parameter.
+    beta
+    float
+        1/kT - thermodynamic parameter.
+    seed
+    int
+        For generatng random numbers.
+    algorithm
+    str
+        "glauber" or "metropolis".
+
+    ### Returns
+    list[list[int]]
+        The final configuration.
+    list[float]
+        Evolution of magnetization.
+    """
+    return _evolve(configuration, monte_carlo_steps, reduced_temperature, 0.0, beta, seed, algorithm)
+
+
+def mc_h(configuration: list[list[int]],
+         monte_carlo_steps: int,
+         reduced_temperature: float,
+         external_magnetic_field: float,
+         beta: float,
+         seed: int,
+         algorithm: str
+        ) -> tuple[list[list[int]], list[float]]:
+    """
+    Monte Carlo method of random-site updates with incorporated external magnetic field, compiled.
+
+    ### Parameters
+    configuration
+    list[list[int]]
+        A lattice-wise system of spins.
+    monte_carlo_steps
+    int
+        Number of iterations.
+    reduced_temperature
+    float
+        J*T/beta - thermodynamic parameter.
+    external_magnetic_field
+    float
+        Influence on energy change. Incorporated member + 2*h*Sij.
+    beta
+    float
+        1/kT - thermodynamic parameter.
+    seed
+    int
+        For generatng random numbers.
+    algorithm
+    str
+        "glauber" or "metropolis".
+
+    ### Returns
+    list[list[int]]
+        The final configuration.
+    list[float]
+        Evolution of magnetization.
+    """
+    return _evolve(configuration, monte_carlo_steps, reduced_temperature, external_magnetic_field, beta, seed, algorithm)
+
+
+def sweep(lattice: np.ndarray,
+          rows: np.ndarray,
+          columns: np.ndarray,
+          variates: np.ndarray,
+          probabilities: np.ndarray,
+          metropolis: bool
+         ) -> int:
+    """
+    Attempts flips of the spins of the given sites one after another, the loop of an MCS (compiled by Numba if installed).
+
+    A variate is taken from the array only when the test needs one, as the loops of the 'python' engine do.
+
+    ### Parameters
+    lattice
+    np.ndarray
+        A lattice of spins (int8), updated in place.
+    rows
+    np.ndarray
+        Indices of rows of the sites to update.
+    columns
+    np.ndarray
+        Indices of columns of the sites to update.
+    variates
+    np.ndarray
+        Uniform variates from [0, 1), at least as many as the sites.
+    probabilities
+    np.ndarray
+        Probabilities of flips, see engine_numpy.acceptance_array.
+    metropolis
+    bool
+        True for the Metropolis test (a probability above 1 accepts without a variate), False for the Glauber one.
+
+    ### Returns
+    int
+        Change of the sum of spins.
+    """
+    rows_number, columns_number = lattice.shape
+    spin_change = 0
+    used = 0                                            # variates taken so far
+    for site in range(rows.shape[0]):
+        ir, ic = rows[site], columns[site]              # indices of a random row and column
+        spin = lattice[ir, ic]
+        neighbours_sum = lattice[ir - 1, ic] + lattice[ir, ic + 1 if ic + 1 < columns_number else 0]\
+                         + lattice[ir + 1 if ir + 1 < rows_number else 0, ic] + lattice[ir, ic - 1]
+        probability = probabilities[(spin + 1)*9 + neighbours_sum + 4]
+
+        if metropolis and probability > 1:
+            accepted = True
+        else:
+            variate = variates[used]
+            used += 1
+            accepted = variate < probability if metropolis else variate <= probability
+        if accepted:
+            lattice[ir, ic] = -spin
+            spin_change -= 2*spin
+    return spin_change
+
+
+if numba is not None:
+    sweep = numba.njit(cache=True)(sweep)
+
+
+def _evolve(configuration: list[list[int]],
+            monte_carlo_steps: int,
+            reduced_temperature: float,
+            external_magnetic_field: float,
+            beta: float,
+            seed: int,
+            algorithm: str
+           ) -> tuple[list[list[int]], list[float]]:
+    """
+    Common evolution of the compiled engine used by all of the mc_* variants.
+
+    Sites and variates of an MCS are drawn in bulk exactly as the "block" stream of the 'python' engine draws them,
+    so both engines give the same trajectories. Without Numba the loops of the 'python' engine are run instead.
+    """
+    if numba is None:
+        core = core_metropolis if algorithm == 'metropolis' else core_glauber
+        if external_magnetic_field == 0.0:
+            return core.mc_raw(configuration, monte_carlo_steps, reduced_temperature, beta, seed, 'block')
+        return core.mc_h(configuration, monte_carlo_steps, reduced_temperature, external_magnetic_field, beta, seed,
+                         'block')
+
+    generator = rng.generator(seed, 'block')
+
+    lattice = np.array(configuration, dtype=np.int8)        # contiguous lattice of spins
+    rows_number, columns_number = lattice.shape
+    nodes_number = lattice.size                             # number of nodes
+    interaction_parameter = 1/beta/reduced_temperature      # parameter of interaction
+    probabilities = engine_numpy.acceptance_array(algorithm, interaction_parameter, external_magnetic_field, beta)
+    metropolis = algorithm == 'metropolis'
+
+    total_spin = int(lattice.sum(dtype=np.int64))           # sum of spins
+    mag = [1/nodes_number*total_spin]                       # initial state of magnetization
+
+    # evolution
+    for mcs in range(0, monte_carlo_steps):
+        rows, columns = generator.integers([[rows_number], [columns_number]], size=(2, nodes_number))
+        variates = generator.random(nodes_number)
+        total_spin += int(sweep(lattice, rows, columns, variates, probabilities, metropolis))
+        mag.append(1/nodes_number*total_spin)
+
+    return lattice.tolist(), mag
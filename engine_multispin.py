@@ -0,0 +1,257 @@
+"""Multi-spin coded checkerboard engine running 64 replicas of the 2D Ising model at once."""
+import numpy as np
+
+import core_glauber
+import core_metropolis
+import engine_numpy
+import rng
+import utils
+
+REPLICAS = 64       # bits in a word, one replica per bit
+PRECISION = 53      # bits of a uniform variate, as many as in a float
+OCTET_OFFSETS = 256*np.arange(8)                                    # byte of a word -> its bin in a histogram
+OCTET_BITS = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1, bitorder='little')   # byte -> its bits
+DENSE_LEVELS = 8    # bits of a uniform variate drawn for whole sublattices, the rest only for undecided words
+
+
+def mc_raw(configurations: list[list[list[int]]],
+           monte_carlo_steps: int,
+           reduced_temperature: float,
+           beta: float,
+           seed: int,
+           algorithm: str
+          ) -> tuple[list[list[list[int]]], list[list[float]]]:
+    """
+    A raw Monte Carlo method on up to 64 replicas packed into bits of uint64 words.
+
+    ### Parameters
+    configurations
+    list[list[list[int]]]
+        Lattice-wise systems of spins, one per replica.
+    monte_carlo_steps
+    int
+        Number of iterations.
+    reduced_temperature
+    float
+        J*T/beta - thermodynamic parameter.
+    beta
+    float
+        1/kT - thermodynamic parameter.
+    seed
+    int
+        For generatng random numbers.
+    algorithm
+    str
+        "glauber" or "metropolis".
+
+    ### Returns
+    list[list[list[int]]]
+        The final configurations.
+    list[list[float]]
+        Evolutions of magnetization.
+    """
+    return _evolve(configurations, monte_carlo_steps, reduced_temperature, 0.0, beta, seed, algorithm)
+
+
+def mc_h(configurations: list[list[list[int]]],
+         monte_carlo_steps: int,
+         reduced_temperature: float,
+         external_magnetic_field: float,
+         beta: float,
+         seed: int,
+         algorithm: str
+        ) -> tuple[list[list[list[int]]], list[list[float]]]:
+    """
+    Multi-spin coded Monte Carlo method with incorporated external magnetic field.
+
+    ### Parameters
+    configurations
+    list[list[list[int]]]
+        Lattice-wise systems of spins, one per replica.
+    monte_carlo_steps
+    int
+        Number of iterations.
+    reduced_temperature
+    float
+        J*T/beta - thermodynamic parameter.
+    external_magnetic_field
+    float
+        Influence on energy change. Incorporated member + 2*h*Sij.
+    beta
+    float
+        1/kT - thermodynamic parameter.
+    seed
+    int
+        For generatng random numbers.
+    algorithm
+    str
+        "glauber" or "metropolis".
+
+    ### Returns
+    list[list[list[int]]]
+        The final configurations.
+    list[list[float]]
+        Evolutions of magnetization.
+    """
+    return _evolve(configurations, monte_carlo_steps, reduced_temperature, external_magnetic_field, beta, seed,
+                   algorithm)
+
+
+def pack(configurations: list[list[list[int]]]) -> np.ndarray:
+    """Returns a lattice of uint64 words, whose bit r is set where the spin of the replica r is "up"."""
+    if not 0 < len(configurations) <= REPLICAS:
+        raise ValueError('number of replicas must be in [1, 64]')
+
+    ups = np.zeros(np.shape(configurations[0]) + (REPLICAS,), dtype=np.uint8)
+    ups[..., :len(configurations)] = np.moveaxis(np.array(configurations, dtype=np.int8) > 0, 0, -1)
+    return np.packbits(ups, axis=-1, bitorder='little').view('<u8')[..., 0].astype(np.uint64)
+
+
+def unpack(words: np.ndarray, replicas: int) -> np.ndarray:
+    """Returns spins of the first replicas of the packed lattice as an int8 array (replica, row, column)."""
+    bits = np.unpackbits(words.astype('<u8')[..., None].view(np.uint8), axis=-1, bitorder='little')
+    return np.moveaxis(2*bits[..., :replicas].astype(np.int8) - 1, -1, 0)
+
+
+def magnetizations(words: np.ndarray, replicas: int) -> list[float]:
+    """Returns magnetization of the first replicas of the packed lattice."""
+    octets = words.astype('<u8').reshape(-1).view(np.uint8).reshape(-1, 8)
+    histogram = np.bincount((OCTET_OFFSETS + octets).ravel(), minlength=8*256).reshape(8, 256)
+    ups = (histogram @ OCTET_BITS).ravel()[:replicas]        # "up" spins of every replica
+    return (2*ups/words.size - 1).tolist()
+
+
+def antiparallel_count(spins: np.ndarray,
+                       neighbours: tuple[np.ndarray, ...]
+                      ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Returns bits (a0, a1, a2) of the number of neighbours antiparallel to the spins, counted by bit-sliced adders.
+    """
+    x1, x2, x3, x4 = (spins ^ neighbour for neighbour in neighbours)
+    s1, c1 = x1 ^ x2, x1 & x2
+    s2, c2 = x3 ^ x4, x3 & x4
+    a0, c3 = s1 ^ s2, s1 & s2
+    a1 = c1 ^ c2 ^ c3
+    a2 = (c1 & c2) | (c1 & c3) | (c2 & c3)
+    return a0, a1, a2
+
+
+def classes(spins: np.ndarray,
+            neighbours: tuple[np.ndarray, ...]
+           ) -> dict[tuple[int, int], np.ndarray]:
+    """Returns masks of bits for every pair (spin, neighbours_sum) in the packed sublattice."""
+    a0, a1, a2 = antiparallel_count(spins, neighbours)
+    counts = {4: ~(a0 | a1 | a2),       # number of parallel neighbours -> mask
+              2: a0 & ~a1,
+              0: ~a0 & a1,
+              -2: a0 & a1,
+              -4: a2}
+    downs = ~spins
+    masks = {}
+    for parallel_sum, count in counts.items():
+        masks[(1, parallel_sum)] = spins & count
+        masks[(-1, -parallel_sum)] = downs & count
+    return masks
+
+
+def below(probabilities: list[float],
+          masks: list[np.ndarray],
+          generator: np.random.Generator
+         ) -> np.ndarray:
+    """
+    Returns bits set with the given probabilities, one probability per disjoint mask of bits.
+
+    Every bit compares its own uniform variate, drawn bit after bit from the most significant one,
+    with the binary expansion of its probability, and half of the undecided bits get decided at every level.
+    After the first levels the few words with undecided bits are gathered, so the tail of the comparison
+    is cheap while the precision stays that of a float.
+    """
+    expansions = [int(probability*2**PRECISION) for probability in probabilities]
+    shape = masks[0].shape
+    masks = [mask.ravel() for mask in masks]
+    undecided = masks[0].copy()                     # bits whose variate equals the probability so far
+    for mask in masks[1:]:
+        undecided |= mask
+    less = np.zeros_like(undecided)
+    words = None                                    # indices of gathered words
+
+    for level in range(1, PRECISION + 1):
+        if level == DENSE_LEVELS + 1:
+            words = np.flatnonzero(undecided)
+            dense_less, less, undecided = less, less[words], undecided[words]
+            masks = [mask[words] for mask in masks]
+        if level > DENSE_LEVELS and not words.size:
+            break
+
+        threshold = np.zeros_like(undecided)       # bits of the probabilities at this level
+        for expansion, mask in zip(expansions, masks):
+            if expansion >> (PRECISION - level) & 1:
+                threshold |= mask
+        variate = generator.integers(0, 2**64, size=undecided.size, dtype=np.uint64)
+        less |= undecided & threshold & ~variate
+        undecided &= ~(threshold ^ variate)
+
+        if level > DENSE_LEVELS:
+            kept = np.flatnonzero(undecided)
+            if kept.size < words.size:
+                dense_less[words] |= less
+                words, less, undecided = words[kept], less[kept], undecided[kept]
+                masks = [mask[kept] for mask in masks]
+
+    if words is None:
+        return less.reshape(shape)
+    dense_less[words] |= less
+    return dense_less.reshape(shape)
+
+
+def _update(spins: np.ndarray,
+            neighbours: tuple[np.ndarray, ...],
+            table: list[list[float]],
+            generator: np.random.Generator
+           ) -> None:
+    """Flips accepted bits of the packed sublattice in place."""
+    flip = np.zeros_like(spins)
+    grouped = {}                            # probability -> mask of bits
+    for (spin, neighbours_sum), mask in classes(spins, neighbours).items():
+        probability = table[spin][neighbours_sum]
+        if probability >= 1:
+            flip |= mask
+        elif probability > 0:
+            grouped[probability] = grouped[probability] | mask if probability in grouped else mask
+
+    if grouped:
+        flip |= below(list(grouped), list(grouped.values()), generator)
+    spins ^= flip
+
+
+def _evolve(configurations: list[list[list[int]]],
+            monte_carlo_steps: int,
+            reduced_temperature: float,
+            external_magnetic_field: float,
+            beta: float,
+            seed: int,
+            algorithm: str
+           ) -> tuple[list[list[list[int]]], list[list[float]]]:
+    """Common evolution of the multi-spin coded engine used by all of the mc_* variants."""
+    generator = rng.generator(seed, 'block')
+
+    replicas = len(configurations)                          # number of simulated systems
+    words = pack(configurations)                            # lattice of packed spins
+    interaction_parameter = 1/beta/reduced_temperature      # parameter of interaction
+    ee, eo, oe, oo = engine_numpy.sublattices(words)
+    acceptance = core_metropolis.acceptance if algorithm == 'metropolis' else core_glauber.acceptance
+    table = utils.acceptance_table(acceptance, interaction_parameter, external_magnetic_field, beta)
+
+    mags = [[m] for m in magnetizations(words, replicas)]   # initial states of magnetization
+
+    # evolution
+    for mcs in range(0, monte_carlo_steps):
+        for black in (True, False):
+            views = (ee, oo) if black else (eo, oe)
+            for spins, neighbours in zip(views, engine_numpy.neighbours(ee, eo, oe, oo, black)):
+                _update(spins, neighbours, table, generator)
+
+        for mag, m in zip(mags, magnetizations(words, replicas)):
+            mag.append(m)
+
+    return unpack(words, replicas).tolist(), mags
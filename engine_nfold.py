@@ -0,0 +1,310 @@
+"""Rejection-free n-fold way (BKL) engine for the Monte Carlo method in the 2D Ising model."""
+from math import log
+
+import core_glauber
+import core_metropolis
+import rng
+import utils
+
+
+def mc_raw(configuration: list[list[int]],
+           monte_carlo_steps: int,
+           reduced_temperature: float,
+           beta: float,
+           seed: int,
+           algorithm: str,
+           random_stream: str = 'block'
+          ) -> tuple[list[list[int]], list[float]]:
+    """
+    A raw Monte Carlo method in continuous time, where every iteration flips a spin.
+
+    ### Parameters
+    configuration
+    list[list[int]]
+        A lattice-wise system of spins.
+    monte_carlo_steps
+    int
+        Number of MCSs of the physical time.
+    reduced_temperature
+    float
+        J*T/beta - thermodynamic parameter.
+    beta
+    float
+        1/kT - thermodynamic parameter.
+    seed
+    int
+        For generatng random numbers.
+    algorithm
+    str
+        "glauber" or "metropolis" - rates of flips.
+    random_stream
+    str
+        "block" or "legacy" - a supply of random numbers, see rng.generator.
+
+    ### Returns
+    list[list[int]]
+        The final configuration.
+    list[float]
+        Evolution of magnetization at integer MCSs.
+    """
+    return _evolve(configuration, monte_carlo_steps, reduced_temperature, 0.0, beta, seed, algorithm, None,
+                   random_stream)
+
+
+def mc_h(configuration: list[list[int]],
+         monte_carlo_steps: int,
+         reduced_temperature: float,
+         external_magnetic_field: float,
+         beta: float,
+         seed: int,
+         algorithm: str,
+         random_stream: str = 'block'
+        ) -> tuple[list[list[int]], list[float]]:
+    """
+    The n-fold way with incorporated external magnetic field.
+
+    ### Parameters
+    configuration
+    list[list[int]]
+        A lattice-wise system of spins.
+    monte_carlo_steps
+    int
+        Number of MCSs of the physical time.
+    reduced_temperature
+    float
+        J*T/beta - thermodynamic parameter.
+    external_magnetic_field
+    float
+        Influence on energy change. Incorporated member + 2*h*Sij.
+    beta
+    float
+        1/kT - thermodynamic parameter.
+    seed
+    int
+        For generatng random numbers.
+    algorithm
+    str
+        "glauber" or "metropolis" - rates of flips.
+    random_stream
+    str
+        "block" or "legacy" - a supply of random numbers, see rng.generator.
+
+    ### Returns
+    list[list[int]]
+        The final configuration.
+    list[float]
+        Evolution of magnetization at integer MCSs.
+    """
+    return _evolve(configuration, monte_carlo_steps, reduced_temperature, external_magnetic_field, beta, seed,
+                   algorithm, None, random_stream)
+
+
+def mc_v(configuration: list[list[int]],
+         monte_carlo_steps: int,
+         reduced_temperature: float,
+         beta: float,
+         seed: int,
+         algorithm: str,
+         visualization_markers: tuple[str, str],
+         random_stream: str = 'block'
+        ) -> tuple[list[list[int]], list[float]]:
+    """
+    The n-fold way with visualization.
+
+    ### Parameters
+    configuration
+    list[list[int]]
+        A lattice-wise system of spins.
+    monte_carlo_steps
+    int
+        Number of MCSs of the physical time.
+    reduced_temperature
+    float
+        J*T/beta - thermodynamic parameter.
+    beta
+    float
+        1/kT - thermodynamic parameter.
+    seed
+    int
+        For generatng random numbers.
+    algorithm
+    str
+        "glauber" or "metropolis" - rates of flips.
+    visualization_markers
+    tuple[str, str]
+        A pair of markers used for denote "up" spins and "down" spins.
+    random_stream
+    str
+        "block" or "legacy" - a supply of random numbers, see rng.generator.
+
+    ### Returns
+    list[list[int]]
+        The final configuration.
+    list[float]
+        Evolution of magnetization at integer MCSs.
+    """
+    return _evolve(configuration, monte_carlo_steps, reduced_temperature, 0.0, beta, seed, algorithm,
+                   visualization_markers, random_stream)
+
+
+def mc_h_v(configuration: list[list[int]],
+           monte_carlo_steps: int,
+           reduced_temperature: float,
+           external_magnetic_field: float,
+           beta: float,
+           seed: int,
+           algorithm: str,
+           visualization_markers: tuple[str, str],
+           random_stream: str = 'block'
+          ) -> tuple[list[list[int]], list[float]]:
+    """
+    The n-fold way with visualization and external magnetic field.
+
+    ### Parameters
+    configuration
+    list[list[int]]
+        A lattice-wise system of spins.
+    monte_carlo_steps
+    int
+        Number of MCSs of the physical time.
+    reduced_temperature
+    float
+        J*T/beta - thermodynamic parameter.
+    external_magnetic_field
+    float
+        Influence on energy change. Incorporated member + 2*h*Sij.
+    beta
+    float
+        1/kT - thermodynamic parameter.
+    seed
+    int
+        For generatng random numbers.
+    algorithm
+    str
+        "glauber" or "metropolis" - rates of flips.
+    visualization_markers
+    tuple[str, str]
+        A pair of markers used for denote "up" spins and "down" spins.
+    random_stream
+    str
+        "block" or "legacy" - a supply of random numbers, see rng.generator.
+
+    ### Returns
+    list[list[int]]
+        The final configuration.
+    list[float]
+        Evolution of magnetization at integer MCSs.
+    """
+    return _evolve(configuration, monte_carlo_steps, reduced_temperature, external_magnetic_field, beta, seed,
+                   algorithm, visualization_markers, random_stream)
+
+
+def class_of(spin: int, neighbours_sum: int) -> int:
+    """Returns the index 0..9 of the class of sites with the given spin and sum of the nearest neighbours."""
+    return (spin + 1)//2*5 + (neighbours_sum + 4)//2
+
+
+def _evolve(configuration: list[list[int]],
+            monte_carlo_steps: int,
+            reduced_temperature: float,
+            external_magnetic_field: float,
+            beta: float,
+            seed: int,
+            algorithm: str,
+            visualization_markers: tuple[str, str] | None,
+            random_stream: str
+           ) -> tuple[list[list[int]], list[float]]:
+    """
+    Common evolution of the n-fold way used by all of the mc_* variants.
+
+    Sites are kept in buckets of the ten classes (spin, neighbours_sum), each class with its rate of flips
+    from the tabulated acceptance. A class is chosen by the cumulative rate, a site uniformly inside it,
+    and the physical time advances by an exponential waiting time with the total rate.
+    """
+    generator = rng.generator(seed, random_stream)
+
+    lattice_length = len(configuration)                     # number of rows and columns in the lattice
+    nodes_number = lattice_length*lattice_length            # number of nodes
+    interaction_parameter = 1/beta/reduced_temperature      # parameter of interaction
+    uniform = rng.uniforms(generator, nodes_number)
+
+    acceptance = core_metropolis.acceptance if algorithm == 'metropolis' else core_glauber.acceptance
+    table = utils.acceptance_table(acceptance, interaction_parameter, external_magnetic_field, beta)
+    rates = [min(1.0, table[spin][neighbours_sum])         # flips per MCS of a site in the class
+             for spin in (-1, 1) for neighbours_sum in range(-4, 5, 2)]
+
+    spins = [spin for row in configuration for spin in row]
+    neighbours = [(((site//lattice_length - 1)%lattice_length)*lattice_length + site%lattice_length,
+                   ((site//lattice_length + 1)%lattice_length)*lattice_length + site%lattice_length,
+                   site//lattice_length*lattice_length + (site - 1)%lattice_length,
+                   site//lattice_length*lattice_length + (site + 1)%lattice_length)
+                  for site in range(0, nodes_number)]
+
+    classes = [class_of(spins[site], sum([spins[n] for n in neighbours[site]])) for site in range(0, nodes_number)]
+    members = [[] for rate in rates]                        # sites of every class
+    positions = [0]*nodes_number                            # position of a site in the list of its class
+    for site, site_class in enumerate(classes):
+        positions[site] = len(members[site_class])
+        members[site_class].append(site)
+
+    def move(site: int) -> None:
+        """Moves the site to the bucket of its current class."""
+        new_class = class_of(spins[site], sum([spins[n] for n in neighbours[site]]))
+        old_class = classes[site]
+        if new_class == old_class:
+            return
+        bucket = members[old_class]
+        last = bucket.pop()
+        if last != site:
+            bucket[positions[site]] = last
+            positions[last] = positions[site]
+        classes[site] = new_class
+        positions[site] = len(members[new_class])
+        members[new_class].append(site)
+
+    total_spin = sum(spins)                                 # sum of all spins
+    mag = [total_spin/nodes_number]                         # initial state of magnetization
+    time = 0.0                                              # physical time in MCSs
+
+    if visualization_markers:
+        am_up   = visualization_markers[0]     # marker of spins "up"
+        am_down = visualization_markers[1]     # marker of spins "down"
+
+        print_function = utils.chose_print_function(lattice_length)
+        print_function(configuration, am_up, am_down)
+
+    # evolution
+    while len(mag) <= monte_carlo_steps:
+        weights = [rate*len(bucket) for rate, bucket in zip(rates, members)]
+        total_rate = sum(weights)
+        if total_rate > 0:
+            time += -log(1 - uniform())/total_rate
+        else:
+            time = monte_carlo_steps                        # nothing can flip any more
+
+        # the state holds until the flip, so it is the state at every integer MCS passed meanwhile
+        while len(mag) <= min(time, monte_carlo_steps):
+            mag.append(total_spin/nodes_number)
+            if visualization_markers:
+                print_function([spins[row:row + lattice_length] for row in range(0, nodes_number, lattice_length)],
+                               am_up, am_down)
+        if len(mag) > monte_carlo_steps:
+            break
+
+        threshold = uniform()*total_rate
+        chosen = max(site_class for site_class, weight in enumerate(weights) if weight > 0)
+        for site_class, weight in enumerate(weights):
+            if threshold < weight:
+                chosen = site_class
+                break
+            threshold -= weight
+
+        bucket = members[chosen]
+        site = bucket[int(uniform()*len(bucket))]
+        spins[site] = -spins[site]
+        total_spin += 2*spins[site]
+        move(site)
+        for neighbour in neighbours[site]:
+            move(neighbour)
+
+    return [spins[row:row + lattice_length] for row in range(0, nodes_number, lattice_length)], mag
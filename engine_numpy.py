@@ -0,0 +1,354 @@
+"""Vectorized checkerboard engine for the Monte Carlo method in the 2D Ising model."""
+import numpy as np
+
+import core_glauber
+import core_metropolis
+import rng
+import utils
+
+
+def mc_raw(configuration: list[list[int]],
+           monte_carlo_steps: int,
+           reduced_temperature: float,
+           beta: float,
+           seed: int,
+           algorithm: str
+          ) -> tuple[list[list[int]], list[float]]:
+    """
+    A raw Monte Carlo method on the checkerboard decomposition of the lattice.
+
+    ### Parameters
+    configuration
+    list[list[int]]
+        A lattice-wise system of spins.
+    monte_carlo_steps
+    int
+        Number of iterations.
+    reduced_temperature
+    float
+        J*T/beta - thermodynamic parameter.
+    beta
+    float
+        1/kT - thermodynamic parameter.
+    seed
+    int
+        For generatng random numbers.
+    algorithm
+    str
+        "glauber" or "metropolis".
+
+    ### Returns
+    list[list[int]]
+        The final configuration.
+    list[float]
+        Evolution of magnetization.
+    """
+    return _evolve(configuration, monte_carlo_steps, reduced_temperature, 0.0, beta, seed, algorithm, None)
+
+
+def mc_h(configuration: list[list[int]],
+         monte_carlo_steps: int,
+         reduced_temperature: float,
+         external_magnetic_field: float,
+         beta: float,
+         seed: int,
+         algorithm: str
+        ) -> tuple[list[list[int]], list[float]]:
+    """
+    Checkerboard Monte Carlo method with incorporated external magnetic field.
+
+    ### Parameters
+    configuration
+    list[list[int]]
+        A lattice-wise system of spins.
+    monte_carlo_steps
+    int
+        Number of iterations.
+    reduced_temperature
+    float
+        J*T/beta - thermodynamic parameter.
+    external_magnetic_field
+    float
+        Influence on energy change. Incorporated member + 2*h*Sij.
+    beta
+    float
+        1/kT - thermodynamic parameter.
+    seed
+    int
+        For generatng random numbers.
+    algorithm
+    str
+        "glauber" or "metropolis".
+
+    ### Returns
+    list[list[int]]
+        The final configuration.
+    list[float]
+        Evolution of magnetization.
+    """
+    return _evolve(configuration, monte_carlo_steps, reduced_temperature, external_magnetic_field, beta, seed,
+                   algorithm, None)
+
+
+def mc_v(configuration: list[list[int]],
+         monte_carlo_steps: int,
+         reduced_temperature: float,
+         beta: float,
+         seed: int,
+         algorithm: str,
+         visualization_markers: tuple[str, str]
+        ) -> tuple[list[list[int]], list[float]]:
+    """
+    Checkerboard Monte Carlo method with visualization.
+
+    ### Parameters
+    configuration
+    list[list[int]]
+        A lattice-wise system of spins.
+    monte_carlo_steps
+    int
+        Number of iterations.
+    reduced_temperature
+    float
+        J*T/beta - thermodynamic parameter.
+    beta
+    float
+        1/kT - thermodynamic parameter.
+    seed
+    int
+        For generatng random numbers.
+    algorithm
+    str
+        "glauber" or "metropolis".
+    visualization_markers
+    tuple[str, str]
+        A pair of markers used for denote "up" spins and "down" spins.
+
+    ### Returns
+    list[list[int]]
+        The final configuration.
+    list[float]
+        Evolution of magnetization.
+    """
+    return _evolve(configuration, monte_carlo_steps, reduced_temperature, 0.0, beta, seed, algorithm,
+                   visualization_markers)
+
+
+def mc_h_v(configuration: list[list[int]],
+           monte_carlo_steps: int,
+           reduced_temperature: float,
+           external_magnetic_field: float,
+           beta: float,
+           seed: int,
+           algorithm: str,
+           visualization_markers: tuple[str, str]
+          ) -> tuple[list[list[int]], list[float]]:
+    """
+    Checkerboard Monte Carlo method with visualization and external magnetic field.
+
+    ### Parameters
+    configuration
+    list[list[int]]
+        A lattice-wise system of spins.
+    monte_carlo_steps
+    int
+        Number of iterations.
+    reduced_temperature
+    float
+        J*T/beta - thermodynamic parameter.
+    external_magnetic_field
+    float
+        Influence on energy change. Incorporated member + 2*h*Sij.
+    beta
+    float
+        1/kT - thermodynamic parameter.
+    seed
+    int
+        For generatng random numbers.
+    algorithm
+    str
+        "glauber" or "metropolis".
+    visualization_markers
+    tuple[str, str]
+        A pair of markers used for denote "up" spins and "down" spins.
+
+    ### Returns
+    list[list[int]]
+        The final configuration.
+    list[float]
+        Evolution of magnetization.
+    """
+    return _evolve(configuration, monte_carlo_steps, reduced_temperature, external_magnetic_field, beta, seed,
+                   algorithm, visualization_markers)
+
+
+def mc_batch(configurations: list[list[list[int]]] | np.ndarray,
+             monte_carlo_steps: int,
+             reduced_temperatures: list[float] | np.ndarray,
+             external_magnetic_fields: list[float] | np.ndarray | float,
+             betas: list[float] | np.ndarray,
+             seeds: list[int],
+             algorithm: str
+            ) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Checkerboard updates of R replicas stored as an (R, L, L) array, all of them advanced at once.
+
+    Every replica has its own temperature, field and seed. A replica draws its random numbers from its own generator
+    in the order of mc_raw (mc_h), so it evolves exactly as it would alone, whatever the rest of the batch is.
+
+    ### Parameters
+    configurations
+    list[list[list[int]]] | np.ndarray
+        R lattice-wise systems of spins of the same length L.
+    monte_carlo_steps
+    int
+        Number of iterations.
+    reduced_temperatures
+    list[float] | np.ndarray
+        J*T/beta - thermodynamic parameter of every replica.
+    external_magnetic_fields
+    list[float] | np.ndarray | float
+        Influence on energy change of every replica (or a value common to all). Incorporated member + 2*h*Sij.
+    betas
+    list[float] | np.ndarray
+        1/kT - thermodynamic parameter of every replica.
+    seeds
+    list[int]
+        For generatng random numbers of every replica.
+    algorithm
+    str
+        "glauber" or "metropolis" - the probability of acceptance.
+
+    ### Returns
+    np.ndarray
+        The final configurations, an (R, L, L) array of int8.
+    np.ndarray
+        Evolution of magnetization, an (R, K+1) array.
+    """
+    lattices = np.array(configurations, dtype=np.int8)      # contiguous lattices of spins
+    replicas = lattices.shape[0]                            # number of replicas
+    temperatures = np.broadcast_to(np.asarray(reduced_temperatures, dtype=np.float64), (replicas,))
+    fields = np.broadcast_to(np.asarray(external_magnetic_fields, dtype=np.float64), (replicas,))
+    betas = np.broadcast_to(np.asarray(betas, dtype=np.float64), (replicas,))
+    generators = [rng.generator(seed, 'block') for seed in seeds]
+
+    ee, eo, oe, oo = sublattices(lattices)
+    probabilities = np.concatenate([acceptance_array(algorithm, 1/beta/temperature, field, beta)
+                                    for temperature, field, beta in zip(temperatures, fields, betas)])
+    offsets = (27*np.arange(replicas)).reshape(replicas, 1, 1)      # first index of the table of every replica
+
+    # variates of an MCS in the order of mc_raw: views ee, oo, eo, oe
+    variates = np.empty((replicas, 4) + ee.shape[1:])
+
+    mag = np.empty((replicas, monte_carlo_steps + 1))
+    mag[:, 0] = lattices.mean(axis=(1, 2), dtype=np.float64)  # initial state of magnetization
+
+    # evolution
+    for mcs in range(0, monte_carlo_steps):
+        for replica, generator in enumerate(generators):
+            generator.random(out=variates[replica])
+
+        for black in (True, False):
+            views = (ee, oo) if black else (eo, oe)
+            for view, (spins, neighbours) in enumerate(zip(views, neighbours_sums(ee, eo, oe, oo, black))):
+                flip = variates[:, view if black else view + 2] < probabilities[offsets + (spins + 1)*9 + neighbours + 4]
+                np.negative(spins, out=spins, where=flip)
+
+        mag[:, mcs + 1] = lattices.mean(axis=(1, 2), dtype=np.float64)
+
+    return lattices, mag
+
+
+def acceptance_array(algorithm: str,
+                     interaction_parameter: float,
+                     external_magnetic_field: float,
+                     beta: float
+                    ) -> np.ndarray:
+    """
+    Returns the table of utils.acceptance_table as a flat array indexed by (spin + 1)*9 + neighbours_sum + 4.
+
+    Rows for the spin 0 are never read, they only keep the index free of divisions.
+    """
+    acceptance = core_metropolis.acceptance if algorithm == 'metropolis' else core_glauber.acceptance
+    table = utils.acceptance_table(acceptance, interaction_parameter, external_magnetic_field, beta)
+    return np.array([table[spin][neighbours_sum] if spin else 0.0
+                     for spin in (-1, 0, 1) for neighbours_sum in range(-4, 5)])
+
+
+def sublattices(lattice: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Splits the lattice (or every lattice of a batch along the last two axes) into four strided views
+    (even-even, even-odd, odd-even, odd-odd).
+
+    Views "ee" and "oo" form the black sublattice of the checkerboard, "eo" and "oe" the white one.
+    Every neighbour of a black spin is white and vice versa, so a whole colour can be updated at once.
+    """
+    if lattice.shape[-2] % 2 or lattice.shape[-1] % 2:
+        raise ValueError('length L of the lattice must be even for the checkerboard decomposition')
+    return lattice[..., 0::2, 0::2], lattice[..., 0::2, 1::2], lattice[..., 1::2, 0::2], lattice[..., 1::2, 1::2]
+
+
+def neighbours(ee: np.ndarray,
+               eo: np.ndarray,
+               oe: np.ndarray,
+               oo: np.ndarray,
+               black: bool
+              ) -> tuple[tuple[np.ndarray, ...], tuple[np.ndarray, ...]]:
+    """Returns the four nearest neighbours (up, down, left, right) of both views of the black (or white) sublattice."""
+    if black:
+        return ((np.roll(oe, 1, axis=-2), oe, np.roll(eo, 1, axis=-1), eo),
+                (eo, np.roll(eo, -1, axis=-2), oe, np.roll(oe, -1, axis=-1)))
+    return ((np.roll(oo, 1, axis=-2), oo, ee, np.roll(ee, -1, axis=-1)),
+            (ee, np.roll(ee, -1, axis=-2), np.roll(oo, 1, axis=-1), oo))
+
+
+def neighbours_sums(ee: np.ndarray,
+                    eo: np.ndarray,
+                    oe: np.ndarray,
+                    oo: np.ndarray,
+                    black: bool
+                   ) -> tuple[np.ndarray, np.ndarray]:
+    """Returns sums of the nearest neighbours of both views of the black (or white) sublattice."""
+    return tuple(up + down + left + right for up, down, left, right in neighbours(ee, eo, oe, oo, black))
+
+
+def _evolve(configuration: list[list[int]],
+            monte_carlo_steps: int,
+            reduced_temperature: float,
+            external_magnetic_field: float,
+            beta: float,
+            seed: int,
+            algorithm: str,
+            visualization_markers: tuple[str, str] | None
+           ) -> tuple[list[list[int]], list[float]]:
+    """Common evolution of the checkerboard engine used by all of the mc_* variants."""
+    generator = rng.generator(seed, 'block')
+
+    lattice = np.array(configuration, dtype=np.int8)        # contiguous lattice of spins
+    lattice_length = lattice.shape[0]                       # number of rows and columns in the lattice
+    interaction_parameter = 1/beta/reduced_temperature      # parameter of interaction
+    ee, eo, oe, oo = sublattices(lattice)
+    probabilities = acceptance_array(algorithm, interaction_parameter, external_magnetic_field, beta)
+
+    mag = [float(lattice.mean(dtype=np.float64))]           # initial state of magnetization
+
+    if visualization_markers:
+        am_up   = visualization_markers[0]     # marker of spins "up"
+        am_down = visualization_markers[1]     # marker of spins "down"
+
+        print_function = utils.chose_print_function(lattice_length)
+        print_function(lattice.tolist(), am_up, am_down)
+
+    # evolution
+    for mcs in range(0, monte_carlo_steps):
+        for black in (True, False):
+            views = (ee, oo) if black else (eo, oe)
+            for spins, neighbours in zip(views, neighbours_sums(ee, eo, oe, oo, black)):
+                flip = generator.random(spins.shape) < probabilities[(spins + 1)*9 + neighbours + 4]
+                np.negative(spins, out=spins, where=flip)
+
+        mag.append(float(lattice.mean(dtype=np.float64)))
+        if visualization_markers:
+            print_function(lattice.tolist(), am_up, am_down)
+
+    return lattice.tolist(), mag
@@ -0,0 +1,245 @@
+"""Domain-decomposed checkerboard engine: strips of the 2D Ising model updated by processes on shared memory."""
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import engine_numpy
+import rng
+
+
+def mc_raw(configuration: list[list[int]],
+           monte_carlo_steps: int,
+           reduced_temperature: float,
+           beta: float,
+           seed: int,
+           algorithm: str,
+           workers: int
+          ) -> tuple[list[list[int]], list[float]]:
+    """
+    A raw Monte Carlo method on the checkerboard decomposition of the lattice, split into strips of worker processes.
+
+    ### Parameters
+    configuration
+    list[list[int]]
+        A lattice-wise system of spins.
+    monte_carlo_steps
+    int
+        Number of iterations.
+    reduced_temperature
+    float
+        J*T/beta - thermodynamic parameter.
+    beta
+    float
+        1/kT - thermodynamic parameter.
+    seed
+    int
+        For generatng random numbers.
+    algorithm
+    str
+        "glauber" or "metropolis".
+    workers
+    int
+        Number of processes, at most L/2.
+
+    ### Returns
+    list[list[int]]
+        The final configuration.
+    list[float]
+        Evolution of magnetization.
+    """
+    return _evolve(configuration, monte_carlo_steps, reduced_temperature, 0.0, beta, seed, algorithm, workers)
+
+
+def mc_h(configuration: list[list[int]],
+         monte_carlo_steps: int,
+         reduced_temperature: float,
+         external_magnetic_field: float,
+         beta: float,
+         seed: int,
+         algorithm: str,
+         workers: int
+        ) -> tuple[list[list[int]], list[float]]:
+    """
+    Checkerboard Monte Carlo method in strips of worker processes, with incorporated external magnetic field.
+
+    ### Parameters
+    configuration
+    list[list[int]]
+        A lattice-wise system of spins.
+    monte_carlo_steps
+    int
+        Number of iterations.
+    reduced_temperature
+    float
+        J*T/beta - thermodynamic parameter.
+    external_magnetic_field
+    float
+        Influence on energy change. Incorporated member + 2*h*Sij.
+    beta
+    float
+        1/kT - thermodynamic parameter.
+    seed
+    int
+        For generatng random numbers.
+    algorithm
+    str
+        "glauber" or "metropolis".
+    workers
+    int
+        Number of processes, at most L/2.
+
+    ### Returns
+    list[list[int]]
+        The final configuration.
+    list[float]
+        Evolution of magnetization.
+    """
+    return _evolve(configuration, monte_carlo_steps, reduced_temperature, external_magnetic_field, beta, seed,
+                   algorithm, workers)
+
+
+def strips(lattice_length: int, workers: int) -> list[tuple[int, int]]:
+    """
+    Returns the rows (first, last + 1) of horizontal strips of the lattice, one per worker (at most L/2 of them).
+    Every strip starts at an even row and holds an even number of rows, so it keeps the colours of the checkerboard.
+    """
+    pairs = lattice_length//2                               # pairs of rows
+    workers = max(1, min(workers, pairs))
+    return [(2*(pairs*worker//workers), 2*(pairs*(worker + 1)//workers)) for worker in range(0, workers)]
+
+
+def _evolve(configuration: list[list[int]],
+            monte_carlo_steps: int,
+            reduced_temperature: float,
+            external_magnetic_field: float,
+            beta: float,
+            seed: int,
+            algorithm: str,
+            workers: int
+           ) -> tuple[list[list[int]], list[float]]:
+    """
+    Common evolution of the shared engine used by all of the mc_* variants.
+
+    The lattice lives in shared memory and every worker updates the spins of its strip in place, a colour
+    of the checkerboard at a time. Workers wait for each other at a barrier after every half-sweep, so the
+    boundary rows read from the neighbouring strips are never updated at the same time. Every worker writes
+    the sum of spins of its strip after every MCS to its slot of sums, and the first worker reduces the slots
+    to the sum of spins of the lattice in totals after the first barrier of the next MCS (the last MCS is reduced
+    here), so the shared memory takes K + 1 totals and a slot per worker.
+
+    The row r of a sublattice (the rows 2r and 2r + 1 of the lattice) draws its variates from its own stream
+    of the key r (see rng.stream), so the evolution does not depend on the number of workers.
+    """
+    lattice_length = len(configuration)                     # number of rows and columns in the lattice
+    if lattice_length % 2 or len(configuration[0]) % 2:
+        raise ValueError('length L of the lattice must be even for the checkerboard decomposition')
+    bounds = strips(lattice_length, workers)
+    interaction_parameter = 1/beta/reduced_temperature      # parameter of interaction
+    probabilities = engine_numpy.acceptance_array(algorithm, interaction_parameter, external_magnetic_field, beta)
+
+    spins_memory = shared_memory.SharedMemory(create=True, size=lattice_length*lattice_length)
+    sums_memory = shared_memory.SharedMemory(create=True, size=8*len(bounds))
+    totals_memory = shared_memory.SharedMemory(create=True, size=8*(monte_carlo_steps + 1))
+    lattice = sums = totals = None
+    try:
+        lattice = np.ndarray((lattice_length, lattice_length), dtype=np.int8, buffer=spins_memory.buf)
+        lattice[:] = configuration
+        sums = np.ndarray(len(bounds), dtype=np.int64, buffer=sums_memory.buf)
+        totals = np.ndarray(monte_carlo_steps + 1, dtype=np.int64, buffer=totals_memory.buf)
+        totals[0] = lattice.sum(dtype=np.int64)
+
+        barrier = multiprocessing.Barrier(len(bounds))
+        arguments = [(spins_memory, sums_memory, totals_memory, lattice_length, monte_carlo_steps, bounds, strip,
+                      probabilities, seed, barrier)
+                     for strip in range(0, len(bounds))]
+        if len(bounds) == 1:
+            _work(*arguments[0])
+        else:
+            processes = [multiprocessing.Process(target=_work, args=args, daemon=True) for args in arguments]
+            for process in processes:
+                process.start()
+            for process in processes:
+                process.join()
+            if any(process.exitcode for process in processes):
+                raise RuntimeError('a worker of the shared engine failed')
+
+        if monte_carlo_steps:
+            totals[monte_carlo_steps] = sums.sum()          # the last MCS
+        mag = (totals/(lattice_length*lattice_length)).tolist()
+        config = lattice.tolist()
+    finally:
+        lattice = sums = totals = None                      # views must be released before the memory is closed
+        for memory in (spins_memory, sums_memory, totals_memory):
+            memory.close()
+            memory.unlink()
+
+    return config, mag
+
+
+def _work(spins_memory: shared_memory.SharedMemory,
+          sums_memory: shared_memory.SharedMemory,
+          totals_memory: shared_memory.SharedMemory,
+          lattice_length: int,
+          monte_carlo_steps: int,
+          bounds: list[tuple[int, int]],
+          strip: int,
+          probabilities: np.ndarray,
+          seed: int,
+          barrier: multiprocessing.Barrier
+         ) -> None:
+    """Evolves the strip of the lattice in a worker process, see the function _evolve."""
+    lattice = np.ndarray((lattice_length, lattice_length), dtype=np.int8, buffer=spins_memory.buf)
+    sums = np.ndarray(len(bounds), dtype=np.int64, buffer=sums_memory.buf)
+    totals = np.ndarray(monte_carlo_steps + 1, dtype=np.int64, buffer=totals_memory.buf)
+    ee, eo, oe, oo = engine_numpy.sublattices(lattice)
+
+    first, last = bounds[strip][0]//2, bounds[strip][1]//2  # rows of the strip in the sublattices
+    rows = slice(first, last)
+    above = (np.arange(first, last) - 1) % (lattice_length//2)
+    below = (np.arange(first, last) + 1) % (lattice_length//2)
+    generators = [rng.stream(seed, row) for row in range(first, last)]
+
+    # variates of an MCS of every row in the order of views ee, oo, eo, oe
+    variates = np.empty((last - first, 4, lattice_length//2))
+
+    try:
+        for mcs in range(0, monte_carlo_steps):
+            for row, generator in enumerate(generators):
+                generator.random(out=variates[row])
+
+            for black in (True, False):
+                views = (ee[rows], oo[rows]) if black else (eo[rows], oe[rows])
+                for view, (spins, neighbours) in enumerate(zip(views, _neighbours_sums(ee, eo, oe, oo, rows, above, below, black))):
+                    flip = variates[:, view if black else view + 2] < probabilities[(spins + 1)*9 + neighbours + 4]
+                    np.negative(spins, out=spins, where=flip)
+                barrier.wait()                              # the colour is updated in all strips
+                if black and mcs and strip == 0:
+                    totals[mcs] = sums.sum()                # sums after the previous MCS, rewritten only after the next barrier
+
+            sums[strip] = lattice[2*first:2*last].sum(dtype=np.int64)
+    except BaseException:
+        barrier.abort()                                     # releases the other workers
+        raise
+    finally:
+        lattice = sums = totals = ee = eo = oe = oo = None
+
+
+def _neighbours_sums(ee: np.ndarray,
+                     eo: np.ndarray,
+                     oe: np.ndarray,
+                     oo: np.ndarray,
+                     rows: slice,
+                     above: np.ndarray,
+                     below: np.ndarray,
+                     black: bool
+                    ) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns sums of the nearest neighbours of both views of the black (or white) sublattice in the rows of a strip,
+    as engine_numpy.neighbours_sums does for the whole lattice. The rows above and below reach into other strips.
+    """
+    if black:
+        return (oe[above] + oe[rows] + np.roll(eo[rows], 1, axis=-1) + eo[rows],
+                eo[rows] + eo[below] + oe[rows] + np.roll(oe[rows], -1, axis=-1))
+    return (oo[above] + oo[rows] + ee[rows] + np.roll(ee[rows], -1, axis=-1),
+            ee[rows] + ee[below] + np.roll(oo[rows], 1, axis=-1) + oo[rows])
@@ -1,6 +1,15 @@
 """The module provide a set of functions to initialize parameters."""
+import os
+
 FLAGS =  [
           '-s', '--seed',
+          '-b', '--burn-in',
+          '-ob', '--observables',
+          '-si', '--swap-interval',
+          '-pt', '--tempering',
+          '-w', '--workers',
+          '-R', '--replicas',
+          '-rs', '--random-stream',
           '-L', '--length',
           '-T*', '--temperature-reduced',
           '-h', '--external-magnetic-field',
@@ -8,9 +17,29 @@ FLAGS =  [
           '-K', '--K', '--steps',
           '-m0', '--initial-magnetization',
           '-a', '--algorithm',
+          '-e', '--engine',
           '-v', '--visualization',
           '-sc', '--save-configuration',
-          '-sm', '--save-magnetization'
+          '-sm', '--save-magnetization',
+          '-sf', '--save-format',
+          '-cf', '--configuration-format',
+          '-ic', '--initial-configuration',
+          '-cp', '--checkpoint',
+          '-ce', '--checkpoint-every',
+          '-ct', '--checkpoint-time',
+          '--resume',
+          '-st', '--save-trajectory',
+          '-kf', '--keyframe-interval',
+          '-mv', '--movie',
+          '-mf', '--movie-format',
+          '-me', '--movie-every',
+          '-es', '--effective-samples',
+          '-sh', '--save-histogram',
+          '-fm', '--final-modification',
+          '-wn', '--windows',
+          '-lt', '--lattice',
+          '-Ly', '--length-y',
+          '-bl', '--baseline'
          ]
 
 
@@ -28,9 +57,173 @@ def algorithm_from(argv: list[str]) -> str:
 
     if not value:
         return 'glauber'
-    if value in ['metropolis', 'glauber']:
+    if value in ['metropolis', 'glauber', 'wolff', 'swendsen-wang', 'wanglandau']:
+        return value
+    raise ValueError('the choosen algorithm must be \'metropolis\', \'glauber\', \'wolff\', \'swendsen-wang\' or \'wanglandau\'')
+
+
+def baseline_path_from(argv: list[str]) -> str | None:
+    """Returns the given path to a baseline of the benchmark or None object."""
+    args = ['-bl', '--baseline']
+
+    value = get_value(argv, args)
+    if value is None:
+        for arg in args:
+            if arg in argv:
+                raise TypeError('a path to the baseline must be not empty')
+
+    return value
+
+
+def burn_in_from(argv: list[str]) -> int:
+    """Returns the given number of MCSs skipped by the observables."""
+    args = ['-b', '--burn-in']
+
+    value = 0
+    try:
+        value = int(get_value(argv, args))
+    except ValueError as exc:
+        raise ValueError('burn-in must be an integer') from exc
+    except TypeError as exc:
+        for arg in args:
+            if arg in argv:
+                raise TypeError('burn-in must be not empty') from exc
+
+    if value < 0:
+        raise ValueError('burn-in must not be negative')
+
+    return value
+
+
+def checkpoint_every_from(argv: list[str]) -> int:
+    """Returns the given number of MCSs between checkpoints."""
+    args = ['-ce', '--checkpoint-every']
+
+    value = 0
+    try:
+        value = int(get_value(argv, args))
+    except ValueError as exc:
+        raise ValueError('number of MCSs between checkpoints must be an integer') from exc
+    except TypeError as exc:
+        for arg in args:
+            if arg in argv:
+                raise TypeError('number of MCSs between checkpoints must be not empty') from exc
+
+    if value < 0:
+        raise ValueError('number of MCSs between checkpoints must not be negative')
+
+    return value
+
+
+def checkpoint_path_from(argv: list[str]) -> str | None:
+    """Returns the given path to save checkpoints or None object."""
+    args = ['-cp', '--checkpoint']
+
+    value = get_value(argv, args)
+    if value is None:
+        for arg in args:
+            if arg in argv:
+                raise TypeError('a path to save checkpoints must be not empty')
+
+    return value
+
+
+def checkpoint_time_from(argv: list[str]) -> float:
+    """Returns the given number of seconds between checkpoints."""
+    args = ['-ct', '--checkpoint-time']
+
+    value = 300.0
+    try:
+        value = float(get_value(argv, args))
+    except ValueError as exc:
+        raise ValueError('time between checkpoints must be a float') from exc
+    except TypeError as exc:
+        for arg in args:
+            if arg in argv:
+                raise TypeError('time between checkpoints must be not empty') from exc
+
+    if value < 0:
+        raise ValueError('time between checkpoints must not be negative')
+
+    return value
+
+
+def configuration_format_from(argv: list[str]) -> str:
+    """Returns the given format of saved configurations."""
+    args = ['-cf', '--configuration-format']
+
+    value = ...
+    try:
+        value = get_value(argv, args)
+    except TypeError as exc:
+        for arg in args:
+            if arg in argv:
+                raise TypeError('a format of saved configurations must be not empty') from exc
+
+    if not value:
+        return 'text'
+    if value in ['text', 'packed']:
+        return value
+    raise ValueError('the choosen format of saved configurations must be \'text\' or \'packed\'')
+
+
+def effective_samples_from(argv: list[str]) -> int | None:
+    """Returns the given number of effective samples stopping the run or None object."""
+    args = ['-es', '--effective-samples']
+
+    value = None
+    try:
+        value = int(get_value(argv, args))
+    except ValueError as exc:
+        raise ValueError('number of effective samples must be an integer') from exc
+    except TypeError as exc:
+        for arg in args:
+            if arg in argv:
+                raise TypeError('number of effective samples must be not empty') from exc
+
+    if value is not None and value < 1:
+        raise ValueError('number of effective samples must be positive')
+
+    return value
+
+
+def engine_from(argv: list[str]) -> str:
+    """Returns the given name of choosen engine."""
+    args = ['-e', '--engine']
+
+    value = ...
+    try:
+        value = get_value(argv, args)
+    except TypeError as exc:
+        for arg in args:
+            if arg in argv:
+                raise TypeError('an engine for the Monte Carlo method must be not empty') from exc
+
+    if not value:
+        return 'python'
+    if value in ['python', 'numpy', 'multispin', 'nfold', 'shared', 'jit']:
         return value
-    raise ValueError('the choosen algorithm must be \'metropolis\' or \'glauber\'')
+    raise ValueError('the choosen engine must be \'python\', \'numpy\', \'multispin\', \'nfold\', \'shared\' or \'jit\'')
+
+
+def engines_from(argv: list[str]) -> list[str]:
+    """Returns the given list of names of engines for the benchmark, all of them by default."""
+    args = ['-e', '--engine']
+    engines = ['python', 'numpy', 'multispin', 'nfold', 'shared', 'jit']
+
+    value = get_value(argv, args)
+    if value is None:
+        for arg in args:
+            if arg in argv:
+                raise TypeError('a list of engines must be not empty')
+        return engines
+
+    values = value.split(',')
+    for engine in values:
+        if engine not in engines:
+            raise ValueError('the choosen engines must be \'python\', \'numpy\', \'multispin\', \'nfold\', \'shared\' or \'jit\'')
+
+    return values
 
 
 def external_magnetic_field_from(argv: list[str]) -> float:
@@ -50,6 +243,57 @@ def external_magnetic_field_from(argv: list[str]) -> float:
     return value
 
 
+def external_magnetic_fields_from(argv: list[str]) -> list[float]:
+    """Returns the given grid of values of an external magnetic field h for a sweep."""
+    args = ['-h', '--external-magnetic field']
+
+    values = [0.0]
+    try:
+        values = get_grid(get_value(argv, args), float)
+    except ValueError as exc:
+        raise ValueError('external magnetic field h must be a float, a list or a range of floats') from exc
+    except TypeError as exc:
+        for arg in args:
+            if arg in argv:
+                raise TypeError('external magnetic field h must be not empty') from exc
+
+    return values
+
+
+def final_modification_from(argv: list[str]) -> float:
+    """Returns the given ln f ending the walks of the Wang-Landau sampling."""
+    args = ['-fm', '--final-modification']
+
+    value = 1e-6
+    try:
+        value = float(get_value(argv, args))
+    except ValueError as exc:
+        raise ValueError('final modification factor must be a float') from exc
+    except TypeError as exc:
+        for arg in args:
+            if arg in argv:
+                raise TypeError('final modification factor must be not empty') from exc
+
+    if not 0 < value < 1:
+        raise ValueError('final modification factor must be between 0 and 1')
+
+    return value
+
+
+def get_grid(value: str, cast: type) -> list:
+    """
+    Returns values of a grid given as a range "<start>:<stop>:<step>" (both ends included),
+    a list "<value>,<value>,..." or a single "<value>".
+    """
+    if ':' in value:
+        start, stop, step = [cast(bound) for bound in value.split(':')]
+        if step <= 0 or stop < start:
+            raise ValueError('a range must have a positive step and the stop not less than the start')
+        return [round(start + point*step, 10) if cast is float else start + point*step
+                for point in range(0, int(round((stop - start)/step, 10)) + 1)]
+    return [cast(point) for point in value.split(',')]
+
+
 def get_value(argv: list[str], args: list[str]):
     """Checks if an any argument from the list Args were given in the list Argv and returns it is value or None object."""
     index = None        # index of an appropriate argument in the list argv
@@ -75,6 +319,19 @@ def get_value(argv: list[str], args: list[str]):
     return None
 
 
+def initial_configuration_path_from(argv: list[str]) -> str | None:
+    """Returns the given path to a file with the initial configuration of spins or None object."""
+    args = ['-ic', '--initial-configuration']
+
+    value = get_value(argv, args)
+    if value is None:
+        for arg in args:
+            if arg in argv:
+                raise TypeError('a path to the initial configuration must be not empty')
+
+    return value
+
+
 def initial_magnetization_from(argv: list[str]) -> str:
     """Returns the given value of initial magnetization in the system."""
     args = ['-m0', '--initial-magnetization']
@@ -112,6 +369,45 @@ def interaction_from(argv: list[str]) -> float:
     return value
 
 
+def keyframe_interval_from(argv: list[str]) -> int:
+    """Returns the given number of MCSs between keyframes of the trajectory."""
+    args = ['-kf', '--keyframe-interval']
+
+    value = 100
+    try:
+        value = int(get_value(argv, args))
+    except ValueError as exc:
+        raise ValueError('number of MCSs between keyframes must be an integer') from exc
+    except TypeError as exc:
+        for arg in args:
+            if arg in argv:
+                raise TypeError('number of MCSs between keyframes must be not empty') from exc
+
+    if value < 1:
+        raise ValueError('number of MCSs between keyframes must be positive')
+
+    return value
+
+
+def lattice_from(argv: list[str]) -> str:
+    """Returns the given name of choosen lattice."""
+    args = ['-lt', '--lattice']
+
+    value = ...
+    try:
+        value = get_value(argv, args)
+    except TypeError as exc:
+        for arg in args:
+            if arg in argv:
+                raise TypeError('a lattice must be not empty') from exc
+
+    if not value:
+        return 'square'
+    if value in ['square', 'rectangular', 'triangular', 'honeycomb', 'cubic']:
+        return value
+    raise ValueError('the choosen lattice must be \'square\', \'rectangular\', \'triangular\', \'honeycomb\' or \'cubic\'')
+
+
 def lattice_length_from(argv: list[str]) -> int:
     """Returns the given length L of the lattice of spins L x L."""
     args = ['-L', '--length']       # appropriate arguments
@@ -132,6 +428,46 @@ def lattice_length_from(argv: list[str]) -> int:
     return value
 
 
+def length_y_from(argv: list[str]) -> int | None:
+    """Returns the given number of rows Ly of the lattice or None object."""
+    args = ['-Ly', '--length-y']
+
+    value = None
+    try:
+        value = int(get_value(argv, args))
+    except ValueError as exc:
+        raise ValueError('length Ly of the lattice must be an integer') from exc
+    except TypeError as exc:
+        for arg in args:
+            if arg in argv:
+                raise TypeError('length Ly of the lattice must be not empty') from exc
+
+    if value is not None and value <= 0:
+        raise ValueError('length Ly of the lattice must be greater than zero')
+
+    return value
+
+
+def lattice_lengths_from(argv: list[str]) -> list[int]:
+    """Returns the given grid of lengths L of the lattice of spins L x L for a sweep."""
+    args = ['-L', '--length']       # appropriate arguments
+
+    values = [40]
+    try:
+        values = get_grid(get_value(argv, args), int)
+    except ValueError as exc:
+        raise ValueError('length L of the lattice must be an integer, a list or a range of integers') from exc
+    except TypeError as exc:
+        for arg in args:
+            if arg in argv:
+                raise TypeError('length L of the lattice must be not empty') from exc
+
+    if min(values) <= 0:
+        raise ValueError('length L of the lattice must be greater than zero')
+
+    return values
+
+
 def mcss_from(argv: list[str]) -> int:
     """Returns the given number of MCSs."""
     args = ['-K', '--K', '--steps']
@@ -152,6 +488,90 @@ def mcss_from(argv: list[str]) -> int:
     return value
 
 
+def movie_every_from(argv: list[str]) -> int:
+    """Returns the given number of MCSs between frames of the movie."""
+    args = ['-me', '--movie-every']
+
+    value = 1
+    try:
+        value = int(get_value(argv, args))
+    except ValueError as exc:
+        raise ValueError('number of MCSs between frames must be an integer') from exc
+    except TypeError as exc:
+        for arg in args:
+            if arg in argv:
+                raise TypeError('number of MCSs between frames must be not empty') from exc
+
+    if value < 1:
+        raise ValueError('number of MCSs between frames must be positive')
+
+    return value
+
+
+def movie_format_from(argv: list[str]) -> str:
+    """Returns the given format of the movie."""
+    args = ['-mf', '--movie-format']
+
+    value = ...
+    try:
+        value = get_value(argv, args)
+    except TypeError as exc:
+        for arg in args:
+            if arg in argv:
+                raise TypeError('a format of the movie must be not empty') from exc
+
+    if not value:
+        return 'gif'
+    if value in ['gif', 'png']:
+        return value
+    raise ValueError('the choosen format of the movie must be \'gif\' or \'png\'')
+
+
+def movie_path_from(argv: list[str]) -> str:
+    """Returns the given path to save the movie of the evolution of the system."""
+    args = ['-mv', '--movie']
+
+    value = get_value(argv, args)
+    if value is not None:
+        return value + '\\'
+
+    for arg in args:
+        if arg in argv:
+            return '.\\'
+
+    return value
+
+
+def observables_from(argv: list[str]) -> bool:
+    """Returns whether the observables should be accumulated."""
+    args = ['-ob', '--observables']
+
+    for arg in args:
+        if arg in argv:
+            return True
+
+    return False
+
+
+def random_stream_from(argv: list[str]) -> str:
+    """Returns the given name of a supply of random numbers."""
+    args = ['-rs', '--random-stream']
+
+    value = ...
+    try:
+        value = get_value(argv, args)
+    except TypeError as exc:
+        for arg in args:
+            if arg in argv:
+                raise TypeError('a random stream must be not empty') from exc
+
+    if not value:
+        return 'block'
+    if value in ['block', 'legacy']:
+        return value
+    raise ValueError('the choosen random stream must be \'block\' or \'legacy\'')
+
+
 def reduced_temperature_from(argv: list[str]) -> float:
     """Returns the given reduced temperature T*."""
     args = ['-T*', '--temperature-reduced']
@@ -172,6 +592,59 @@ def reduced_temperature_from(argv: list[str]) -> float:
     return value
 
 
+def reduced_temperatures_from(argv: list[str]) -> list[float]:
+    """Returns the given grid of reduced temperatures T* for a sweep."""
+    args = ['-T*', '--temperature-reduced']
+
+    values = [1.0]
+    try:
+        values = get_grid(get_value(argv, args), float)
+    except ValueError as exc:
+        raise ValueError('reduced temperature T* must be a float, a list or a range of floats') from exc
+    except TypeError as exc:
+        for arg in args:
+            if arg in argv:
+                raise TypeError('reduced temperature must be not empty') from exc
+
+    if min(values) <= 0:
+        raise ValueError('reduced temperature T* must be greater than zero')
+
+    return values
+
+
+def replicas_from(argv: list[str]) -> int:
+    """Returns the given number of replicas simulated at once."""
+    args = ['-R', '--replicas']
+
+    value = 64
+    try:
+        value = int(get_value(argv, args))
+    except ValueError as exc:
+        raise ValueError('number of replicas R must be an integer') from exc
+    except TypeError as exc:
+        for arg in args:
+            if arg in argv:
+                raise TypeError('number of replicas R must be not empty') from exc
+
+    if value < 1 or value > 64:
+        raise ValueError('number of replicas R must be in [1, 64]')
+
+    return value
+
+
+def resume_path_from(argv: list[str]) -> str | None:
+    """Returns the given path to a checkpoint to resume or None object."""
+    args = ['--resume']
+
+    value = get_value(argv, args)
+    if value is None:
+        for arg in args:
+            if arg in argv:
+                raise TypeError('a path to the checkpoint must be not empty')
+
+    return value
+
+
 def save_configuration_path_from(argv: list[str]) -> str:
     """Returns the given path to save the final state of the system."""
     args = ['-sc', '--save-configuration']
@@ -187,6 +660,40 @@ def save_configuration_path_from(argv: list[str]) -> str:
     return value
 
 
+def save_format_from(argv: list[str]) -> str:
+    """Returns the given format of saved magnetization."""
+    args = ['-sf', '--save-format']
+
+    value = ...
+    try:
+        value = get_value(argv, args)
+    except TypeError as exc:
+        for arg in args:
+            if arg in argv:
+                raise TypeError('a format of saved magnetization must be not empty') from exc
+
+    if not value:
+        return 'text'
+    if value in ['text', 'npy', 'npy32']:
+        return value
+    raise ValueError('the choosen format of saved magnetization must be \'text\', \'npy\' or \'npy32\'')
+
+
+def save_histogram_path_from(argv: list[str]) -> str:
+    """Returns the given path to save the histogram of energy and magnetization."""
+    args = ['-sh', '--save-histogram']
+
+    value = get_value(argv, args)
+    if value is not None:
+        return value + '\\'
+
+    for arg in args:
+        if arg in argv:
+            return '.\\'
+
+    return value
+
+
 def save_magnetization_path_from(argv: list[str]) -> str:
     """Returns the given path to save the evolution of magnetization in the system."""
     args = ['-sm', '--save-magnetization']
@@ -202,6 +709,21 @@ def save_magnetization_path_from(argv: list[str]) -> str:
     return value
 
 
+def save_trajectory_path_from(argv: list[str]) -> str:
+    """Returns the given path to save the log of the trajectory of the system."""
+    args = ['-st', '--save-trajectory']
+
+    value = get_value(argv, args)
+    if value is not None:
+        return value + '\\'
+
+    for arg in args:
+        if arg in argv:
+            return '.\\'
+
+    return value
+
+
 def seed_from(argv: list[str]) -> int:
     """Returns the given random seed form the command line."""
     args = ['-s', '--seed']     # appropriate arguments
@@ -219,6 +741,50 @@ def seed_from(argv: list[str]) -> int:
     return value
 
 
+def swap_interval_from(argv: list[str]) -> int:
+    """Returns the given number of MCSs between attempts to swap replicas of parallel tempering."""
+    args = ['-si', '--swap-interval']
+
+    value = 10
+    try:
+        value = int(get_value(argv, args))
+    except ValueError as exc:
+        raise ValueError('swap interval must be an integer') from exc
+    except TypeError as exc:
+        for arg in args:
+            if arg in argv:
+                raise TypeError('swap interval must be not empty') from exc
+
+    if value < 1:
+        raise ValueError('swap interval must be greater than zero')
+
+    return value
+
+
+def tempering_ladder_from(argv: list[str]) -> list[float] | None:
+    """Returns the given ladder of reduced temperatures of parallel tempering in the ascending order or None object."""
+    args = ['-pt', '--tempering']
+
+    value = get_value(argv, args)
+    if value is None:
+        for arg in args:
+            if arg in argv:
+                raise TypeError('a ladder of reduced temperatures must be not empty')
+        return value
+
+    try:
+        ladder = sorted([float(temperature) for temperature in value.split(',')])
+    except ValueError as exc:
+        raise ValueError('a ladder of reduced temperatures must be floats separated by commas') from exc
+
+    if len(ladder) < 2:
+        raise ValueError('a ladder of reduced temperatures must have at least two temperatures')
+    if ladder[0] <= 0:
+        raise ValueError('reduced temperatures T* of the ladder must be greater than zero')
+
+    return ladder
+
+
 def visualization_markers_from(argv: list[str]) -> tuple[str]:
     """This function optionally returns the given markers for displaying an visualization of evolution in the system."""
     args = ['-v', '--visualization']
@@ -235,11 +801,51 @@ def visualization_markers_from(argv: list[str]) -> tuple[str]:
     return value
 
 
+def workers_from(argv: list[str]) -> int:
+    """Returns the given number of worker processes."""
+    args = ['-w', '--workers']
+
+    value = os.cpu_count() or 1
+    try:
+        value = int(get_value(argv, args))
+    except ValueError as exc:
+        raise ValueError('number of workers must be an integer') from exc
+    except TypeError as exc:
+        for arg in args:
+            if arg in argv:
+                raise TypeError('number of workers must be not empty') from exc
+
+    if value < 1:
+        raise ValueError('number of workers must be greater than zero')
+
+    return value
+
+
+def windows_from(argv: list[str]) -> int:
+    """Returns the given number of windows of energy of the Wang-Landau sampling."""
+    args = ['-wn', '--windows']
+
+    value = 1
+    try:
+        value = int(get_value(argv, args))
+    except ValueError as exc:
+        raise ValueError('number of windows must be an integer') from exc
+    except TypeError as exc:
+        for arg in args:
+            if arg in argv:
+                raise TypeError('number of windows must be not empty') from exc
+
+    if value < 1:
+        raise ValueError('number of windows must be greater than zero')
+
+    return value
+
+
 DOCS = """ABOUT
 The program provide Monte Carlo simulations of 2D Ising model.
 
 COMMAND LINE INTERFACE
-py main.py [-a|--algorithm <string>] [-h|--external-magnetic-field <float>] [--help] [-J|--J|--interaction <float>] [-K|--K|--steps <int>] [-L|--length <int>] [-m0|--initial-magnetization <float>] [-s|--seed <int>] [-sc|--save-configuration [<path>]] [-sm|--save-magnetization [<path>]] [-T*|--temperature-reduced <float>] [-v|--visualization [<char><char>]]
+py main.py [-a|--algorithm <string>] [-b|--burn-in <int>] [-ce|--checkpoint-every <int>] [-cf|--configuration-format <string>] [-cp|--checkpoint <path>] [-ct|--checkpoint-time <float>] [-e|--engine <string>] [-es|--effective-samples <int>] [-fm|--final-modification <float>] [-h|--external-magnetic-field <float>] [--help] [-ic|--initial-configuration <path>] [-J|--J|--interaction <float>] [-K|--K|--steps <int>] [-kf|--keyframe-interval <int>] [-L|--length <int>] [-lt|--lattice <string>] [-Ly|--length-y <int>] [-m0|--initial-magnetization <float>] [-me|--movie-every <int>] [-mf|--movie-format <string>] [-mv|--movie [<path>]] [-ob|--observables] [-pt|--tempering <float>,<float>[,<float>...]] [-R|--replicas <int>] [--resume <path>] [-rs|--random-stream <string>] [-s|--seed <int>] [-sc|--save-configuration [<path>]] [-sf|--save-format <string>] [-sh|--save-histogram [<path>]] [-si|--swap-interval <int>] [-sm|--save-magnetization [<path>]] [-st|--save-trajectory [<path>]] [-T*|--temperature-reduced <float>] [-v|--visualization [<char><char>]] [-w|--workers <int>] [-wn|--windows <int>]
 
 MANUAL
 -a <string>
@@ -247,8 +853,74 @@ MANUAL
     An algorithm used by the Monte Carlo method to computing evolution of the system. Avaliable algorithms:
         <string> == 'metropolis'
         <string> == 'glauber'
+        <string> == 'wolff'         single-cluster flips, magnetization recorded per equivalent MCS
+        <string> == 'swendsen-wang' flips of all clusters of the lattice at every MCS
+        <string> == 'wanglandau'    Wang-Landau sampling of the density of states g(E) in -wn windows of energy (even L,
+                                    h = 0, the 'python' engine, without visualization): the table of E and ln g(E)
+                                    normalized to 2^N states is saved by -sm as "... density of states", and <e>, <e^2>,
+                                    C_v, the free energy f and the entropy s per spin at T* are printed. -K and -m0 are ignored.
     The default is 'glauber'.
 
+-b <int>
+--burn-in <int>
+    Number of the first MCSs <int> skipped by the observables and the histogram (see -sh).
+    The default is 0.
+
+-ce <int>
+--checkpoint-every <int>
+    Saves a checkpoint every <int> MCSs (see -cp), 0 for none.
+    The default is 0.
+
+-cf <string>
+--configuration-format <string>
+    A format of the configurations saved by -sc. Avaliable formats:
+        <string> == 'text'      rows of characters '1' (spin "up") and '0' (spin "down")
+        <string> == 'packed'    a .spins file: a JSON header with L, T*, h, J, K, m0, the algorithm and the seed,
+                                then rows packed a bit per spin (8x smaller, memory-mapped by storage.read_configuration_packed)
+    The default is 'text'.
+
+-cp <path>
+--checkpoint <path>
+    Saves checkpoints of the run to the file <path>: the configuration packed as by -cf 'packed', the state of the random
+    number generator, the MCS, the accumulated observables, the length of the trace of magnetization and all arguments.
+    The file is replaced atomically, every -ce MCSs and every -ct seconds. The trace of magnetization saved by -sm is streamed
+    as .npy during the run (and exported at the end in the text format of -sf 'text').
+    Only for the 'python' engine of the algorithm 'metropolis' or 'glauber'.
+
+-ct <float>
+--checkpoint-time <float>
+    Saves a checkpoint every <float> seconds (see -cp), 0 for none.
+    The default is 300.0.
+
+-e <string>
+--engine <string>
+    An engine executing the algorithm 'metropolis' or 'glauber'. Avaliable engines:
+        <string> == 'python'    random-site updates on lists of spins
+        <string> == 'numpy'     checkerboard updates of whole sublattices on a NumPy array (even L only)
+        <string> == 'multispin' checkerboard updates of R replicas packed into bits of 64-bit words (even L only, no visualization)
+        <string> == 'nfold'     rejection-free n-fold way in continuous time, every iteration flips a spin (for low T*)
+        <string> == 'shared'    checkerboard updates of horizontal strips of the lattice by -w processes on shared memory,
+                                synchronized by a barrier after every colour (even L only, no visualization, for huge L)
+        <string> == 'jit'       random-site updates of the 'python' engine compiled by Numba and cached on disk, the same
+                                trajectories as the 'block' stream of 'python' (no visualization, 'python' if no Numba)
+    The default is 'python'.
+
+-es <int>
+--effective-samples <int>
+    Stops the run when <int> effectively independent samples of |m| and e are collected, -K is then the limit of MCSs
+    (the default 1000000). The equilibration is detected by sequential tests of means of the traces, the integrated
+    autocorrelation time tau_int by FFT, and the effective samples are n/(2 tau_int) of the equilibrated part.
+    At the end the analysis is printed: the equilibrated MCS, tau_int of |m| and e, N_eff, <|m|> and <e> with their errors.
+    The traces are kept as means of blocks of MCSs, at most 131072 blocks, so their memory does not grow with the run.
+    Only for the 'python' engine of the algorithm 'metropolis' or 'glauber'.
+
+-fm <float>
+--final-modification <float>
+    ln f = <float> ending the walks of the Wang-Landau sampling: ln f starts at 1, is halved whenever the histogram
+    of energy is flat and follows 1/t from the time t it falls to it. The error of ln g is about sqrt(ln f),
+    the walks last about (levels of energy)/ln f attempts.
+    The default is 1e-06.
+
 -h <float>
 --external-magnetic-field <float>
     External homogenious magnetic field h = <float> of the system.
@@ -257,6 +929,11 @@ MANUAL
 --help
     Prints that text, without executing the program.
 
+-ic <path>
+--initial-configuration <path>
+    Starts from the configuration saved in the file <path> (either format of -cf) instead of a random one.
+    L is taken from the file, m0 only names the saved files.
+
 -J <float>
 --J <float>
 --interaction <float>
@@ -269,19 +946,97 @@ MANUAL
     Number of desired MCSs (iterations) K == <int>.
     The default is 400.
 
+-kf <int>
+--keyframe-interval <int>
+    Number of MCSs <int> between keyframes of the trajectory saved by -st.
+    The default is 100.
+
 -L <int>
 --length <int>
     A length L=<int> of the lattice LxL in the system of spins.
     The default is 40.
 
+-lt <string>
+--lattice <string>
+    A lattice of the system with periodic boundaries. Avaliable lattices:
+        <string> == 'square'        L x L, 4 neighbours
+        <string> == 'rectangular'   L x Ly (columns x rows), 4 neighbours
+        <string> == 'triangular'    L x Ly, 6 neighbours (the square ones and the diagonal up-right and down-left)
+        <string> == 'honeycomb'     L x Ly (both even), 3 neighbours (a brick wall: left, right and up or down)
+        <string> == 'cubic'         L x L x L, 6 neighbours, saved as L*L rows (L layers of L rows)
+    Neighbours are read through tables of neighbouring rows and columns built once per run. Lattices other than
+    'square' run only the 'python' engine of 'metropolis' or 'glauber', without -ic, -cf 'packed', -cp, -mv, -pt, -sh,
+    -st and -v, and their names of saved files carry the lattice after the algorithm.
+    The default is 'square'.
+
+-Ly <int>
+--length-y <int>
+    Number of rows Ly = <int> of the 'rectangular', 'triangular' and 'honeycomb' lattices.
+    The default is L.
+
 -m0 <float>
 --initial-magnetization <float>
     Initiated magnetization m = <float>.
     The default is 0.0
 
+-me <int>
+--movie-every <int>
+    Number of MCSs <int> between frames of the movie saved by -mv.
+    The default is 1.
+
+-mf <string>
+--movie-format <string>
+    A format of the movie saved by -mv:
+        <string> == 'gif'           an animated GIF "... movie (<n>).gif" of 1-bit frames
+        <string> == 'png'           PNG frames "... movie MCS <mcs> (<n>).png"
+    The default is 'gif'.
+
+-mv [<path>]
+--movie [<path>]
+    During the simulation frames of the lattice (a pixel per spin, scaled up to at least 256 pixels) are encoded
+    by a background process into a movie in a given directory <path>, and at the end the plot of magnetization
+    m(t) [MCS] is saved there as ".svg". An alternative to -v, a frame costs the simulation only a copy of the lattice
+    (below a tenth of an MCS), so frames every few MCSs (-me) cost a few percent of the simulation time. At most 64 frames
+    wait for the encoder, then the simulation waits too.
+    Only for the 'python' engine of the algorithm 'metropolis' or 'glauber'.
+    The dafault is "./" (the path of this module).
+
+-ob
+--observables
+    Accumulates moments of magnetization m and energy per spin e after every MCS, without storing them,
+    and prints <|m|>, <m^2>, <m^4>, <e>, <e^2>, the susceptibility chi, the heat capacity C_v and the Binder cumulant U_L per spin.
+    Only for the 'python' engine of the algorithm 'metropolis' or 'glauber'.
+
+-pt <float>,<float>[,<float>...]
+--tempering <float>,<float>[,<float>...]
+    Turns on parallel tempering: a replica per reduced temperature of the ladder, evolved by the 'python' engine
+    of the algorithm 'metropolis' or 'glauber', swaps the configuration with a neighbouring temperature every <swap-interval> MCSs.
+    The replica of the temperature r starts from a system initiated with the seed <seed> + r, T* is ignored.
+    Acceptance rates of swaps are printed, results of every temperature are saved.
+
+-R <int>
+--replicas <int>
+    Number R = <int> of replicas simulated at once by the 'multispin' engine, 1 <= R <= 64.
+    The replica r starts from a system initiated with the seed <seed> + r, results of every replica are saved.
+    The default is 64.
+
+--resume <path>
+    Continues the run saved in the checkpoint <path> with the arguments of that run, the other given arguments are ignored.
+    The resumed run ends exactly as the uninterrupted one would. A finished run marks its checkpoint as completed,
+    such a checkpoint (or one whose trace or trajectory is missing) is refused.
+
+-rs <string>
+--random-stream <string>
+    A supply of random numbers for the 'python' and 'nfold' engines ('block' only for 'swendsen-wang'). Avaliable streams:
+        <string> == 'block'     a NumPy generator on the counter-based Philox drawing all random numbers of an MCS at once
+        <string> == 'legacy'    the generator of module "random", reproducing old runs bit for bit
+    The default is 'block'.
+
 -s <int>
 --seed <int>
-    A seed <int> for the random number generator in module "random".
+    A seed <int> for the random number generator. Every engine draws from counter-based streams (Philox) keyed
+    by the seed and stable indices of parts of the run (rows of strips, rounds and temperatures of parallel tempering,
+    windows of energy), so results do not depend on the number of workers.
     The default is 255.
 
 -sc [<path>]
@@ -289,11 +1044,39 @@ MANUAL
     At the end of the simulation the configuration of spins S[ij] will be saved in a given directory <path>.
     The dafault is "./".
 
+-sf <string>
+--save-format <string>
+    A format of the evolution of magnetization saved by -sm. Avaliable formats:
+        <string> == 'text'      a value per line, written at the end of the simulation
+        <string> == 'npy'       a .npy file of float64, the 'python' engine of 'metropolis' and 'glauber' streams it
+                                in chunks during the simulation (memory bounded for any K, readable by numpy.load meanwhile)
+        <string> == 'npy32'     as 'npy', of float32
+    The default is 'text'.
+
+-sh [<path>]
+--save-histogram [<path>]
+    At the end of the simulation the joint histogram of energy and magnetization of the MCSs after the burn-in (-b)
+    will be saved in a given directory <path> as ".npz", for reweighting to other temperatures by "py reweighting.py".
+    Only for the 'python' engine of the algorithm 'metropolis' or 'glauber'.
+    The dafault is "./" (the path of this module).
+
+-si <int>
+--swap-interval <int>
+    Number of MCSs <int> between attempts to swap replicas of parallel tempering.
+    The default is 10.
+
 -sm [<path>]
 --save-magnetization [<path>]
     At the end of the simulation the time-dependent evolution of magnetization m(t) [MCS] of the system will be saved in a given directory <path>. 
     The dafault is "./" (the path of this module).
 
+-st [<path>]
+--save-trajectory [<path>]
+    During the simulation the trajectory of the system will be saved in a given directory <path> as a log ".trj" of keyframes,
+    whole configurations every -kf MCSs, and of sites flipped in every other MCS. Any MCS is replayed by "py replay.py".
+    Only for the 'python' engine of the algorithm 'metropolis' or 'glauber'.
+    The dafault is "./" (the path of this module).
+
 -T* <float>
 --temperature-reduced <float>
     Reduced temperature T* = <float> of the system, where T*=1/(J x Beta).
@@ -301,6 +1084,20 @@ MANUAL
 
 -v [<char><char>]
 --visualization [<char><char>]
-    Turns on the visual evolution of the system. <char><char> is a pair of characters that represents spin "up" and spin "down". The total time of execution will increase.
+    Turns on the visual evolution of the system. <char><char> is a pair of characters that represents spin "up" and spin "down".
+    Frames are drawn in the background at most 30 times per second, redrawing only changed cells. A lattice larger
+    than the terminal is shown in blocks of spins, every block by the marker of its majority.
     The default pair is U+0020, U+2588.
+
+-w <int>
+--workers <int>
+    Number of processes <int> evolving replicas of parallel tempering, strips of the lattice of the 'shared' engine
+    (at most L/2) or walking windows of the Wang-Landau sampling.
+    The default is the number of CPUs.
+
+-wn <int>
+--windows <int>
+    Number of windows of energy <int> of the Wang-Landau sampling, walked in parallel by -w processes.
+    Neighbouring windows share half of their levels, and are stitched at the level where the slopes of ln g agree best.
+    The default is 1.
 """
@@ -0,0 +1,233 @@
+"""Geometries of lattices of the Ising model: neighbour tables built once per run and the loops of single-spin flips over them."""
+from collections.abc import Callable, Iterable
+
+import numpy as np
+
+GEOMETRIES = ['square', 'rectangular', 'triangular', 'honeycomb', 'cubic']
+
+
+def square(lattice_length: int) -> dict[str, object]:
+    """Returns the square lattice LxL with periodic boundaries, 4 neighbours: up, right, down and left."""
+    return rectangular(lattice_length, lattice_length, 'square')
+
+
+def rectangular(columns_number: int, rows_number: int, name: str = 'rectangular') -> dict[str, object]:
+    """Returns the rectangular lattice L_x x L_y (columns x rows) with periodic boundaries, 4 neighbours."""
+    sites = np.arange(0, rows_number*columns_number).reshape(rows_number, columns_number)
+    return _geometry(name, rows_number, columns_number, 4,
+                     [np.roll(sites, shift, axis=axis) for axis, shift in ((0, 1), (1, -1), (0, -1), (1, 1))])
+
+
+def triangular(columns_number: int, rows_number: int) -> dict[str, object]:
+    """
+    Returns the triangular lattice L_x x L_y with periodic boundaries, 6 neighbours:
+    the square ones and the diagonal up-right and down-left (a sheared square lattice).
+    """
+    sites = np.arange(0, rows_number*columns_number).reshape(rows_number, columns_number)
+    return _geometry('triangular', rows_number, columns_number, 6,
+                     [np.roll(sites, shift, axis=axis) for axis, shift in ((0, 1), (1, -1), (0, -1), (1, 1))]
+                     + [np.roll(sites, (1, -1), axis=(0, 1)), np.roll(sites, (-1, 1), axis=(0, 1))])
+
+
+def honeycomb(columns_number: int, rows_number: int) -> dict[str, object]:
+    """
+    Returns the honeycomb lattice L_x x L_y (both even) with periodic boundaries, 3 neighbours:
+    left, right and up (sites of an even row + column) or down (odd ones), the brick-wall form.
+    """
+    if rows_number%2 or columns_number%2:
+        raise ValueError('a honeycomb lattice must have an even number of rows and columns')
+    sites = np.arange(0, rows_number*columns_number).reshape(rows_number, columns_number)
+    row, column = np.indices(sites.shape)
+    vertical = np.where((row + column)%2 == 0, np.roll(sites, 1, axis=0), np.roll(sites, -1, axis=0))
+    return _geometry('honeycomb', rows_number, columns_number, 3,
+                     [np.roll(sites, 1, axis=1), np.roll(sites, -1, axis=1), vertical])
+
+
+def cubic(lattice_length: int) -> dict[str, object]:
+    """
+    Returns the simple cubic lattice LxLxL with periodic boundaries, 6 neighbours.
+    Its L layers are stacked as L*L rows of L sites: the row z*L + y holds the sites (x, y, z).
+    """
+    sites = np.arange(0, lattice_length**3).reshape(lattice_length, lattice_length, lattice_length)   # sites[z, y, x]
+    return _geometry('cubic', lattice_length*lattice_length, lattice_length, 6,
+                     [np.roll(sites, shift, axis=axis) for axis in (2, 1, 0) for shift in (1, -1)])
+
+
+def geometry(name: str, lattice_length: int, rows_number: int | None = None) -> dict[str, object]:
+    """
+    Returns the lattice of the given name (see GEOMETRIES) of L columns.
+
+    Rectangular, triangular and honeycomb lattices have rows_number rows (L if None), a cubic lattice is LxLxL.
+    """
+    rows_number = rows_number or lattice_length
+    match name:
+        case 'square':
+            return square(lattice_length)
+        case 'rectangular':
+            return rectangular(lattice_length, rows_number)
+        case 'triangular':
+            return triangular(lattice_length, rows_number)
+        case 'honeycomb':
+            return honeycomb(lattice_length, rows_number)
+        case 'cubic':
+            return cubic(lattice_length)
+    raise ValueError('the lattice must be one of ' + ', '.join(GEOMETRIES))
+
+
+def neighbours_sums(geometry: dict[str, object], configuration: list[list[int]]) -> np.ndarray:
+    """Returns sums of the nearest neighbours of every site (row*columns + column), gathered by the CSR table at once."""
+    gathered = np.asarray(configuration, dtype=np.int64).reshape(-1)[geometry['indices']]
+    return np.add.reduceat(gathered, geometry['offsets'][:-1])
+
+
+def bonds(geometry: dict[str, object], configuration: list[list[int]]) -> int:
+    """Returns sum(Si*Sj) over the pairs of the nearest neighbours, every pair counted once."""
+    spins = np.asarray(configuration, dtype=np.int64).reshape(-1)
+    return int(spins@neighbours_sums(geometry, configuration))//2
+
+
+def neighbours_sum(geometry: dict[str, object], configuration: list[list[int]], row: int, column: int) -> int:
+    """Returns the sum of the nearest neighbours of the site, read through the table of neighbours of the geometry."""
+    return sum([configuration[neighbour_row][neighbour_column]
+                for neighbour_row, neighbour_column in geometry['neighbours'][row][column]])
+
+
+def energy(geometry: dict[str, object],
+           configuration: list[list[int]],
+           interaction_parameter: float,
+           external_magnetic_field: float
+          ) -> float:
+    """Returns energy -J*sum(Si*Sj) - h*sum(Si) of a system, every pair of the nearest neighbours counted once."""
+    return -interaction_parameter*bonds(geometry, configuration) - external_magnetic_field*sum([sum(row) for row in configuration])
+
+
+def sweep(geometry: dict[str, object],
+          configuration: list[list[int]],
+          sites: Iterable[tuple[int, int]],
+          uniform: Callable[[], float],
+          table: list[list[float]],
+          metropolis: bool,
+          flips: list[int] | None = None
+         ) -> tuple[int, int]:
+    """
+    Attempts flips of the spins of the given sites one after another, the loop of an MCS.
+
+    Neighbours of a site are read through the table of neighbours of the geometry (the CSR table as rows
+    and columns), without any arithmetic of indices. Square and rectangular lattices, the common case, have
+    their own loop with the sum of the four neighbours written out from the tables of neighbouring rows and columns.
+
+    ### Parameters
+    geometry
+    dict[str, object]
+        The lattice, see the function geometry.
+    configuration
+    list[list[int]]
+        A lattice-wise system of spins, updated in place.
+    sites
+    Iterable[tuple[int, int]]
+        Indices (row, column) of the sites to update, see rng.sites.
+    uniform
+    Callable[[], float]
+        Returns the next uniform variate from [0, 1).
+    table
+    list[list[float]]
+        Probabilities of flips table[spin][neighbours_sum], see utils.acceptance_table.
+    metropolis
+    bool
+        True for the Metropolis test (a probability above 1 accepts without a variate), False for the Glauber one.
+    flips
+    list[int] | None
+        A list receiving the indices row*columns + column of the flipped sites.
+
+    ### Returns
+    int
+        Change of the sum of spins.
+    int
+        Change of the sum of products of the nearest neighbours.
+    """
+    return _SWEEPS.get(geometry['name'], _sweep_table)(geometry, configuration, sites, uniform, table, metropolis, flips)
+
+
+def _geometry(name: str,
+              rows_number: int,
+              columns_number: int,
+              coordination: int,
+              directions: list[np.ndarray]
+             ) -> dict[str, object]:
+    """
+    Returns the lattice of rows x columns of the given arrays of neighbours of the sites, one per direction,
+    as a CSR table, the same table of (row, column) of the neighbours of every site of a configuration
+    and the tables of the neighbouring rows and columns (of the square lattice).
+    """
+    indices = np.stack([direction.reshape(-1) for direction in directions], axis=1).reshape(-1).astype(np.int64)
+    rows, columns = np.arange(0, rows_number), np.arange(0, columns_number)
+    return {'name': name,
+            'shape': (rows_number, columns_number),         # rows and columns of the configuration
+            'nodes': rows_number*columns_number,
+            'coordination': coordination,
+            'offsets': np.arange(0, len(indices) + 1, coordination),   # CSR: neighbours of i are indices[offsets[i]:offsets[i+1]]
+            'indices': indices,
+            'neighbours': np.stack(np.divmod(indices, columns_number), axis=1)
+                            .reshape(rows_number, columns_number, coordination, 2).tolist(),   # [row][column] -> [row, column]s
+            'previous_row': np.roll(rows, 1).tolist(),
+            'next_row': np.roll(rows, -1).tolist(),
+            'previous_column': np.roll(columns, 1).tolist(),
+            'next_column': np.roll(columns, -1).tolist()}
+
+
+def _sweep_square(geometry: dict[str, object],
+                  configuration: list[list[int]],
+                  sites: Iterable[tuple[int, int]],
+                  uniform: Callable[[], float],
+                  table: list[list[float]],
+                  metropolis: bool,
+                  flips: list[int] | None
+                 ) -> tuple[int, int]:
+    """The function sweep for square and rectangular lattices."""
+    up, down = geometry['previous_row'], geometry['next_row']
+    left, right = geometry['previous_column'], geometry['next_column']
+    columns_number = geometry['shape'][1]
+    spin_change, bonds_change = 0, 0
+    for ir, ic in sites:                                # indices of a random row and column
+        spin = configuration[ir][ic]
+        neighbours_sum = configuration[up[ir]][ic] + configuration[ir][right[ic]]\
+                         + configuration[down[ir]][ic] + configuration[ir][left[ic]]
+        probability = table[spin][neighbours_sum]
+
+        if (probability > 1 or uniform() < probability) if metropolis else uniform() <= probability:
+            configuration[ir][ic] = -spin
+            spin_change -= 2*spin
+            bonds_change -= 2*spin*neighbours_sum
+            if flips is not None:
+                flips.append(ir*columns_number + ic)
+    return spin_change, bonds_change
+
+
+def _sweep_table(geometry: dict[str, object],
+                 configuration: list[list[int]],
+                 sites: Iterable[tuple[int, int]],
+                 uniform: Callable[[], float],
+                 table: list[list[float]],
+                 metropolis: bool,
+                 flips: list[int] | None
+                ) -> tuple[int, int]:
+    """The function sweep for any lattice, neighbours of a site read from the table of neighbours of the geometry."""
+    neighbours = geometry['neighbours']
+    columns_number = geometry['shape'][1]
+    spin_change, bonds_change = 0, 0
+    for ir, ic in sites:
+        spin = configuration[ir][ic]
+        neighbours_sum = sum([configuration[row][column] for row, column in neighbours[ir][ic]])
+        probability = table[spin][neighbours_sum]
+
+        if (probability > 1 or uniform() < probability) if metropolis else uniform() <= probability:
+            configuration[ir][ic] = -spin
+            spin_change -= 2*spin
+            bonds_change -= 2*spin*neighbours_sum
+            if flips is not None:
+                flips.append(ir*columns_number + ic)
+    return spin_change, bonds_change
+
+
+_SWEEPS = {'square': _sweep_square,            # loops of the function sweep written out for a geometry, _sweep_table otherwise
+           'rectangular': _sweep_square}
@@ -2,7 +2,7 @@
 The program provide Monte Carlo simulations of 2D Ising model.
 
 COMMAND LINE INTERFACE
-py main.py [-a|--algorithm <string>] [-h|--external-magnetic-field <float>] [--help] [-J|--J|--interaction <float>] [-K|--K|--steps <int>] [-L|--length <int>] [-m0|--initial-magnetization <float>] [-s|--seed <int>] [-sc|--save-configuration [<path>]] [-sm|--save-magnetization [<path>]] [-T*|--temperature-reduced <float>] [-v|--visualization [<char><char>]]
+py main.py [-a|--algorithm <string>] [-b|--burn-in <int>] [-ce|--checkpoint-every <int>] [-cf|--configuration-format <string>] [-cp|--checkpoint <path>] [-ct|--checkpoint-time <float>] [-e|--engine <string>] [-es|--effective-samples <int>] [-fm|--final-modification <float>] [-h|--external-magnetic-field <float>] [--help] [-ic|--initial-configuration <path>] [-J|--J|--interaction <float>] [-K|--K|--steps <int>] [-kf|--keyframe-interval <int>] [-L|--length <int>] [-lt|--lattice <string>] [-Ly|--length-y <int>] [-m0|--initial-magnetization <float>] [-me|--movie-every <int>] [-mf|--movie-format <string>] [-mv|--movie [<path>]] [-ob|--observables] [-pt|--tempering <float>,<float>[,<float>...]] [-R|--replicas <int>] [--resume <path>] [-rs|--random-stream <string>] [-s|--seed <int>] [-sc|--save-configuration [<path>]] [-sf|--save-format <string>] [-sh|--save-histogram [<path>]] [-si|--swap-interval <int>] [-sm|--save-magnetization [<path>]] [-st|--save-trajectory [<path>]] [-T*|--temperature-reduced <float>] [-v|--visualization [<char><char>]] [-w|--workers <int>] [-wn|--windows <int>]
 
 MANUAL
 -a <string>
@@ -10,8 +10,74 @@ MANUAL
     An algorithm used by the Monte Carlo method to computing evolution of the system. Avaliable algorithms:
         <string> == 'metropolis'
         <string> == 'glauber'
+        <string> == 'wolff'         single-cluster flips, magnetization recorded per equivalent MCS
+        <string> == 'swendsen-wang' flips of all clusters of the lattice at every MCS
+        <string> == 'wanglandau'    Wang-Landau sampling of the density of states g(E) in -wn windows of energy (even L,
+                                    h = 0, the 'python' engine, without visualization): the table of E and ln g(E)
+                                    normalized to 2^N states is saved by -sm as "... density of states", and <e>, <e^2>,
+                                    C_v, the free energy f and the entropy s per spin at T* are printed. -K and -m0 are ignored.
     The default is 'glauber'.
 
+-b <int>
+--burn-in <int>
+    Number of the first MCSs <int> skipped by the observables and the histogram (see -sh).
+    The default is 0.
+
+-ce <int>
+--checkpoint-every <int>
+    Saves a checkpoint every <int> MCSs (see -cp), 0 for none.
+    The default is 0.
+
+-cf <string>
+--configuration-format <string>
+    A format of the configurations saved by -sc. Avaliable formats:
+        <string> == 'text'      rows of characters '1' (spin "up") and '0' (spin "down")
+        <string> == 'packed'    a .spins file: a JSON header with L, T*, h, J, K, m0, the algorithm and the seed,
+                                then rows packed a bit per spin (8x smaller, memory-mapped by storage.read_configuration_packed)
+    The default is 'text'.
+
+-cp <path>
+--checkpoint <path>
+    Saves checkpoints of the run to the file <path>: the configuration packed as by -cf 'packed', the state of the random
+    number generator, the MCS, the accumulated observables, the length of the trace of magnetization and all arguments.
+    The file is replaced atomically, every -ce MCSs and every -ct seconds. The trace of magnetization saved by -sm is streamed
+    as .npy during the run (and exported at the end in the text format of -sf 'text').
+    Only for the 'python' engine of the algorithm 'metropolis' or 'glauber'.
+
+-ct <float>
+--checkpoint-time <float>
+    Saves a checkpoint every <float> seconds (see -cp), 0 for none.
+    The default is 300.0.
+
+-e <string>
+--engine <string>
+    An engine executing the algorithm 'metropolis' or 'glauber'. Avaliable engines:
+        <string> == 'python'    random-site updates on lists of spins
+        <string> == 'numpy'     checkerboard updates of whole sublattices on a NumPy array (even L only)
+        <string> == 'multispin' checkerboard updates of R replicas packed into bits of 64-bit words (even L only, no visualization)
+        <string> == 'nfold'     rejection-free n-fold way in continuous time, every iteration flips a spin (for low T*)
+        <string> == 'shared'    checkerboard updates of horizontal strips of the lattice by -w processes on shared memory,
+                                synchronized by a barrier after every colour (even L only, no visualization, for huge L)
+        <string> == 'jit'       random-site updates of the 'python' engine compiled by Numba and cached on disk, the same
+                                trajectories as the 'block' stream of 'python' (no visualization, 'python' if no Numba)
+    The default is 'python'.
+
+-es <int>
+--effective-samples <int>
+    Stops the run when <int> effectively independent samples of |m| and e are collected, -K is then the limit of MCSs
+    (the default 1000000). The equilibration is detected by sequential tests of means of the traces, the integrated
+    autocorrelation time tau_int by FFT, and the effective samples are n/(2 tau_int) of the equilibrated part.
+    At the end the analysis is printed: the equilibrated MCS, tau_int of |m| and e, N_eff, <|m|> and <e> with their errors.
+    The traces are kept as means of blocks of MCSs, at most 131072 blocks, so their memory does not grow with the run.
+    Only for the 'python' engine of the algorithm 'metropolis' or 'glauber'.
+
+-fm <float>
+--final-modification <float>
+    ln f = <float> ending the walks of the Wang-Landau sampling: ln f starts at 1, is halved whenever the histogram
+    of energy is flat and follows 1/t from the time t it falls to it. The error of ln g is about sqrt(ln f),
+    the walks last about (levels of energy)/ln f attempts.
+    The default is 1e-06.
+
 -h <float>
 --external-magnetic-field <float>
     External homogenious magnetic field h = <float> of the system.
@@ -20,6 +86,11 @@ MANUAL
 --help
     Prints that text, without executing the program.
 
+-ic <path>
+--initial-configuration <path>
+    Starts from the configuration saved in the file <path> (either format of -cf) instead of a random one.
+    L is taken from the file, m0 only names the saved files.
+
 -J <float>
 --J <float>
 --interaction <float>
@@ -32,19 +103,97 @@ MANUAL
     Number of desired MCSs (iterations) K == <int>.
     The default is 400.
 
+-kf <int>
+--keyframe-interval <int>
+    Number of MCSs <int> between keyframes of the trajectory saved by -st.
+    The default is 100.
+
 -L <int>
 --length <int>
     A length L=<int> of the lattice LxL in the system of spins.
     The default is 40.
 
+-lt <string>
+--lattice <string>
+    A lattice of the system with periodic boundaries. Avaliable lattices:
+        <string> == 'square'        L x L, 4 neighbours
+        <string> == 'rectangular'   L x Ly (columns x rows), 4 neighbours
+        <string> == 'triangular'    L x Ly, 6 neighbours (the square ones and the diagonal up-right and down-left)
+        <string> == 'honeycomb'     L x Ly (both even), 3 neighbours (a brick wall: left, right and up or down)
+        <string> == 'cubic'         L x L x L, 6 neighbours, saved as L*L rows (L layers of L rows)
+    Neighbours are read through tables of neighbouring rows and columns built once per run. Lattices other than
+    'square' run only the 'python' engine of 'metropolis' or 'glauber', without -ic, -cf 'packed', -cp, -mv, -pt, -sh,
+    -st and -v, and their names of saved files carry the lattice after the algorithm.
+    The default is 'square'.
+
+-Ly <int>
+--length-y <int>
+    Number of rows Ly = <int> of the 'rectangular', 'triangular' and 'honeycomb' lattices.
+    The default is L.
+
 -m0 <float>
 --initial-magnetization <float>
     Initiated magnetization m = <float>.
     The default is 0.0
 
+-me <int>
+--movie-every <int>
+    Number of MCSs <int> between frames of the movie saved by -mv.
+    The default is 1.
+
+-mf <string>
+--movie-format <string>
+    A format of the movie saved by -mv:
+        <string> == 'gif'           an animated GIF "... movie (<n>).gif" of 1-bit frames
+        <string> == 'png'           PNG frames "... movie MCS <mcs> (<n>).png"
+    The default is 'gif'.
+
+-mv [<path>]
+--movie [<path>]
+    During the simulation frames of the lattice (a pixel per spin, scaled up to at least 256 pixels) are encoded
+    by a background process into a movie in a given directory <path>, and at the end the plot of magnetization
+    m(t) [MCS] is saved there as ".svg". An alternative to -v, a frame costs the simulation only a copy of the lattice
+    (below a tenth of an MCS), so frames every few MCSs (-me) cost a few percent of the simulation time. At most 64 frames
+    wait for the encoder, then the simulation waits too.
+    Only for the 'python' engine of the algorithm 'metropolis' or 'glauber'.
+    The dafault is "./" (the path of this module).
+
+-ob
+--observables
+    Accumulates moments of magnetization m and energy per spin e after every MCS, without storing them,
+    and prints <|m|>, <m^2>, <m^4>, <e>, <e^2>, the susceptibility chi, the heat capacity C_v and the Binder cumulant U_L per spin.
+    Only for the 'python' engine of the algorithm 'metropolis' or 'glauber'.
+
+-pt <float>,<float>[,<float>...]
+--tempering <float>,<float>[,<float>...]
+    Turns on parallel tempering: a replica per reduced temperature of the ladder, evolved by the 'python' engine
+    of the algorithm 'metropolis' or 'glauber', swaps the configuration with a neighbouring temperature every <swap-interval> MCSs.
+    The replica of the temperature r starts from a system initiated with the seed <seed> + r, T* is ignored.
+    Acceptance rates of swaps are printed, results of every temperature are saved.
+
+-R <int>
+--replicas <int>
+    Number R = <int> of replicas simulated at once by the 'multispin' engine, 1 <= R <= 64.
+    The replica r starts from a system initiated with the seed <seed> + r, results of every replica are saved.
+    The default is 64.
+
+--resume <path>
+    Continues the run saved in the checkpoint <path> with the arguments of that run, the other given arguments are ignored.
+    The resumed run ends exactly as the uninterrupted one would. A finished run marks its checkpoint as completed,
+    such a checkpoint (or one whose trace or trajectory is missing) is refused.
+
+-rs <string>
+--random-stream <string>
+    A supply of random numbers for the 'python' and 'nfold' engines ('block' only for 'swendsen-wang'). Avaliable streams:
+        <string> == 'block'     a NumPy generator on the counter-based Philox drawing all random numbers of an MCS at once
+        <string> == 'legacy'    the generator of module "random", reproducing old runs bit for bit
+    The default is 'block'.
+
 -s <int>
 --seed <int>
-    A seed <int> for the random number generator in module "random".
+    A seed <int> for the random number generator. Every engine draws from counter-based streams (Philox) keyed
+    by the seed and stable indices of parts of the run (rows of strips, rounds and temperatures of parallel tempering,
+    windows of energy), so results do not depend on the number of workers.
     The default is 255.
 
 -sc [<path>]
@@ -52,11 +201,39 @@ MANUAL
     At the end of the simulation the configuration of spins S[ij] will be saved in a given directory <path>.
     The dafault is "./".
 
+-sf <string>
+--save-format <string>
+    A format of the evolution of magnetization saved by -sm. Avaliable formats:
+        <string> == 'text'      a value per line, written at the end of the simulation
+        <string> == 'npy'       a .npy file of float64, the 'python' engine of 'metropolis' and 'glauber' streams it
+                                in chunks during the simulation (memory bounded for any K, readable by numpy.load meanwhile)
+        <string> == 'npy32'     as 'npy', of float32
+    The default is 'text'.
+
+-sh [<path>]
+--save-histogram [<path>]
+    At the end of the simulation the joint histogram of energy and magnetization of the MCSs after the burn-in (-b)
+    will be saved in a given directory <path> as ".npz", for reweighting to other temperatures by "py reweighting.py".
+    Only for the 'python' engine of the algorithm 'metropolis' or 'glauber'.
+    The dafault is "./" (the path of this module).
+
+-si <int>
+--swap-interval <int>
+    Number of MCSs <int> between attempts to swap replicas of parallel tempering.
+    The default is 10.
+
 -sm [<path>]
 --save-magnetization [<path>]
     At the end of the simulation the time-dependent evolution of magnetization m(t) [MCS] of the system will be saved in a given directory <path>. 
     The dafault is "./" (the path of this module).
 
+-st [<path>]
+--save-trajectory [<path>]
+    During the simulation the trajectory of the system will be saved in a given directory <path> as a log ".trj" of keyframes,
+    whole configurations every -kf MCSs, and of sites flipped in every other MCS. Any MCS is replayed by "py replay.py".
+    Only for the 'python' engine of the algorithm 'metropolis' or 'glauber'.
+    The dafault is "./" (the path of this module).
+
 -T* <float>
 --temperature-reduced <float>
     Reduced temperature T* = <float> of the system, where T*=1/(J x Beta).
@@ -64,24 +241,194 @@ MANUAL
 
 -v [<char><char>]
 --visualization [<char><char>]
-    Turns on the visual evolution of the system. <char><char> is a pair of characters that represents spin "up" and spin "down". The total time of execution will increase.
+    Turns on the visual evolution of the system. <char><char> is a pair of characters that represents spin "up" and spin "down".
+    Frames are drawn in the background at most 30 times per second, redrawing only changed cells. A lattice larger
+    than the terminal is shown in blocks of spins, every block by the marker of its majority.
     The default pair is U+0020, U+2588.
+
+-w <int>
+--workers <int>
+    Number of processes <int> evolving replicas of parallel tempering, strips of the lattice of the 'shared' engine
+    (at most L/2) or walking windows of the Wang-Landau sampling.
+    The default is the number of CPUs.
+
+-wn <int>
+--windows <int>
+    Number of windows of energy <int> of the Wang-Landau sampling, walked in parallel by -w processes.
+    Neighbouring windows share half of their levels, and are stitched at the level where the slopes of ln g agree best.
+    The default is 1.
 """
-def generate_spin(probability: float) -> int:
+import random
+
+import core_glauber
+import core_metropolis
+import core_swendsen_wang
+import core_wanglandau
+import core_wolff
+import engine_jit
+import engine_multispin
+import engine_nfold
+import engine_numpy
+import engine_shared
+import lattice
+import storage
+
+
+def generate_spin(probability: float, generator: random.Random = random) -> int:
     """Return a spin 'up' with the given probability."""
-    if random.random() <= probability:
+    if generator.random() <= probability:
         return 1
     return -1
 
 
+def initial_configuration(lattice_length: int,
+                          magnetization0: float,
+                          seed: int,
+                          rows_number: int | None = None
+                         ) -> list[list[int]]:
+    """Returns a random system of spins L x L (rows_number x L if given) with the expected magnetization m0."""
+    generator = random.Random(seed)             # the stream of the old runs, without the global state of "random"
+    up_probability = (magnetization0 + 1)/2     # probability of initiation a spin as "up"
+
+    config = []                                 # a system of spins
+    for row in range(0, rows_number or lattice_length):
+        config.append([])
+        for column in range(0, lattice_length):
+            config[-1].append(generate_spin(up_probability, generator))
+
+    return config
+
+
+def evolve(configs: list[list[list[int]]],
+           mcss: int,
+           red_temperature: float,
+           emf: float,
+           beta: float,
+           seed: int,
+           algorithm: str,
+           engine: str,
+           random_stream: str,
+           visualization: tuple[str, str] | None,
+           accumulator: dict[str, float] | None = None,
+           trace: storage.MagnetizationWriter | None = None,
+           checkpoint: dict[str, object] | None = None,
+           trajectory: dict[str, object] | None = None,
+           movie: dict[str, object] | None = None,
+           monitor: dict[str, object] | None = None,
+           histogram: dict[str, object] | None = None,
+           geometry: dict[str, object] | None = None,
+           workers: int = 1
+          ) -> tuple[list[list[list[int]]], list[list[float]]]:
+    """
+    Evolves the initial systems with the choosen algorithm and engine, returns their final configurations and magnetizations.
+
+    Only the 'multispin' engine evolves all of the systems, the others evolve the first one.
+    The 'shared' engine splits the lattice among the given number of worker processes.
+    The accumulator of observables, the streamed trace of magnetization, checkpoints, the log of the trajectory,
+    the movie, the monitor of effective samples, the histogram and lattices other than the square one (see lattice.geometry)
+    are handled by the 'python' engine of 'metropolis' and 'glauber' only.
+    """
+    config = configs[0]
+
+    # algorithms split to several forms to save the time
+    magnetization = ...
+    magnetizations = ...
+    match algorithm:
+        case "metropolis" | "glauber" if engine == "multispin":
+            if emf == 0.0:
+                configs, magnetizations = engine_multispin.mc_raw(configs, mcss, red_temperature, beta, seed, algorithm)
+            else:
+                configs, magnetizations = engine_multispin.mc_h(configs, mcss, red_temperature, emf, beta, seed, algorithm)
+        case "metropolis" | "glauber" if engine == "numpy":
+            if visualization:
+                if emf == 0.0:
+                    config, magnetization = engine_numpy.mc_v(config, mcss, red_temperature, beta, seed, algorithm, visualization)
+                else:
+                    config, magnetization = engine_numpy.mc_h_v(config, mcss, red_temperature, emf, beta, seed, algorithm, visualization)
+            else:
+                if emf == 0.0:
+                    config, magnetization = engine_numpy.mc_raw(config, mcss, red_temperature, beta, seed, algorithm)
+                else:
+                    config, magnetization = engine_numpy.mc_h(config, mcss, red_temperature, emf, beta, seed, algorithm)
+        case "metropolis" | "glauber" if engine == "shared":
+            if emf == 0.0:
+                config, magnetization = engine_shared.mc_raw(config, mcss, red_temperature, beta, seed, algorithm, workers)
+            else:
+                config, magnetization = engine_shared.mc_h(config, mcss, red_temperature, emf, beta, seed, algorithm, workers)
+        case "metropolis" | "glauber" if engine == "jit":
+            if emf == 0.0:
+                config, magnetization = engine_jit.mc_raw(config, mcss, red_temperature, beta, seed, algorithm)
+            else:
+                config, magnetization = engine_jit.mc_h(config, mcss, red_temperature, emf, beta, seed, algorithm)
+        case "metropolis" | "glauber" if engine == "nfold":
+            if visualization:
+                if emf == 0.0:
+                    config, magnetization = engine_nfold.mc_v(config, mcss, red_temperature, beta, seed, algorithm, visualization, random_stream)
+                else:
+                    config, magnetization = engine_nfold.mc_h_v(config, mcss, red_temperature, emf, beta, seed, algorithm, visualization, random_stream)
+            else:
+                if emf == 0.0:
+                    config, magnetization = engine_nfold.mc_raw(config, mcss, red_temperature, beta, seed, algorithm, random_stream)
+                else:
+                    config, magnetization = engine_nfold.mc_h(config, mcss, red_temperature, emf, beta, seed, algorithm, random_stream)
+        case "metropolis" if visualization:
+            if emf == 0.0:
+                config, magnetization = core_metropolis.mc_v(config, mcss, red_temperature, beta, seed, visualization, random_stream, accumulator, trace, checkpoint, trajectory, movie, monitor, histogram, geometry)
+            else:
+                config, magnetization = core_metropolis.mc_h_v(config, mcss, red_temperature, emf, beta, seed, visualization, random_stream, accumulator, trace, checkpoint, trajectory, movie, monitor, histogram, geometry)
+        case "metropolis" if not visualization:
+            if emf == 0.0:
+                config, magnetization = core_metropolis.mc_raw(config, mcss, red_temperature, beta, seed, random_stream, accumulator, trace, checkpoint, trajectory, movie, monitor, histogram, geometry)
+            else:
+                config, magnetization = core_metropolis.mc_h(config, mcss, red_temperature, emf, beta, seed, random_stream, accumulator, trace, checkpoint, trajectory, movie, monitor, histogram, geometry)
+        case "glauber" if visualization:
+            if emf == 0.0:
+                config, magnetization = core_glauber.mc_v(config, mcss, red_temperature, beta, seed, visualization, random_stream, accumulator, trace, checkpoint, trajectory, movie, monitor, histogram, geometry)
+            else:
+                config, magnetization = core_glauber.mc_h_v(config, mcss, red_temperature, emf, beta, seed, visualization, random_stream, accumulator, trace, checkpoint, trajectory, movie, monitor, histogram, geometry)
+        case "glauber" if not visualization:
+            if emf == 0.0:
+                config, magnetization = core_glauber.mc_raw(config, mcss, red_temperature, beta, seed, random_stream, accumulator, trace, checkpoint, trajectory, movie, monitor, histogram, geometry)
+            else:
+                config, magnetization = core_glauber.mc_h(config, mcss, red_temperature, emf, beta, seed, random_stream, accumulator, trace, checkpoint, trajectory, movie, monitor, histogram, geometry)
+        case "wolff" if visualization:
+            if emf == 0.0:
+                config, magnetization = core_wolff.mc_v(config, mcss, red_temperature, beta, seed, visualization, random_stream)
+            else:
+                config, magnetization = core_wolff.mc_h_v(config, mcss, red_temperature, emf, beta, seed, visualization, random_stream)
+        case "wolff" if not visualization:
+            if emf == 0.0:
+                config, magnetization = core_wolff.mc_raw(config, mcss, red_temperature, beta, seed, random_stream)
+            else:
+                config, magnetization = core_wolff.mc_h(config, mcss, red_temperature, emf, beta, seed, random_stream)
+        case "swendsen-wang" if visualization:
+            if emf == 0.0:
+                config, magnetization = core_swendsen_wang.mc_v(config, mcss, red_temperature, beta, seed, visualization)
+            else:
+                config, magnetization = core_swendsen_wang.mc_h_v(config, mcss, red_temperature, emf, beta, seed, visualization)
+        case "swendsen-wang" if not visualization:
+            if emf == 0.0:
+                config, magnetization = core_swendsen_wang.mc_raw(config, mcss, red_temperature, beta, seed)
+            else:
+                config, magnetization = core_swendsen_wang.mc_h(config, mcss, red_temperature, emf, beta, seed)
+
+    if engine != "multispin":
+        configs, magnetizations = [config], [magnetization]
+    return configs, magnetizations
+
+
 if __name__ == '__main__':
     import os
-    import random
     import sys
     
+    import analysis
+    import checkpoints
     import init
-    import core_metropolis
-    import core_glauber
+    import movies
+    import observables
+    import reweighting
+    import tempering
+    import trajectories
 
     argv = sys.argv
 
@@ -89,101 +436,231 @@ if __name__ == '__main__':
         print(init.DOCS)
         sys.exit()
 
+    # a resumed run takes its arguments from the checkpoint
+    resume_path = init.resume_path_from(argv)
+    resumed = None
+    if resume_path:
+        resumed, resumed_config = checkpoints.load(resume_path)
+        checkpoints.check(resumed)
+        argv = resumed['argv']
+
     # initializing parameters
     seed = init.seed_from(argv)                                         # for random trajectories
     lattice_length = init.lattice_length_from(argv)                     # length of the lattice
+    lattice_name = init.lattice_from(argv)                              # geometry of the lattice
+    length_y = init.length_y_from(argv)                                 # number of rows of the lattice
     red_temperature = init.reduced_temperature_from(argv)               # reduced temperature T*
     emf = init.external_magnetic_field_from(argv)                       # external magnetic field h
     interaction = init.interaction_from(argv)                           # interaction parameter
     mcss = init.mcss_from(argv)                                         # number of Monte Carlo steps
     magnetization0 = init.initial_magnetization_from(argv)              # initial value of magnetization of the system
     algorithm = init.algorithm_from(argv)                               # an algorithm for computing the Monte Carlo method
+    engine = init.engine_from(argv)                                     # an engine executing the algorithm
+    random_stream = init.random_stream_from(argv)                       # a supply of random numbers
+    replicas = init.replicas_from(argv)                                 # number of replicas for the multispin engine
+    ladder = init.tempering_ladder_from(argv)                           # reduced temperatures of parallel tempering
+    swap_interval = init.swap_interval_from(argv)                       # MCSs between swaps of parallel tempering
+    workers = init.workers_from(argv)                                   # number of worker processes
+    burn_in = init.burn_in_from(argv)                                   # MCSs skipped by the observables
+    accumulate = init.observables_from(argv)                            # whether to accumulate the observables
     visualization = init.visualization_markers_from(argv)               # markers for visualize evolution of the system
     save_configuration_dir = init.save_configuration_path_from(argv)    # path to save final spins configuration
     save_magnetization_dir = init.save_magnetization_path_from(argv)    # path to save magnetization
+    save_format = init.save_format_from(argv)                           # format of saved magnetization
+    configuration_format = init.configuration_format_from(argv)         # format of saved configurations
+    initial_path = init.initial_configuration_path_from(argv)           # path to the initial configuration
+    checkpoint_path = init.checkpoint_path_from(argv)                   # path to save checkpoints
+    checkpoint_every = init.checkpoint_every_from(argv)                 # MCSs between checkpoints
+    checkpoint_time = init.checkpoint_time_from(argv)                   # seconds between checkpoints
+    save_trajectory_dir = init.save_trajectory_path_from(argv)          # path to save the log of the trajectory
+    keyframe_interval = init.keyframe_interval_from(argv)               # MCSs between keyframes of the trajectory
+    movie_dir = init.movie_path_from(argv)                              # path to save the movie
+    movie_format = init.movie_format_from(argv)                         # format of the movie
+    movie_every = init.movie_every_from(argv)                           # MCSs between frames of the movie
+    effective_samples = init.effective_samples_from(argv)               # effective samples stopping the run
+    save_histogram_dir = init.save_histogram_path_from(argv)            # path to save the histogram
+    windows_number = init.windows_from(argv)                            # windows of energy of the Wang-Landau sampling
+    final_modification = init.final_modification_from(argv)             # ln f ending the Wang-Landau sampling
+
+    if effective_samples and not any(arg in argv for arg in ['-K', '--K', '--steps']):
+        mcss = 1000000                                                  # the limit of a run stopped by the samples
 
     beta = 1/interaction/red_temperature            # 1/(k_BT)
+    dtype = 'float32' if save_format == 'npy32' else 'float64'     # type of values in .npy files
 
-    # initializing a system of spins
-    random.seed(seed)
-    up_probability = (magnetization0 + 1)/2     # probability of initiation a spin as "up"
+    if ladder and (algorithm not in ["metropolis", "glauber"] or engine != "python" or visualization):
+        raise ValueError('parallel tempering runs only the \'python\' engine of \'metropolis\' or \'glauber\', without visualization')
 
-    config = []                                 # a system of spins
-    for row in range(0, lattice_length):
-        config.append([])
-        for column in range(0, lattice_length):
-            config[-1].append(generate_spin(up_probability))
+    options = [option for option, given in (('-ob', accumulate), ('-cp', checkpoint_path), ('-st', save_trajectory_dir),
+                                            ('-mv', movie_dir), ('-es', effective_samples), ('-sh', save_histogram_dir))
+               if given]
+    if options and (algorithm not in ["metropolis", "glauber"] or engine != "python" or ladder):
+        raise ValueError(''.join(['the options ', ', '.join(options), ' run only with the \'python\' engine of \'metropolis\' or \'glauber\', without -pt']))
+
+    if save_histogram_dir and checkpoint_path:
+        raise ValueError('a run saving the histogram can not save checkpoints')
+    if effective_samples and checkpoint_path:
+        raise ValueError('a run stopped by effective samples can not save checkpoints')
+    if lattice_name != "square" and (algorithm not in ["metropolis", "glauber"] or engine != "python" or ladder or visualization
+                                     or initial_path or configuration_format == 'packed' or checkpoint_path or movie_dir
+                                     or save_histogram_dir or save_trajectory_dir):
+        raise ValueError('lattices other than \'square\' run only the \'python\' engine of \'metropolis\' or \'glauber\', without -ic, -cf \'packed\', -cp, -mv, -pt, -sh, -st and -v')
+    if algorithm == "wanglandau" and (engine != "python" or visualization or emf != 0.0 or lattice_length%2 or resumed):
+        raise ValueError('the Wang-Landau sampling runs only the \'python\' engine for even L and h = 0, without visualization')
+    if random_stream == "legacy" and engine in ["numpy", "multispin", "shared", "jit"]:
+        raise ValueError('the stream \'legacy\' is drawn only by the \'python\' and \'nfold\' engines')
+    if algorithm in ["wolff", "swendsen-wang"] and engine != "python":
+        raise ValueError('the cluster algorithms \'wolff\' and \'swendsen-wang\' run only the \'python\' engine')
+    if algorithm == "swendsen-wang" and random_stream == "legacy":
+        raise ValueError('the Swendsen-Wang algorithm draws only the \'block\' stream')
+    if visualization and engine in ["multispin", "shared", "jit"]:
+        raise ValueError('the engines \'multispin\', \'shared\' and \'jit\' run without visualization')
+
+    # initializing the lattice, the square one is built by the core functions
+    geometry = None
+    label = algorithm                               # the algorithm and the lattice in names of saved files
+    if lattice_name != "square":
+        geometry = lattice.geometry(lattice_name, lattice_length, length_y)
+        label = ''.join([algorithm, ' ', lattice_name] + ([' Ly', str(geometry['shape'][0])] if lattice_name != "cubic" else []))
+    nodes_number = geometry['nodes'] if geometry else lattice_length*lattice_length
+
+    # initializing systems of spins, replicas differ only in the seed
+    systems_number = len(ladder) if ladder else replicas if engine == "multispin" else 1
+    if resumed:
+        lattice_length = len(resumed_config)
+        configs = [resumed_config]
+    elif initial_path:
+        loaded = storage.load_configuration(initial_path)
+        lattice_length = len(loaded)
+        configs = [[row[:] for row in loaded] for replica in range(0, systems_number)]
+    else:
+        configs = [initial_configuration(lattice_length, magnetization0, seed + replica, geometry['shape'][0] if geometry else None)
+                   for replica in range(0, systems_number)]
 
     # general processing
-    # algorithms split to several forms to save the time
-    magnetization = ...
-    match algorithm:
-        case "metropolis" if visualization:
-            if emf == 0.0:
-                config, magnetization = core_metropolis.mc_v(config, mcss, red_temperature, beta, seed, visualization)
-            else:
-                config, magnetization = core_metropolis.mc_h_v(config, mcss, red_temperature, emf, beta, seed, visualization)
-        case "metropolis" if not visualization:
-            if emf == 0.0:
-                config, magnetization = core_metropolis.mc_raw(config, mcss, red_temperature, beta, seed)
-            else:
-                config, magnetization = core_metropolis.mc_h(config, mcss, red_temperature, emf, beta, seed)
-        case "glauber" if visualization:
-            if emf == 0.0:
-                config, magnetization = core_glauber.mc_v(config, mcss, red_temperature, beta, seed, visualization)
+    trace = None
+    if ladder:
+        if emf == 0.0:
+            configs, magnetizations, swap_rates = tempering.mc_raw(configs, mcss, ladder, interaction, seed, algorithm, swap_interval, workers, random_stream)
+        else:
+            configs, magnetizations, swap_rates = tempering.mc_h(configs, mcss, ladder, interaction, emf, seed, algorithm, swap_interval, workers, random_stream)
+        for temperature, next_temperature, rate in zip(ladder, ladder[1:], swap_rates):
+            print(''.join(['T* ', str(temperature), ' <-> ', str(next_temperature), ': swap acceptance ', str(round(rate, 4))]))
+    elif algorithm == "wanglandau":
+        bonds, ln_g, window_mcss = core_wanglandau.density_of_states(lattice_length, windows_number, final_modification,
+                                                                     seed, workers, random_stream)
+        for window, window_mcs in enumerate(window_mcss):
+            print(''.join(['window ', str(window), ': MCSs ', str(window_mcs)]))
+        for name, value in core_wanglandau.thermodynamics(bonds, ln_g, lattice_length, red_temperature, interaction).items():
+            print(''.join([name, ' ', str(value)]))
+        if save_magnetization_dir:
+            file_name = storage.file_name(lattice_length, red_temperature, emf, interaction, mcss, magnetization0,
+                                          algorithm, 'density of states')
+            storage.save_summary(storage.free_path(save_magnetization_dir, file_name),
+                                 core_wanglandau.table(bonds, ln_g, interaction))
+        configs, magnetizations = [], []          # nothing else to save
+    else:
+        accumulator = None
+        if accumulate:
+            accumulator = resumed['accumulator'] if resumed else observables.accumulator(burn_in)
+
+        parameters = {'L': lattice_length, 'T*': red_temperature, 'h': emf, 'J': interaction, 'K': mcss,
+                      'm0': magnetization0, 'algorithm': algorithm, 'random_stream': random_stream, 'seed': seed}
+        checkpoint = None
+        if checkpoint_path:
+            checkpoint = checkpoints.schedule(checkpoint_path, checkpoint_every, checkpoint_time, argv, parameters, resumed)
+
+        trajectory = None
+        if save_trajectory_dir:
+            if resumed and resumed['trajectory_path']:
+                trajectory = trajectories.recorder(resumed['trajectory_path'], configs[0], keyframe_interval, parameters,
+                                                   resume_at=resumed['trajectory_length'])
             else:
-                config, magnetization = core_glauber.mc_h_v(config, mcss, red_temperature, emf, beta, seed, visualization)
-        case "glauber" if not visualization:
-            if emf == 0.0:
-                config, magnetization = core_glauber.mc_raw(config, mcss, red_temperature, beta, seed)
+                file_name = storage.file_name(lattice_length, red_temperature, emf, interaction, mcss, magnetization0,
+                                              label, 'trajectory')
+                trajectory = trajectories.recorder(storage.free_path(save_trajectory_dir, file_name, '.trj'), configs[0],
+                                                   keyframe_interval, parameters)
+
+        monitor = analysis.monitor(effective_samples) if effective_samples else None
+        histogram = None
+        if save_histogram_dir:
+            histogram = reweighting.histogram(burn_in, lattice_length, red_temperature, interaction, emf)
+
+        movie = None
+        if movie_dir:
+            file_name = storage.file_name(lattice_length, red_temperature, emf, interaction, mcss, magnetization0,
+                                          label, 'movie')
+            movie = movies.recorder(movie_dir, file_name, configs[0], movie_every, movie_format,
+                                    resumed['mcs'] if resumed else 0)
+
+        # the 'python' engine of 'metropolis' and 'glauber' streams magnetization into the file during the run,
+        # also in the text format if checkpoints are saved (the text is exported at the end)
+        if save_magnetization_dir and (save_format != 'text' or checkpoint_path) \
+           and algorithm in ["metropolis", "glauber"] and engine == "python":
+            if resumed and resumed['trace_path']:
+                trace = storage.MagnetizationWriter(resumed['trace_path'], dtype, resume_at=resumed['trace_length'])
             else:
-                config, magnetization = core_glauber.mc_h(config, mcss, red_temperature, emf, beta, seed)
+                file_name = storage.file_name(lattice_length, red_temperature, emf, interaction, mcss, magnetization0,
+                                              label, 'magnetization')
+                trace = storage.MagnetizationWriter(storage.free_path(save_magnetization_dir, file_name, '.npy'), dtype)
 
+        try:
+            configs, magnetizations = evolve(configs, mcss, red_temperature, emf, beta, seed, algorithm, engine, random_stream, visualization, accumulator, trace, checkpoint, trajectory, movie, monitor, histogram, geometry, workers)
+        finally:
+            if trace is not None:
+                trace.close()
+            if trajectory is not None:
+                trajectories.close(trajectory)
+            if movie is not None:
+                movies.close(movie)
+        if movie is not None:
+            file_name = storage.file_name(lattice_length, red_temperature, emf, interaction, mcss, magnetization0,
+                                          label, 'magnetization')
+            movies.save_plot(storage.free_path(movie_dir, file_name, '.svg'),
+                             storage.read_magnetization_npy(trace.file_path) if trace is not None else magnetizations[0])
+        if accumulate:
+            for name, value in observables.thermodynamics(accumulator, beta, nodes_number).items():
+                print(''.join([name, ' ', str(value)]))
+        if histogram is not None:
+            file_name = storage.file_name(lattice_length, red_temperature, emf, interaction, mcss, magnetization0,
+                                          label, 'histogram')
+            reweighting.save(storage.free_path(save_histogram_dir, file_name, '.npz'), histogram)
+        if monitor is not None:
+            print(''.join(['MCSs ', str(monitor['samples'])]))
+            for name, value in analysis.analyse(monitor).items():
+                print(''.join([name, ' ', str(value)]))
+    temperatures = ladder if ladder else [red_temperature]*len(configs)
 
-    # saving the configuration of spins
+    # saving the configurations of spins
     if save_configuration_dir:
-        file_name = ''.join(['L', str(lattice_length),
-                             'Tred', str(red_temperature),
-                             'h', str(emf),
-                             'J', str(interaction),
-                             'K', str(mcss),
-                             'm', str(magnetization0),
-                             algorithm,
-                             ' configuration'])
-        file_path = "".join([save_configuration_dir, file_name, ' (1)'])
-        file_name_counter = 1
-        while os.path.isfile(file_path):
-            file_name_counter += 1
-            file_path = ''.join([save_configuration_dir,
-                                 file_name,
-                                 ' (', str(file_name_counter), ')'])
-        with open(file_path, 'w', encoding='UTF-8') as file:
-            for row in config:
-                for spin in row:
-                    if spin > 0:
-                        file.write('1')
-                    else:
-                        file.write('0')
-                file.write('\n')
-
-    # saving the evolution of magnetization
+        for config, temperature in zip(configs, temperatures):
+            file_name = storage.file_name(lattice_length, temperature, emf, interaction, mcss, magnetization0,
+                                          label, 'configuration')
+            if configuration_format == 'packed':
+                header = {'T*': temperature, 'h': emf, 'J': interaction, 'K': mcss, 'm0': magnetization0,
+                          'algorithm': algorithm, 'seed': seed}
+                storage.save_configuration_packed(storage.free_path(save_configuration_dir, file_name, '.spins'),
+                                                  config, header)
+            else:
+                storage.save_configuration(storage.free_path(save_configuration_dir, file_name), config)
+
+    # saving the evolutions of magnetization
     if save_magnetization_dir:
-        file_name = ''.join(['L', str(lattice_length),
-                             'Tred', str(red_temperature),
-                             'h', str(emf),
-                             'J', str(interaction),
-                             'K', str(mcss),
-                             'm', str(magnetization0),
-                             algorithm,
-                             ' magnetization'])
-        file_path = ''.join([save_magnetization_dir, file_name, ' (1)'])
-        file_name_counter = 1
-        while os.path.isfile(file_path):
-            file_name_counter += 1
-            file_path = ''.join([save_magnetization_dir,
-                                 file_name,
-                                 ' (', str(file_name_counter), ')'])
-        with open(file_path, 'w', encoding='UTF-8') as file:
-            for m in magnetization:
-                file.write(str(m) + '\n')
+        for magnetization, temperature in zip(magnetizations, temperatures):
+            if magnetization is trace and save_format != 'text':
+                continue        # already streamed
+            file_name = storage.file_name(lattice_length, temperature, emf, interaction, mcss, magnetization0,
+                                          label, 'magnetization')
+            if magnetization is trace:
+                storage.export_magnetization_text(trace.file_path, storage.free_path(save_magnetization_dir, file_name))
+                os.remove(trace.file_path)
+            elif save_format == 'text':
+                storage.save_magnetization(storage.free_path(save_magnetization_dir, file_name), magnetization)
+            else:
+                storage.save_magnetization_npy(storage.free_path(save_magnetization_dir, file_name, '.npy'),
+                                               magnetization, dtype)
+
+    # the results are saved, the run is not to be resumed
+    if checkpoint_path:
+        checkpoints.complete(checkpoint)
 
@@ -0,0 +1,245 @@
+"""Offscreen recording of the evolution of the 2D Ising model: PNG frames or an animated GIF, and plots of magnetization."""
+import multiprocessing
+from queue import Full
+import struct
+import zlib
+
+import numpy as np
+
+import storage
+
+COLOURS = ((0, 0, 0), (255, 255, 255))     # colours of spins "down" and "up"
+MIN_SIDE = 256                              # smaller frames are scaled up by an integer factor
+GIF_DELAY = 5                               # hundredths of a second between frames of a GIF
+QUEUE_FRAMES = 64                           # frames waiting for the background process at most
+
+
+def recorder(directory: str,
+             file_name: str,
+             configuration: list[list[int]],
+             every: int,
+             movie_format: str,
+             mcs: int = 0
+            ) -> dict[str, object]:
+    """
+    Returns a recorder of a movie to pass to the core functions, its first frame is the given configuration.
+
+    Frames are packed a bit per spin and handed to a background process, which encodes them,
+    so the simulation waits only for the copy of the lattice. When the process falls QUEUE_FRAMES frames
+    behind (frequent frames of a large lattice), the simulation waits for it, so the memory stays bounded.
+
+    ### Parameters
+    directory
+    str
+        A directory of the movie.
+    file_name
+    str
+        A name of the movie, see storage.file_name.
+    configuration
+    list[list[int]]
+        The initial configuration.
+    every
+    int
+        Number of MCSs between frames.
+    movie_format
+    str
+        "gif" - an animated GIF "<file_name> (<n>).gif" with 1-bit frames,
+        "png" - PNG frames "<file_name> MCS <mcs> (<n>).png".
+    mcs
+    int
+        MCS of the initial configuration.
+
+    ### Returns
+    dict[str, object]
+        The recorder.
+    """
+    queue = multiprocessing.Queue(maxsize=QUEUE_FRAMES)
+    process = multiprocessing.Process(target=_encode,
+                                      args=(queue, directory, file_name, len(configuration), movie_format),
+                                      daemon=True)
+    process.start()
+
+    movie = {'every': every, 'queue': queue, 'process': process}
+    _put(movie, mcs, configuration)
+    return movie
+
+
+def capture(movie: dict[str, object], mcs: int, configuration: list[list[int]]) -> None:
+    """Hands the configuration after the MCS to the background process, if a frame is due."""
+    if mcs % movie['every'] == 0:
+        _put(movie, mcs, configuration)
+
+
+def close(movie: dict[str, object]) -> None:
+    """Waits until the background process encodes all frames and closes the movie."""
+    _hand(movie, None)
+    movie['process'].join()
+
+
+def png(bits: np.ndarray) -> bytes:
+    """Returns a PNG image of a 2-colour palette (COLOURS) of an array of bits 0 and 1."""
+    height, width = bits.shape
+    rows = np.packbits(bits, axis=1)
+    scanlines = np.hstack([np.zeros((height, 1), dtype=np.uint8), rows])       # filter "none" of every row
+    chunks = [(b'IHDR', struct.pack('>IIBBBBB', width, height, 1, 3, 0, 0, 0)),
+              (b'PLTE', bytes([value for colour in COLOURS for value in colour])),
+              (b'IDAT', zlib.compress(scanlines.tobytes(), 9)),
+              (b'IEND', b'')]
+    return b'\x89PNG\r\n\x1a\n' + b''.join([struct.pack('>I', len(data)) + tag + data
+                                            + struct.pack('>I', zlib.crc32(tag + data))
+                                            for tag, data in chunks])
+
+
+def gif_header(width: int, height: int) -> bytes:
+    """Returns the beginning of an animated GIF of a 2-colour palette (COLOURS), looped forever."""
+    return b''.join([b'GIF89a',
+                     struct.pack('<HHBBB', width, height, 0x80, 0, 0),
+                     bytes([value for colour in COLOURS for value in colour]),
+                     b'\x21\xff\x0bNETSCAPE2.0\x03\x01\x00\x00\x00'])
+
+
+def gif_frame(bits: np.ndarray) -> bytes:
+    """Returns a frame of an animated GIF of an array of bits 0 and 1, shown for GIF_DELAY hundredths of a second."""
+    height, width = bits.shape
+    data = lzw(bits.astype(np.uint8).tobytes(), 2)
+    blocks = b''.join([bytes([len(data[start:start + 255])]) + data[start:start + 255]
+                       for start in range(0, len(data), 255)])
+    return b''.join([b'\x21\xf9\x04\x00', struct.pack('<H', GIF_DELAY), b'\x00\x00',
+                     b'\x2c', struct.pack('<HHHHB', 0, 0, width, height, 0),
+                     bytes([2]), blocks, b'\x00'])
+
+
+def lzw(indices: bytes, min_code_size: int) -> bytes:
+    """Returns the indices of colours compressed by the variable-length LZW of GIF."""
+    clear_code = 1 << min_code_size
+    output = bytearray()
+    table = {}                          # codes of sequences, keyed by (code of the prefix) << 8 | index
+    code_size = min_code_size + 1
+    next_code = clear_code + 2
+    buffer, bits = clear_code, code_size    # bits not written yet (the clear code first), the least significant first
+
+    prefix = indices[0]
+    for index in indices[1:]:
+        key = prefix << 8 | index
+        if key in table:
+            prefix = table[key]
+            continue
+
+        buffer |= prefix << bits
+        bits += code_size
+        if next_code < 4096:
+            table[key] = next_code
+            next_code += 1
+            if next_code > 1 << code_size:
+                code_size += 1
+        else:                           # the table is full
+            buffer |= clear_code << bits
+            bits += code_size
+            table = {}
+            code_size = min_code_size + 1
+            next_code = clear_code + 2
+        while bits >= 8:
+            output.append(buffer & 0xff)
+            buffer >>= 8
+            bits -= 8
+        prefix = index
+
+    buffer |= prefix << bits                    # the last sequence
+    bits += code_size
+    if next_code == 1 << code_size and code_size < 12:
+        code_size += 1                          # the decoder adds its last code before the end
+    buffer |= (clear_code + 1) << bits          # the end of information
+    bits += code_size
+    while bits > 0:
+        output.append(buffer & 0xff)
+        buffer >>= 8
+        bits -= 8
+    return bytes(output)
+
+
+def svg_plot(magnetization: list[float], width: int = 912, height: int = 500) -> str:
+    """Returns an SVG plot of the evolution of magnetization m(t) [MCS], at most 2000 points."""
+    left, right, top, bottom = 55, 15, 30, 45           # margins of the plot
+    plot_width, plot_height = width - left - right, height - top - bottom
+    last_mcs = max(1, len(magnetization) - 1)
+    step = max(1, -(-len(magnetization)//2000))
+
+    def x(mcs: float) -> str:
+        return str(round(left + mcs/last_mcs*plot_width, 2))
+
+    def y(m: float) -> str:
+        return str(round(top + (1 - m)/2*plot_height, 2))
+
+    grid = ''.join([''.join(['<path d="M', x(0), ',', y(m), 'H', x(last_mcs), '" stroke="grey" stroke-width="1"/>',
+                             '<text x="', str(left - 8), '" y="', y(m), '" text-anchor="end" dy="4">', str(m), '</text>'])
+                    for m in (-1.0, -0.5, 0.0, 0.5, 1.0)])
+    ticks = ''.join([''.join(['<text x="', x(mcs), '" y="', str(height - bottom + 18), '" text-anchor="middle">',
+                              str(mcs), '</text>'])
+                     for mcs in sorted({round(last_mcs*part/4) for part in range(0, 5)})])
+    points = ' '.join([''.join([x(mcs), ',', y(magnetization[mcs])])
+                       for mcs in list(range(0, len(magnetization), step)) + [len(magnetization) - 1]])
+
+    return ''.join(['<svg xmlns="http://www.w3.org/2000/svg" width="', str(width), '" height="', str(height),
+                    '" viewBox="0 0 ', str(width), ' ', str(height), '" font-family="sans-serif" font-size="12">',
+                    '<rect width="100%" height="100%" fill="white"/>',
+                    grid, ticks,
+                    '<polyline points="', points, '" fill="none" stroke="rgb(31, 119, 180)" stroke-width="1.5"/>',
+                    '<text x="', str(left + plot_width/2), '" y="', str(height - 8), '" text-anchor="middle">t [MCS]</text>',
+                    '<text x="14" y="', str(top + plot_height/2), '" text-anchor="middle" transform="rotate(-90 14 ',
+                    str(top + plot_height/2), ')">m</text>',
+                    '</svg>\n'])
+
+
+def save_plot(file_path: str, magnetization: list[float]) -> None:
+    """Saves the SVG plot of the evolution of magnetization, see svg_plot."""
+    with open(file_path, 'w', encoding='UTF-8') as file:
+        file.write(svg_plot(magnetization))
+
+
+def _put(movie: dict[str, object], mcs: int, configuration: list[list[int]]) -> None:
+    """Hands the configuration packed a bit per spin to the background process."""
+    packed = np.packbits(np.array(configuration, dtype=np.int8) > 0, axis=1)
+    _hand(movie, (mcs, packed))
+
+
+def _hand(movie: dict[str, object], frame: tuple[int, np.ndarray] | None) -> None:
+    """Puts the frame (None for the end) into the queue, waiting while it is full and the background process runs."""
+    while True:
+        try:
+            movie['queue'].put(frame, timeout=1)
+            return
+        except Full:
+            if not movie['process'].is_alive():
+                raise RuntimeError('the background process encoding the movie failed') from None
+
+
+def _encode(queue: multiprocessing.Queue,
+            directory: str,
+            file_name: str,
+            lattice_length: int,
+            movie_format: str
+           ) -> None:
+    """Encodes the frames from the queue until None, in the background process."""
+    scale = -(-MIN_SIDE//lattice_length)
+    side = lattice_length*scale
+
+    file = None
+    if movie_format == 'gif':
+        file = open(storage.free_path(directory, file_name, '.gif'), 'wb')
+        file.write(gif_header(side, side))
+
+    try:
+        while (frame := queue.get()) is not None:
+            mcs, packed = frame
+            bits = np.unpackbits(packed, axis=1, count=lattice_length)
+            if scale > 1:
+                bits = bits.repeat(scale, axis=0).repeat(scale, axis=1)
+            if file:
+                file.write(gif_frame(bits))
+            else:
+                with open(storage.free_path(directory, ''.join([file_name, ' MCS ', str(mcs)]), '.png'), 'wb') as image:
+                    image.write(png(bits))
+    finally:
+        if file:
+            file.write(b';')
+            file.close()
@@ -0,0 +1,83 @@
+"""Online accumulation of moments of observables and thermodynamic quantities of the 2D Ising model."""
+from math import nan
+
+
+def accumulator(burn_in: int) -> dict[str, float]:
+    """
+    Returns an empty accumulator of moments of magnetization m and energy per spin e.
+
+    The first burn_in samples given to the function add are skipped.
+    Means of |m| and e are kept with their sums of squared deviations (Welford),
+    which gives their variances without subtracting two large nearly equal moments.
+    """
+    return {'burn_in': burn_in,
+            'seen': 0,          # all given samples, the skipped ones included
+            'count': 0,         # accumulated samples
+            'm_abs': 0.0,       # <|m|>
+            'm_abs_m2': 0.0,    # sum of (|m| - <|m|>)^2
+            'm2': 0.0,          # <m^2>
+            'm4': 0.0,          # <m^4>
+            'e': 0.0,           # <e>
+            'e_m2': 0.0}        # sum of (e - <e>)^2
+
+
+def add(accumulator: dict[str, float], magnetization: float, energy: float) -> None:
+    """Adds a sample of magnetization m and energy per spin e to the accumulator."""
+    accumulator['seen'] += 1
+    if accumulator['seen'] <= accumulator['burn_in']:
+        return
+
+    accumulator['count'] += 1
+    count = accumulator['count']
+
+    m_abs = abs(magnetization)
+    deviation = m_abs - accumulator['m_abs']
+    accumulator['m_abs'] += deviation/count
+    accumulator['m_abs_m2'] += deviation*(m_abs - accumulator['m_abs'])
+
+    m2 = magnetization*magnetization
+    accumulator['m2'] += (m2 - accumulator['m2'])/count
+    accumulator['m4'] += (m2*m2 - accumulator['m4'])/count
+
+    deviation = energy - accumulator['e']
+    accumulator['e'] += deviation/count
+    accumulator['e_m2'] += deviation*(energy - accumulator['e'])
+
+
+def thermodynamics(accumulator: dict[str, float], beta: float, nodes_number: int) -> dict[str, float]:
+    """
+    Returns moments and thermodynamic quantities per spin from the accumulator.
+
+    ### Parameters
+    accumulator
+    dict[str, float]
+        An accumulator filled by the function add.
+    beta
+    float
+        1/kT - thermodynamic parameter.
+    nodes_number
+    int
+        Number of spins N.
+
+    ### Returns
+    dict[str, float]
+        "<|m|>", "<m^2>", "<m^4>", "<e>", "<e^2>" - moments of magnetization and energy per spin,
+        "chi" - susceptibility beta*N*(<m^2> - <|m|>^2),
+        "C_v" - heat capacity beta^2*N*(<e^2> - <e>^2),
+        "U_L" - Binder cumulant 1 - <m^4>/(3<m^2>^2).
+        All of them are nan if no sample was accumulated.
+    """
+    count = accumulator['count']
+    if not count:
+        return dict.fromkeys(['<|m|>', '<m^2>', '<m^4>', '<e>', '<e^2>', 'chi', 'C_v', 'U_L'], nan)
+
+    m_abs_variance = accumulator['m_abs_m2']/count
+    e_variance = accumulator['e_m2']/count
+    return {'<|m|>': accumulator['m_abs'],
+            '<m^2>': accumulator['m2'],
+            '<m^4>': accumulator['m4'],
+            '<e>': accumulator['e'],
+            '<e^2>': e_variance + accumulator['e']*accumulator['e'],
+            'chi': beta*nodes_number*m_abs_variance,
+            'C_v': beta*beta*nodes_number*e_variance,
+            'U_L': 1 - accumulator['m4']/(3*accumulator['m2']*accumulator['m2']) if accumulator['m2'] else nan}
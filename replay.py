@@ -0,0 +1,82 @@
+"""ABOUT
+The program replays trajectories of 2D Ising model saved by "py main.py -st".
+
+COMMAND LINE INTERFACE
+py replay.py <path> [-d|--delay <float>] [--help] [-k|--mcs <grid>] [-sc|--save-configuration [<path>]] [-v|--visualization [<char><char>]]
+
+MANUAL
+<path>
+    A log of the trajectory ".trj" saved by main.py.
+
+-d <float>
+--delay <float>
+    Seconds <float> between displayed configurations.
+    The default is 0.0.
+
+--help
+    Prints that text, without executing the program.
+
+-k <grid>
+--mcs <grid>
+    MCSs to replay, given as a range <start>:<stop>:<step> with both ends included, e.g. 0:1000:10,
+    a list <value>,<value>,... or a single <value>.
+    The default is every recorded MCS.
+
+-sc [<path>]
+--save-configuration [<path>]
+    Saves the configurations at the replayed MCSs in a given directory <path> instead of displaying them,
+    under the names used by main.py with the MCS, e.g. "... configuration MCS 100 (1)".
+    The dafault is "./" (the path of this module).
+
+-v [<char><char>]
+--visualization [<char><char>]
+    Markers of spins "up" and "down" of the displayed configurations, as in main.py.
+    The default is " " and "█".
+
+Every configuration is rebuilt from the nearest keyframe at or before its MCS, so the replay runs
+at its own pace, independently of the speed of the simulation.
+"""
+import time
+
+import storage
+import trajectories
+import utils
+
+
+if __name__ == '__main__':
+    import sys
+
+    import init
+
+    argv = sys.argv
+
+    if '--help' in argv or len(argv) < 2:
+        print(__doc__)
+        sys.exit()
+
+    # initializing parameters
+    log = trajectories.open_log(argv[1])
+    grid = init.get_value(argv, ['-k', '--mcs'])                       # MCSs to replay
+    mcss = sorted(init.get_grid(grid, int)) if grid else range(0, log['last_mcs'] + 1)
+    delay = float(init.get_value(argv, ['-d', '--delay']) or 0.0)      # seconds between displayed configurations
+    save_configuration_dir = init.save_configuration_path_from(argv)    # path to save the configurations
+    am_up, am_down = init.visualization_markers_from(argv) or (' ', '\u2588')
+
+    header = log['header']
+    lattice_length = log['L']
+
+    if not save_configuration_dir:
+        print_function = utils.chose_print_function(lattice_length)
+
+    # replaying
+    try:
+        for mcs, configuration in trajectories.frames(log, mcss):
+            if save_configuration_dir:
+                file_name = storage.file_name(lattice_length, header['T*'], header['h'], header['J'], header['K'],
+                                              header['m0'], header['algorithm'], 'configuration MCS ' + str(mcs))
+                storage.save_configuration(storage.free_path(save_configuration_dir, file_name), configuration.tolist())
+            else:
+                print_function(configuration.tolist(), am_up, am_down)
+                time.sleep(delay)
+    finally:
+        log['file'].close()
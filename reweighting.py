@@ -0,0 +1,220 @@
+"""ABOUT
+The program reweights histograms of energy and magnetization of 2D Ising model, saved by "py main.py -sh",
+to observables over a grid of temperatures.
+
+COMMAND LINE INTERFACE
+py reweighting.py <path> [<path> ...] [--help] [-sm|--save-magnetization [<path>]] [-T*|--temperature-reduced <grid>]
+
+MANUAL
+<path>
+    Histograms ".npz" of runs of the same L, J and h at one or more temperatures.
+
+--help
+    Prints that text, without executing the program.
+
+-sm [<path>]
+--save-magnetization [<path>]
+    Saves the table in a given directory <path> as "reweighting summary (<n>)".
+    The dafault is "./" (the path of this module).
+
+-T* <grid>
+--temperature-reduced <grid>
+    Reduced temperatures T* of the table, given as a range <start>:<stop>:<step> with both ends included,
+    a list <value>,<value>,... or a single <value>.
+    The default is 1.0.
+
+A single histogram is reweighted to the temperature T* by the weights exp(-(beta - beta_0)E) of its states
+(Ferrenberg-Swendsen), several histograms are combined first by the multiple histogram method (WHAM).
+Observables are reliable only in the window of energies sampled by the runs, about T_0*(1 +- 1/sqrt(C_v N))
+around a single run.
+"""
+import numpy as np
+
+WHAM_TOLERANCE = 1e-10          # the multiple histogram method stops when the free energies change less than that
+WHAM_ITERATIONS = 100000        # the limit of its iterations
+
+
+def histogram(burn_in: int,
+              lattice_length: int,
+              reduced_temperature: float,
+              interaction_parameter: float,
+              external_magnetic_field: float
+             ) -> dict[str, object]:
+    """
+    Returns an empty joint histogram of the sum of products of the nearest neighbours and the sum of spins,
+    the energy E = -J*bonds - h*total_spin. The first burn_in samples given to the function add are skipped.
+    """
+    return {'burn_in': burn_in,
+            'seen': 0,                      # all given samples, the skipped ones included
+            'L': lattice_length,
+            'T*': reduced_temperature,
+            'J': interaction_parameter,
+            'h': external_magnetic_field,
+            'counts': {}}                   # counts of the pairs (bonds, total_spin)
+
+
+def add(histogram: dict[str, object], bonds: int, total_spin: int) -> None:
+    """Adds a sample of the state (bonds, total_spin) to the histogram."""
+    histogram['seen'] += 1
+    if histogram['seen'] <= histogram['burn_in']:
+        return
+    state = (bonds, total_spin)
+    histogram['counts'][state] = histogram['counts'].get(state, 0) + 1
+
+
+def save(file_path: str, histogram: dict[str, object]) -> None:
+    """Saves the histogram as a .npz file of arrays of the states and their counts, and the parameters."""
+    states = np.array(list(histogram['counts'].keys()), dtype=np.int64).reshape(-1, 2)
+    with open(file_path, 'wb') as file:
+        np.savez(file,
+                 bonds=states[:, 0],
+                 total_spin=states[:, 1],
+                 counts=np.array(list(histogram['counts'].values()), dtype=np.int64),
+                 parameters=np.array([histogram['L'], histogram['T*'], histogram['J'], histogram['h']]))
+
+
+def load(file_path: str) -> dict[str, object]:
+    """Returns the histogram saved by the function save."""
+    with np.load(file_path) as data:
+        lattice_length, reduced_temperature, interaction_parameter, external_magnetic_field = data['parameters']
+        counts = dict(zip(zip(data['bonds'].tolist(), data['total_spin'].tolist()), data['counts'].tolist()))
+    return {'burn_in': 0, 'seen': sum(counts.values()), 'L': int(lattice_length), 'T*': float(reduced_temperature),
+            'J': float(interaction_parameter), 'h': float(external_magnetic_field), 'counts': counts}
+
+
+def logsumexp(values: np.ndarray, axis: int | None = None) -> np.ndarray:
+    """Returns log(sum(exp(values))) along the axis, without overflows of the exponentials."""
+    largest = np.max(values, axis=axis, keepdims=True)
+    largest = np.where(np.isfinite(largest), largest, 0.0)
+    result = np.log(np.sum(np.exp(values - largest), axis=axis, keepdims=True)) + largest
+    return np.squeeze(result, axis=axis) if axis is not None else result.item()
+
+
+def density_of_states(histograms: list[dict[str, object]]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Returns the states visited by the runs and the logarithm of their density of states ln g (up to a constant).
+
+    A single histogram H at beta_0 gives ln g = ln H + beta_0*E. Several histograms H_i of n_i samples
+    at beta_i are combined by the multiple histogram method: ln g = ln sum H_i - ln sum n_i exp(f_i - beta_i*E),
+    iterated with the free energies f_i = -ln sum g exp(-beta_i*E) until they change less than WHAM_TOLERANCE.
+
+    ### Parameters
+    histograms
+    list[dict[str, object]]
+        Histograms of runs of the same L, J and h, see the function histogram.
+
+    ### Returns
+    np.ndarray
+        Sums of products of the nearest neighbours of the states.
+    np.ndarray
+        Sums of spins of the states.
+    np.ndarray
+        ln g of the states.
+    """
+    first = histograms[0]
+    for other in histograms[1:]:
+        if (other['L'], other['J'], other['h']) != (first['L'], first['J'], first['h']):
+            raise ValueError('histograms must be of the same L, J and h')
+
+    totals = {}                                             # counts of all histograms
+    for single in histograms:
+        for state, count in single['counts'].items():
+            totals[state] = totals.get(state, 0) + count
+    if not totals:
+        raise ValueError('histograms must be not empty')
+
+    states = np.array(list(totals.keys()), dtype=np.int64)
+    bonds, total_spin = states[:, 0], states[:, 1]
+    energies = -first['J']*bonds - first['h']*total_spin
+    ln_counts = np.log(np.array(list(totals.values()), dtype=np.float64))
+    betas = np.array([1/single['J']/single['T*'] for single in histograms])[:, None]
+    ln_samples = np.log(np.array([sum(single['counts'].values()) for single in histograms], dtype=np.float64))[:, None]
+
+    free_energies = np.zeros((len(histograms), 1))
+    for iteration in range(0, WHAM_ITERATIONS):
+        ln_g = ln_counts - logsumexp(ln_samples + free_energies - betas*energies, axis=0)
+        new_free_energies = -logsumexp(ln_g - betas*energies, axis=1)[:, None]
+        new_free_energies -= new_free_energies[0]
+        if np.max(np.abs(new_free_energies - free_energies)) < WHAM_TOLERANCE:
+            break
+        free_energies = new_free_energies
+    return bonds, total_spin, ln_g - np.max(ln_g)
+
+
+def thermodynamics(bonds: np.ndarray,
+                   total_spin: np.ndarray,
+                   ln_g: np.ndarray,
+                   lattice_length: int,
+                   reduced_temperature: float,
+                   interaction_parameter: float,
+                   external_magnetic_field: float
+                  ) -> dict[str, float]:
+    """
+    Returns moments and thermodynamic quantities per spin at the temperature from the density of states,
+    with the keys of observables.thermodynamics.
+    """
+    nodes_number = lattice_length*lattice_length
+    beta = 1/interaction_parameter/reduced_temperature
+    energies = -interaction_parameter*bonds - external_magnetic_field*total_spin
+    ln_weights = ln_g - beta*energies
+    weights = np.exp(ln_weights - logsumexp(ln_weights))    # probabilities of the states
+
+    m = total_spin/nodes_number
+    e = energies/nodes_number
+    m_abs = float(weights@np.abs(m))
+    m2 = float(weights@(m*m))
+    m4 = float(weights@(m*m*m*m))
+    e1 = float(weights@e)
+    e2 = float(weights@(e*e))
+    return {'<|m|>': m_abs,
+            '<m^2>': m2,
+            '<m^4>': m4,
+            '<e>': e1,
+            '<e^2>': e2,
+            'chi': beta*nodes_number*(m2 - m_abs*m_abs),
+            'C_v': beta*beta*nodes_number*(e2 - e1*e1),
+            'U_L': 1 - m4/(3*m2*m2) if m2 else float('nan')}
+
+
+def summary_table(rows: list[tuple[float, dict[str, float]]]) -> str:
+    """Returns the table of the thermodynamics of the temperatures T*."""
+    names = ['<|m|>', '<m^2>', '<m^4>', '<e>', '<e^2>', 'chi', 'C_v', 'U_L']
+    lines = [''.join(['T*'.rjust(10)] + [name.rjust(14) for name in names])]
+    for reduced_temperature, quantities in rows:
+        lines.append(''.join([str(reduced_temperature).rjust(10)]
+                             + [str(round(quantities[name], 8)).rjust(14) for name in names]))
+    return '\n'.join(lines) + '\n'
+
+
+if __name__ == '__main__':
+    import sys
+
+    import init
+    import storage
+
+    argv = sys.argv
+
+    if '--help' in argv or len(argv) < 2:
+        print(__doc__)
+        sys.exit()
+
+    # initializing parameters
+    paths = []                                                          # paths to the histograms
+    for arg in argv[1:]:
+        if arg in init.FLAGS:
+            break
+        paths.append(arg)
+    red_temperatures = init.reduced_temperatures_from(argv)             # reduced temperatures T*
+    save_magnetization_dir = init.save_magnetization_path_from(argv)    # path to save the table
+
+    # reweighting
+    histograms = [load(path) for path in paths]
+    bonds, total_spin, ln_g = density_of_states(histograms)
+    first = histograms[0]
+    rows = [(red_temperature, thermodynamics(bonds, total_spin, ln_g, first['L'], red_temperature, first['J'], first['h']))
+            for red_temperature in red_temperatures]
+
+    summary = summary_table(rows)
+    print(summary, end='')
+    if save_magnetization_dir:
+        storage.save_summary(storage.free_path(save_magnetization_dir, 'reweighting summary'), summary)
@@ -0,0 +1,151 @@
+"""Supply of random numbers for the Monte Carlo method."""
+from collections.abc import Callable, Iterator
+import random
+
+import numpy as np
+
+
+def generator(seed: int, random_stream: str) -> np.random.Generator | random.Random:
+    """
+    Returns a seeded generator of random numbers.
+
+    ### Parameters
+    seed
+    int
+        For generatng random numbers.
+    random_stream
+    str
+        "block" for the counter-based stream of the seed (see the function stream) drawing whole MCSs at once,
+        "legacy" for the Mersenne Twister of the module "random" used by the old runs.
+
+    ### Returns
+    np.random.Generator | random.Random
+        The generator to pass to the functions sites and uniforms.
+    """
+    if random_stream == 'legacy':
+        return random.Random(seed)
+    return stream(seed)
+
+
+def stream(seed: int, *key: int) -> np.random.Generator:
+    """
+    Returns the counter-based stream of the seed of a run and the key, a NumPy generator on Philox.
+
+    Philox encrypts a counter by a 128-bit key, derived here from the seed and the key by SeedSequence,
+    so streams of different keys are independent and every one of them is created anywhere (in any worker,
+    in any order) without drawing from the others. Parts of a run are keyed by stable indices (a row of a strip,
+    a round and a temperature, a window of energy), so results do not depend on the number of workers
+    or on the scheduling. The empty key gives the stream of the whole run.
+    """
+    return np.random.Generator(np.random.Philox(key=np.random.SeedSequence(seed, spawn_key=key).generate_state(2, np.uint64)))
+
+
+def derived_seed(seed: int, *key: int) -> int:
+    """Returns a seed of the key for functions taking seeds rather than generators, see the function stream."""
+    return int(np.random.SeedSequence(seed, spawn_key=key).generate_state(1, np.uint64)[0] >> 1)
+
+
+def state(generator: np.random.Generator | random.Random) -> dict | list:
+    """Returns the state of the generator as plain lists, dicts and numbers, ready for JSON."""
+    if isinstance(generator, random.Random):
+        version, internal_state, gauss_next = generator.getstate()
+        return [version, list(internal_state), gauss_next]
+    return _plain(generator.bit_generator.state)
+
+
+def set_state(generator: np.random.Generator | random.Random, generator_state: dict | list) -> None:
+    """Restores the state returned by the function state, so the generator continues its stream exactly."""
+    if isinstance(generator, random.Random):
+        version, internal_state, gauss_next = generator_state
+        generator.setstate((version, tuple(internal_state), gauss_next))
+    elif generator_state['bit_generator'] != generator.bit_generator.state['bit_generator']:
+        raise ValueError(''.join(['the state of ', generator_state['bit_generator'], ' can not be restored to the stream of ',
+                                  generator.bit_generator.state['bit_generator'], ', it was saved by an older version']))
+    else:
+        generator.bit_generator.state = generator_state
+
+
+def sites(generator: np.random.Generator | random.Random,
+          rows_number: int,
+          columns_number: int,
+          nodes_number: int
+         ) -> tuple[Iterator[tuple[int, int]], Callable[[], float]]:
+    """
+    Returns random sites of a configuration of rows x columns and a source of uniform variates for one MCS.
+
+    A NumPy generator draws the indices of all sites and all variates of the MCS in bulk,
+    so the loop over attempts does not call the generator at all.
+    A legacy generator draws them lazily in the order of the old runs (row, column, variate only if needed),
+    which reproduces their trajectories bit for bit.
+
+    ### Parameters
+    generator
+    np.random.Generator | random.Random
+        A generator returned by the function generator.
+    rows_number
+    int
+        Number of rows of the configuration.
+    columns_number
+    int
+        Number of columns of the configuration.
+    nodes_number
+    int
+        Number of attempts in the MCS.
+
+    ### Returns
+    Iterator[tuple[int, int]]
+        Indices (row, column) of the sites to update.
+    Callable[[], float]
+        Returns the next uniform variate from [0, 1).
+    """
+    if isinstance(generator, random.Random):
+        return _legacy_sites(generator, rows_number, columns_number, nodes_number), generator.random
+
+    rows, columns = generator.integers([[rows_number], [columns_number]], size=(2, nodes_number)).tolist()
+    variates = generator.random(nodes_number).tolist()
+    return zip(rows, columns), iter(variates).__next__
+
+
+def uniforms(generator: np.random.Generator | random.Random,
+             block_size: int
+            ) -> Callable[[], float]:
+    """
+    Returns a source of uniform variates from [0, 1) for algorithms using a varying number of them per MCS.
+
+    A NumPy generator fills a block of block_size variates at once and refills it when it is used up,
+    a legacy generator is called for every variate.
+    """
+    if isinstance(generator, random.Random):
+        return generator.random
+
+    block = iter(())
+
+    def uniform() -> float:
+        nonlocal block
+        try:
+            return next(block)
+        except StopIteration:
+            block = iter(generator.random(block_size).tolist())
+            return next(block)
+
+    return uniform
+
+
+def _plain(value: object) -> object:
+    """Returns the value with NumPy arrays of the state of a bit generator (Philox keeps some) turned to lists."""
+    if isinstance(value, dict):
+        return {name: _plain(item) for name, item in value.items()}
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return value
+
+
+def _legacy_sites(generator: random.Random,
+                  rows_number: int,
+                  columns_number: int,
+                  nodes_number: int
+                 ) -> Iterator[tuple[int, int]]:
+    """Yields random sites drawn one by one, as the old runs did."""
+    randrange = generator.randrange
+    for iteration in range(0, nodes_number):
+        yield randrange(rows_number), randrange(columns_number)
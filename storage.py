@@ -0,0 +1,224 @@
+"""Functions to save results of simulations."""
+import json
+import os
+
+import numpy as np
+
+PACKED_MAGIC = b'ISINGCFG'                          # first bytes of a configuration in the packed binary format
+BITS_TO_TEXT = bytes.maketrans(b'\x00\x01', b'01')  # spins 0/1 to the characters of the text format
+
+
+def file_name(lattice_length: int,
+              reduced_temperature: float,
+              external_magnetic_field: float,
+              interaction: float,
+              monte_carlo_steps: int,
+              magnetization0: float,
+              algorithm: str,
+              content: str
+             ) -> str:
+    """Returns the name of a file with the given content ("configuration", "magnetization") of a simulation."""
+    return ''.join(['L', str(lattice_length),
+                    'Tred', str(reduced_temperature),
+                    'h', str(external_magnetic_field),
+                    'J', str(interaction),
+                    'K', str(monte_carlo_steps),
+                    'm', str(magnetization0),
+                    algorithm,
+                    ' ', content])
+
+
+def free_path(directory: str, file_name: str, extension: str = '') -> str:
+    """Returns the first path "<directory><file_name> (<n>)<extension>" not taken by an existing file."""
+    file_path = ''.join([directory, file_name, ' (1)', extension])
+    file_name_counter = 1
+    while os.path.isfile(file_path):
+        file_name_counter += 1
+        file_path = ''.join([directory,
+                             file_name,
+                             ' (', str(file_name_counter), ')',
+                             extension])
+    return file_path
+
+
+def save_configuration(file_path: str, configuration: list[list[int]]) -> None:
+    """Saves the configuration of spins as rows of characters '1' (spin "up") and '0' (spin "down")."""
+    with open(file_path, 'w', encoding='UTF-8') as file:
+        for row in configuration:
+            for spin in row:
+                if spin > 0:
+                    file.write('1')
+                else:
+                    file.write('0')
+            file.write('\n')
+
+
+def save_configuration_packed(file_path: str, configuration: list[list[int]], header: dict[str, object]) -> None:
+    """
+    Saves the configuration of spins in the packed binary format.
+
+    The file starts with the magic bytes PACKED_MAGIC, the length of the header (4 bytes, little endian)
+    and the header itself as JSON (parameters of the simulation, "L" among them), padded by spaces
+    so the rows start at a multiple of 64 bytes. Every row follows as ceil(L/8) bytes, a bit per spin
+    (1 for spin "up"), the first spin in the most significant bit.
+    """
+    lattice = np.asarray(configuration, dtype=np.int8)
+    header_bytes = json.dumps(dict(header, L=lattice.shape[0])).encode('UTF-8')
+    header_bytes += b' '*(-(len(PACKED_MAGIC) + 4 + len(header_bytes)) % 64)
+    with open(file_path, 'wb') as file:
+        file.write(PACKED_MAGIC + len(header_bytes).to_bytes(4, 'little') + header_bytes)
+        file.write(np.packbits(lattice > 0, axis=1).tobytes())
+
+
+def read_configuration_packed(file_path: str) -> tuple[dict[str, object], np.ndarray]:
+    """
+    Returns the header of a configuration saved in the packed binary format and its packed rows,
+    an (L, ceil(L/8)) array of bytes mapped lazily from the disk. See unpack_rows.
+    """
+    with open(file_path, 'rb') as file:
+        if file.read(len(PACKED_MAGIC)) != PACKED_MAGIC:
+            raise ValueError('the file is not a packed configuration of spins')
+        header_length = int.from_bytes(file.read(4), 'little')
+        header = json.loads(file.read(header_length).decode('UTF-8'))
+
+    lattice_length = header['L']
+    packed = np.memmap(file_path, dtype=np.uint8, mode='r', offset=len(PACKED_MAGIC) + 4 + header_length,
+                       shape=(lattice_length, (lattice_length + 7)//8))
+    return header, packed
+
+
+def unpack_rows(packed: np.ndarray, lattice_length: int, start: int = 0, stop: int | None = None) -> np.ndarray:
+    """Returns the rows start:stop of packed rows as an array of spins 1 and -1 (int8), only these rows are read."""
+    bits = np.unpackbits(packed[start:stop], axis=1, count=lattice_length)
+    return 2*bits.astype(np.int8) - 1
+
+
+def load_configuration(file_path: str) -> list[list[int]]:
+    """Returns a configuration of spins saved in the packed binary format or as text rows of '1' and '0'."""
+    with open(file_path, 'rb') as file:
+        packed_format = file.read(len(PACKED_MAGIC)) == PACKED_MAGIC
+
+    if packed_format:
+        header, packed = read_configuration_packed(file_path)
+        return unpack_rows(packed, header['L']).tolist()
+
+    with open(file_path, 'r', encoding='UTF-8') as file:
+        configuration = [[1 if spin == '1' else -1 for spin in line.strip()] for line in file if line.strip()]
+    if any(len(row) != len(configuration) for row in configuration):
+        raise ValueError('the configuration of spins must be a square lattice')
+    return configuration
+
+
+def export_configuration_text(packed_path: str, text_path: str, chunk_rows: int = 256) -> None:
+    """Exports a configuration from the packed binary format to the text format of save_configuration, chunk by chunk."""
+    header, packed = read_configuration_packed(packed_path)
+    with open(text_path, 'w', encoding='UTF-8') as file:
+        for start in range(0, header['L'], chunk_rows):
+            rows = unpack_rows(packed, header['L'], start, start + chunk_rows) > 0
+            file.writelines([row.astype(np.uint8).tobytes().translate(BITS_TO_TEXT).decode('ascii') + '\n'
+                             for row in rows])
+
+
+def save_magnetization(file_path: str, magnetization: list[float]) -> None:
+    """Saves the evolution of magnetization, a value per line."""
+    with open(file_path, 'w', encoding='UTF-8') as file:
+        for m in magnetization:
+            file.write(str(m) + '\n')
+
+
+def save_summary(file_path: str, summary: str) -> None:
+    """Saves the summary table of a sweep."""
+    with open(file_path, 'w', encoding='UTF-8') as file:
+        file.write(summary)
+
+
+class MagnetizationWriter:
+    """
+    A streaming sink of the evolution of magnetization, saved as a .npy file of a growing 1D array.
+
+    Values are appended to a fixed-size buffer and written to the file in chunks, so the memory used by a run
+    does not depend on its length. The header has a fixed size and is rewritten with the current length
+    after every chunk, so the file is a valid .npy array (np.load) while the run is still going;
+    only values of the last unwritten chunk are lost if the run crashes.
+    """
+    HEADER_SIZE = 128       # bytes of the .npy header, room enough for any length
+
+    def __init__(self,
+                 file_path: str,
+                 dtype: str = 'float64',
+                 chunk_size: int = 8192,
+                 resume_at: int | None = None
+                ) -> None:
+        """Opens a new file, or the existing one cut to its first resume_at values (a run resumed from a checkpoint)."""
+        self.file_path = file_path
+        self.dtype = np.dtype(dtype).newbyteorder('<')
+        self.buffer = np.empty(chunk_size, dtype=self.dtype)
+        self.buffered = 0       # values in the buffer
+        if resume_at is None:
+            self.written = 0    # values in the file
+            self.file = open(file_path, 'wb')
+        else:
+            self.written = resume_at
+            self.file = open(file_path, 'r+b')
+            self.file.truncate(self.HEADER_SIZE + resume_at*self.dtype.itemsize)
+        self._write_header()
+
+    def __enter__(self) -> 'MagnetizationWriter':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.written + self.buffered
+
+    def append(self, m: float) -> None:
+        """Adds a value of magnetization, the chunk is written when the buffer is full."""
+        self.buffer[self.buffered] = m
+        self.buffered += 1
+        if self.buffered == self.buffer.size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Writes the buffered values and the header with the new length."""
+        if self.buffered:
+            self.file.seek(0, os.SEEK_END)
+            self.file.write(self.buffer[:self.buffered].tobytes())
+            self.written += self.buffered
+            self.buffered = 0
+        self._write_header()
+        self.file.flush()
+
+    def close(self) -> None:
+        """Writes the rest of values and closes the file."""
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+    def _write_header(self) -> None:
+        """Writes the .npy header (version 1.0) of the values in the file, padded to HEADER_SIZE bytes."""
+        header = ''.join(["{'descr': '", self.dtype.str, "', 'fortran_order': False, 'shape': (",
+                          str(self.written), ",), }"])
+        header = header.ljust(self.HEADER_SIZE - 11) + '\n'
+        self.file.seek(0)
+        self.file.write(b'\x93NUMPY\x01\x00' + (self.HEADER_SIZE - 10).to_bytes(2, 'little') + header.encode('latin1'))
+
+
+def save_magnetization_npy(file_path: str, magnetization: list[float], dtype: str = 'float64') -> None:
+    """Saves the evolution of magnetization as a .npy file."""
+    with MagnetizationWriter(file_path, dtype) as writer:
+        for m in magnetization:
+            writer.append(m)
+
+
+def read_magnetization_npy(file_path: str) -> np.ndarray:
+    """Returns the evolution of magnetization saved in a .npy file, mapped lazily from the disk (also during a run)."""
+    return np.load(file_path, mmap_mode='r')
+
+
+def export_magnetization_text(npy_path: str, text_path: str, chunk_size: int = 65536) -> None:
+    """Exports the evolution of magnetization from a .npy file to the text format of save_magnetization, chunk by chunk."""
+    magnetization = read_magnetization_npy(npy_path)
+    with open(text_path, 'w', encoding='UTF-8') as file:
+        for start in range(0, magnetization.size, chunk_size):
+            file.writelines([str(m) + '\n' for m in magnetization[start:start + chunk_size].tolist()])
@@ -0,0 +1,171 @@
+"""ABOUT
+The program provide sweeps of Monte Carlo simulations of 2D Ising model over grids of parameters.
+
+COMMAND LINE INTERFACE
+py sweep.py [-h|--external-magnetic-field <grid>] [--help] [-L|--length <grid>] [-T*|--temperature-reduced <grid>] [-w|--workers <int>] [<arguments of main.py in SWEPT>]
+
+MANUAL
+A <grid> of values is given as:
+    <start>:<stop>:<step>   a range with both ends included, e.g. 1.5:3.5:0.05
+    <value>,<value>,...     a list, e.g. 16,32,64
+    <value>                 a single value
+
+-h <grid>
+--external-magnetic-field <grid>
+    Values of an external homogenious magnetic field h.
+    The default is 0.0.
+
+--help
+    Prints that text, without executing the program.
+
+-L <grid>
+--length <grid>
+    Lengths L of the lattice LxL.
+    The default is 40.
+
+-T* <grid>
+--temperature-reduced <grid>
+    Reduced temperatures T*.
+    The default is 1.0.
+
+-w <int>
+--workers <int>
+    Number of processes <int> simulating the points of the grid.
+    The default is the number of CPUs.
+
+Every point (L, h, T*) of the grids is simulated as "py main.py" would simulate it, with the same seed and
+the arguments of main.py listed in SWEPT: -a, -cf, -e, -J, -K, -m0, -R, -rs, -s, -sc, -sf and -sm. Its results are saved
+under the names and in the formats used by main.py. The other arguments of main.py (observables, checkpoints,
+trajectories, movies, histograms, effective samples, parallel tempering, other lattices, the initial configuration
+and the visualization) are refused.
+A summary table of the mean |m| of every point, the initial state excluded, is printed
+and also saved in the directory of magnetization as "sweep summary (<n>)".
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import itertools
+
+import main
+
+SWEPT = ['-s', '--seed', '-R', '--replicas', '-rs', '--random-stream', '-J', '--J', '--interaction',
+         '-K', '--K', '--steps', '-m0', '--initial-magnetization', '-a', '--algorithm', '-e', '--engine',
+         '-sc', '--save-configuration', '-sm', '--save-magnetization', '-sf', '--save-format',
+         '-cf', '--configuration-format']       # arguments of main.py taken by a sweep, besides its own -L, -T*, -h and -w
+
+
+def simulate(lattice_length: int,
+             red_temperature: float,
+             emf: float,
+             interaction: float,
+             mcss: int,
+             magnetization0: float,
+             algorithm: str,
+             engine: str,
+             random_stream: str,
+             replicas: int,
+             seed: int
+            ) -> tuple[list[list[list[int]]], list[list[float]]]:
+    """Simulates a point of the sweep in a worker process, as main.py would."""
+    configs = [main.initial_configuration(lattice_length, magnetization0, seed + replica)
+               for replica in range(0, replicas if engine == "multispin" else 1)]
+    beta = 1/interaction/red_temperature
+    return main.evolve(configs, mcss, red_temperature, emf, beta, seed, algorithm, engine, random_stream, None)
+
+
+def mean_absolute_magnetization(magnetizations: list[list[float]]) -> float:
+    """Returns the mean |m| of all replicas of a point, the initial state excluded."""
+    values = [abs(m) for magnetization in magnetizations for m in magnetization[1:]]
+    if not values:
+        return float('nan')
+    return sum(values)/len(values)
+
+
+def summary_table(rows: list[tuple[int, float, float, float]]) -> str:
+    """Returns the table of the mean |m| of the points (L, h, T*) sorted by L, h and T*."""
+    lines = [''.join(['L'.rjust(6), 'h'.rjust(12), 'T*'.rjust(12), 'mean |m|'.rjust(12)])]
+    for lattice_length, emf, red_temperature, mean in sorted(rows):
+        lines.append(''.join([str(lattice_length).rjust(6),
+                              str(emf).rjust(12),
+                              str(red_temperature).rjust(12),
+                              str(round(mean, 6)).rjust(12)]))
+    return '\n'.join(lines) + '\n'
+
+
+if __name__ == '__main__':
+    import sys
+
+    import init
+    import storage
+
+    argv = sys.argv
+
+    if '--help' in argv:
+        print(__doc__)
+        sys.exit()
+
+    # initializing parameters
+    seed = init.seed_from(argv)                                         # for random trajectories
+    lattice_lengths = init.lattice_lengths_from(argv)                   # lengths of the lattice
+    red_temperatures = init.reduced_temperatures_from(argv)             # reduced temperatures T*
+    emfs = init.external_magnetic_fields_from(argv)                     # external magnetic fields h
+    interaction = init.interaction_from(argv)                           # interaction parameter
+    mcss = init.mcss_from(argv)                                         # number of Monte Carlo steps
+    magnetization0 = init.initial_magnetization_from(argv)              # initial value of magnetization of the system
+    algorithm = init.algorithm_from(argv)                               # an algorithm for computing the Monte Carlo method
+    engine = init.engine_from(argv)                                     # an engine executing the algorithm
+    random_stream = init.random_stream_from(argv)                       # a supply of random numbers
+    replicas = init.replicas_from(argv)                                 # number of replicas for the multispin engine
+    workers = init.workers_from(argv)                                   # number of worker processes
+    save_configuration_dir = init.save_configuration_path_from(argv)    # path to save final spins configuration
+    configuration_format = init.configuration_format_from(argv)         # format of saved configurations
+    save_magnetization_dir = init.save_magnetization_path_from(argv)    # path to save magnetization
+    save_format = init.save_format_from(argv)                           # format of saved magnetization
+
+    if algorithm == 'wanglandau':
+        raise ValueError('sweeps do not run the Wang-Landau sampling, ln g of a single run gives any temperature')
+    refused = [arg for arg in init.FLAGS if arg in argv and arg not in SWEPT + ['-L', '--length', '-T*', '--temperature-reduced',
+                                                                           '-h', '--external-magnetic-field',
+                                                                           '-w', '--workers']]
+    if refused:
+        raise ValueError(''.join(['sweeps do not take the arguments ', ', '.join(refused), ' of main.py, only -L, -T*, -h, -w,',
+                                  ' -a, -cf, -e, -J, -K, -m0, -R, -rs, -s, -sc, -sf and -sm']))
+
+    points = list(itertools.product(lattice_lengths, emfs, red_temperatures))
+    rows = []
+
+    # points are saved as soon as they are done, in any order
+    with ProcessPoolExecutor(max_workers=min(workers, len(points))) as executor:
+        futures = {executor.submit(simulate, lattice_length, red_temperature, emf, interaction, mcss, magnetization0,
+                                   algorithm, engine, random_stream, replicas, seed): (lattice_length, emf, red_temperature)
+                   for lattice_length, emf, red_temperature in points}
+        for future in as_completed(futures):
+            lattice_length, emf, red_temperature = futures[future]
+            configs, magnetizations = future.result()
+            rows.append((lattice_length, emf, red_temperature, mean_absolute_magnetization(magnetizations)))
+
+            if save_configuration_dir:
+                file_name = storage.file_name(lattice_length, red_temperature, emf, interaction, mcss, magnetization0,
+                                              algorithm, 'configuration')
+                for config in configs:
+                    if configuration_format == 'packed':
+                        header = {'T*': red_temperature, 'h': emf, 'J': interaction, 'K': mcss, 'm0': magnetization0,
+                                  'algorithm': algorithm, 'seed': seed}
+                        storage.save_configuration_packed(storage.free_path(save_configuration_dir, file_name, '.spins'),
+                                                          config, header)
+                    else:
+                        storage.save_configuration(storage.free_path(save_configuration_dir, file_name), config)
+
+            if save_magnetization_dir:
+                file_name = storage.file_name(lattice_length, red_temperature, emf, interaction, mcss, magnetization0,
+                                              algorithm, 'magnetization')
+                for magnetization in magnetizations:
+                    if save_format == 'text':
+                        storage.save_magnetization(storage.free_path(save_magnetization_dir, file_name), magnetization)
+                    else:
+                        storage.save_magnetization_npy(storage.free_path(save_magnetization_dir, file_name, '.npy'),
+                                                       magnetization, 'float32' if save_format == 'npy32' else 'float64')
+
+    # the summary of the sweep
+    summary = summary_table(rows)
+    print(summary, end='')
+    if save_magnetization_dir:
+        storage.save_summary(storage.free_path(save_magnetization_dir, 'sweep summary'), summary)
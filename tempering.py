@@ -0,0 +1,220 @@
+"""Parallel tempering (replica exchange) for the Monte Carlo method in the 2D Ising model."""
+from concurrent.futures import ProcessPoolExecutor
+from math import exp
+
+import core_glauber
+import core_metropolis
+import lattice
+import rng
+
+
+def mc_raw(configurations: list[list[list[int]]],
+           monte_carlo_steps: int,
+           reduced_temperatures: list[float],
+           interaction_parameter: float,
+           seed: int,
+           algorithm: str,
+           swap_interval: int,
+           workers: int,
+           random_stream: str = 'block'
+          ) -> tuple[list[list[list[int]]], list[list[float]], list[float]]:
+    """
+    Replicas at a ladder of temperatures, exchanged between the neighbouring temperatures every swap_interval MCSs.
+
+    ### Parameters
+    configurations
+    list[list[list[int]]]
+        Lattice-wise systems of spins, one per temperature of the ladder.
+    monte_carlo_steps
+    int
+        Number of iterations.
+    reduced_temperatures
+    list[float]
+        J*T/beta - the ladder of reduced temperatures in the ascending order.
+    interaction_parameter
+    float
+        Interaction J between a pair of spins.
+    seed
+    int
+        For generatng random numbers.
+    algorithm
+    str
+        "glauber" or "metropolis" - the kernel evolving every replica.
+    swap_interval
+    int
+        Number of MCSs between attempts to swap the replicas.
+    workers
+    int
+        Number of processes evolving the replicas.
+    random_stream
+    str
+        "block" or "legacy" - a supply of random numbers of the kernel, see rng.generator.
+
+    ### Returns
+    list[list[list[int]]]
+        The final configurations at every temperature.
+    list[list[float]]
+        Evolution of magnetization at every temperature.
+    list[float]
+        Acceptance rates of swaps between every pair of the neighbouring temperatures.
+    """
+    return _evolve(configurations, monte_carlo_steps, reduced_temperatures, interaction_parameter, 0.0, seed,
+                   algorithm, swap_interval, workers, random_stream)
+
+
+def mc_h(configurations: list[list[list[int]]],
+         monte_carlo_steps: int,
+         reduced_temperatures: list[float],
+         interaction_parameter: float,
+         external_magnetic_field: float,
+         seed: int,
+         algorithm: str,
+         swap_interval: int,
+         workers: int,
+         random_stream: str = 'block'
+        ) -> tuple[list[list[list[int]]], list[list[float]], list[float]]:
+    """
+    Parallel tempering with incorporated external magnetic field.
+
+    ### Parameters
+    configurations
+    list[list[list[int]]]
+        Lattice-wise systems of spins, one per temperature of the ladder.
+    monte_carlo_steps
+    int
+        Number of iterations.
+    reduced_temperatures
+    list[float]
+        J*T/beta - the ladder of reduced temperatures in the ascending order.
+    interaction_parameter
+    float
+        Interaction J between a pair of spins.
+    external_magnetic_field
+    float
+        Influence on energy change. Incorporated member + 2*h*Sij.
+    seed
+    int
+        For generatng random numbers.
+    algorithm
+    str
+        "glauber" or "metropolis" - the kernel evolving every replica.
+    swap_interval
+    int
+        Number of MCSs between attempts to swap the replicas.
+    workers
+    int
+        Number of processes evolving the replicas.
+    random_stream
+    str
+        "block" or "legacy" - a supply of random numbers of the kernel, see rng.generator.
+
+    ### Returns
+    list[list[list[int]]]
+        The final configurations at every temperature.
+    list[list[float]]
+        Evolution of magnetization at every temperature.
+    list[float]
+        Acceptance rates of swaps between every pair of the neighbouring temperatures.
+    """
+    return _evolve(configurations, monte_carlo_steps, reduced_temperatures, interaction_parameter,
+                   external_magnetic_field, seed, algorithm, swap_interval, workers, random_stream)
+
+
+def segment(configuration: list[list[int]],
+            monte_carlo_steps: int,
+            reduced_temperature: float,
+            interaction_parameter: float,
+            external_magnetic_field: float,
+            seed: int,
+            algorithm: str,
+            random_stream: str
+           ) -> tuple[list[list[int]], list[float], float]:
+    """
+    Evolves a replica between two attempts of swaps, in a worker process.
+
+    Returns the configuration, magnetization after every MCS of the segment and the final energy.
+    """
+    core = core_metropolis if algorithm == 'metropolis' else core_glauber
+    beta = 1/interaction_parameter/reduced_temperature
+    if external_magnetic_field == 0.0:
+        configuration, mag = core.mc_raw(configuration, monte_carlo_steps, reduced_temperature, beta, seed,
+                                         random_stream)
+    else:
+        configuration, mag = core.mc_h(configuration, monte_carlo_steps, reduced_temperature,
+                                       external_magnetic_field, beta, seed, random_stream)
+
+    return configuration, mag[1:], lattice.energy(lattice.square(len(configuration)), configuration,
+                                                   interaction_parameter, external_magnetic_field)
+
+
+def _evolve(configurations: list[list[list[int]]],
+            monte_carlo_steps: int,
+            reduced_temperatures: list[float],
+            interaction_parameter: float,
+            external_magnetic_field: float,
+            seed: int,
+            algorithm: str,
+            swap_interval: int,
+            workers: int,
+            random_stream: str
+           ) -> tuple[list[list[list[int]]], list[list[float]], list[float]]:
+    """
+    Common evolution of parallel tempering used by all of the mc_* variants.
+
+    Every round evolves all replicas for swap_interval MCSs in the pool, then attempts swaps
+    of the pairs (0, 1), (2, 3), ... in even rounds and (1, 2), (3, 4), ... in odd rounds.
+    A swap of the temperatures i and j is accepted with the probability min(1, exp((beta_i - beta_j)*(E_i - E_j))).
+    Every segment gets its own seed of the key (round, temperature) and swaps draw from the stream of the seed
+    (see rng.stream), so runs do not depend on the number of workers.
+    """
+    swap_generator = rng.stream(seed)
+
+    temperatures_number = len(reduced_temperatures)
+    betas = [1/interaction_parameter/temperature for temperature in reduced_temperatures]
+    nodes_number = len(configurations[0])*len(configurations[0])
+
+    mag = [[sum([sum(row) for row in configuration])/nodes_number] for configuration in configurations]
+    attempts = [0]*(temperatures_number - 1)    # attempts of swaps between the temperatures i and i + 1
+    accepted = [0]*(temperatures_number - 1)    # accepted swaps between the temperatures i and i + 1
+
+    workers = max(1, min(workers, temperatures_number))
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    mapper = executor.map if executor else map
+
+    try:
+        done = 0                                # MCSs done so far
+        swap_round = 0
+        while done < monte_carlo_steps:
+            steps = min(swap_interval, monte_carlo_steps - done)
+            seeds = [rng.derived_seed(seed, swap_round, temperature) for temperature in range(0, temperatures_number)]
+            results = list(mapper(segment,
+                                  configurations,
+                                  [steps]*temperatures_number,
+                                  reduced_temperatures,
+                                  [interaction_parameter]*temperatures_number,
+                                  [external_magnetic_field]*temperatures_number,
+                                  seeds,
+                                  [algorithm]*temperatures_number,
+                                  [random_stream]*temperatures_number))
+            configurations = [result[0] for result in results]
+            energies = [result[2] for result in results]
+            for trace, result in zip(mag, results):
+                trace.extend(result[1])
+            done += steps
+
+            if done == monte_carlo_steps:
+                break
+            for i in range(swap_round%2, temperatures_number - 1, 2):
+                attempts[i] += 1
+                delta = (betas[i] - betas[i+1])*(energies[i] - energies[i+1])
+                if delta >= 0 or swap_generator.random() < exp(delta):
+                    accepted[i] += 1
+                    configurations[i], configurations[i+1] = configurations[i+1], configurations[i]
+                    energies[i], energies[i+1] = energies[i+1], energies[i]
+            swap_round += 1
+    finally:
+        if executor:
+            executor.shutdown()
+
+    rates = [accepted[i]/attempts[i] if attempts[i] else 0.0 for i in range(0, temperatures_number - 1)]
+    return configurations, mag, rates
@@ -0,0 +1,113 @@
+"""Differential rendering of configurations of spins in a terminal by ANSI escape sequences."""
+import atexit
+import os
+from platform import system as pl_sys
+import shutil
+import sys
+import threading
+import time
+
+import numpy as np
+
+FRAME_RATE = 30.0       # frames per second at most
+
+
+class Renderer:
+    """
+    A print function of the visualization, drawing configurations of spins in the terminal.
+
+    A call takes a snapshot of the configuration at most frame_rate times per second and hands it
+    to a background thread, so the simulation never waits for the terminal: a newer snapshot replaces
+    the one not drawn yet. The thread redraws only the changed cells of every row, moving the cursor to them.
+    A lattice larger than the terminal is shown in blocks of bxb spins, every block by the marker of its majority.
+    The last given configuration is drawn by the method close, called at exit.
+    """
+
+    def __init__(self, lattice_length: int, frame_rate: float = FRAME_RATE, stream=None) -> None:
+        columns, lines = shutil.get_terminal_size()
+        self.lattice_length = lattice_length
+        self.block = max(1, -(-lattice_length//max(1, min(columns, lines - 1))))   # spins per side of a shown cell
+        self.size = -(-lattice_length//self.block)                                  # shown rows and columns
+        self.frame_budget = 1/frame_rate                    # seconds between frames
+        self.stream = stream if stream is not None else sys.stdout
+
+        self.shown = None               # markers of the shown frame
+        self.latest = None              # the last given configuration, drawn at exit
+        self.pending = None             # a snapshot waiting for the thread
+        self.mcs = 0                    # number of calls, the MCS of the configuration
+        self.next_time = 0.0            # time of the next snapshot
+        self.closed = False
+        self.condition = threading.Condition()
+
+        if pl_sys() == 'Windows':
+            os.system('')               # enables escape sequences in the console
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def __call__(self, configuration_spins: list[list[int]], marker_up: str, marker_down: str) -> None:
+        """Hands a snapshot of the configuration to the thread, if the frame is due."""
+        self.latest = (configuration_spins, marker_up, marker_down, self.mcs)
+        self.mcs += 1
+        now = time.monotonic()
+        if now < self.next_time:
+            return
+        self.next_time = now + self.frame_budget
+
+        snapshot = (np.array(configuration_spins, dtype=np.int8), marker_up, marker_down, self.mcs - 1)
+        with self.condition:
+            self.pending = snapshot
+            self.condition.notify()
+
+    def close(self) -> None:
+        """Draws the last given configuration, stops the thread and restores the cursor."""
+        if self.closed:
+            return
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+        self.thread.join()
+
+        if self.latest is not None:
+            configuration_spins, marker_up, marker_down, mcs = self.latest
+            self._draw(np.array(configuration_spins, dtype=np.int8), marker_up, marker_down, mcs)
+            self.stream.write(''.join(['\x1b[', str(self.size + 2), ';1H\x1b[?25h']))
+            self.stream.flush()
+
+    def _run(self) -> None:
+        """Draws the snapshots in the background until the renderer is closed."""
+        while True:
+            with self.condition:
+                while self.pending is None and not self.closed:
+                    self.condition.wait()
+                if self.pending is None:
+                    return
+                snapshot, self.pending = self.pending, None
+            self._draw(*snapshot)
+
+    def _draw(self, lattice: np.ndarray, marker_up: str, marker_down: str, mcs: int) -> None:
+        """Writes the cells differing from the shown frame and the MCS below the lattice."""
+        if self.block > 1:
+            padded = np.zeros((self.size*self.block, self.size*self.block), dtype=np.int32)
+            padded[:self.lattice_length, :self.lattice_length] = lattice
+            lattice = padded.reshape(self.size, self.block, self.size, self.block).sum(axis=(1, 3))
+        markers = np.array([marker_down, marker_up])[(lattice >= 0).astype(np.intp)]
+
+        output = []
+        if self.shown is None or self.shown.dtype != markers.dtype:
+            output.append('\x1b[?25l\x1b[2J')                   # hides the cursor and clears the screen
+            rows = range(0, self.size)
+            changed = np.ones(markers.shape, dtype=bool)
+        else:
+            changed = markers != self.shown
+            rows = np.flatnonzero(changed.any(axis=1))
+
+        for row in rows:
+            columns = np.flatnonzero(changed[row])
+            first, last = columns[0], columns[-1]
+            output.append(''.join(['\x1b[', str(row + 1), ';', str(first + 1), 'H', *markers[row, first:last + 1]]))
+        output.append(''.join(['\x1b[', str(self.size + 1), ';1HMCS ', str(mcs), '\x1b[K']))
+
+        self.stream.write(''.join(output))
+        self.stream.flush()
+        self.shown = markers
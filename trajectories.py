@@ -0,0 +1,233 @@
+"""Event-sourced logs of trajectories of the 2D Ising model: keyframes and flipped sites, with their replay."""
+from bisect import bisect_right
+import json
+import os
+
+import numpy as np
+
+import storage
+
+TRAJECTORY_MAGIC = b'ISINGTRJ'          # first bytes of a log of a trajectory
+INDEX_MAGIC = b'ISINGIDX'               # last bytes of a closed log, after the index of keyframes
+KEYFRAME = b'K'                         # kind of a record with the whole configuration
+FLIPS = b'F'                            # kind of a record with the flipped sites
+
+
+def recorder(file_path: str,
+             configuration: list[list[int]],
+             keyframe_interval: int,
+             header: dict[str, object],
+             resume_at: int | None = None
+            ) -> dict[str, object]:
+    """
+    Returns a recorder of a trajectory to pass to the core functions, writing the log to the file.
+
+    The log starts with the magic bytes TRAJECTORY_MAGIC, the length of the header (4 bytes, little endian)
+    and the header as JSON. Records follow, every one starting with its kind and the MCS (4 bytes):
+    a keyframe (KEYFRAME) holds the configuration packed as in storage.save_configuration_packed,
+    a record of flips (FLIPS) holds the number of flips (4 bytes) and the flipped sites row*L + column.
+    The function close appends the index of keyframes, so the replay seeks without reading the records.
+
+    ### Parameters
+    file_path
+    str
+        A file of the log.
+    configuration
+    list[list[int]]
+        The initial configuration, the keyframe of MCS 0.
+    keyframe_interval
+    int
+        Number of MCSs between keyframes.
+    header
+    dict[str, object]
+        Parameters of the simulation, saved in the header.
+    resume_at
+    int | None
+        Size of the log saved by a checkpoint (see checkpoints.save), the log is truncated to it and continued.
+
+    ### Returns
+    dict[str, object]
+        The recorder.
+    """
+    lattice_length = len(configuration)
+    dtype = '<u2' if lattice_length*lattice_length <= 1 << 16 else '<u4'
+
+    if resume_at is None:
+        file = open(file_path, 'wb')
+        header_bytes = json.dumps(dict(header, L=lattice_length, keyframe_interval=keyframe_interval,
+                                       index_dtype=dtype)).encode('UTF-8')
+        file.write(TRAJECTORY_MAGIC + len(header_bytes).to_bytes(4, 'little') + header_bytes)
+        trajectory = {'file_path': file_path, 'file': file, 'L': lattice_length,
+                      'keyframe_interval': keyframe_interval, 'dtype': np.dtype(dtype), 'keyframes': [], 'last_mcs': 0}
+        _write_keyframe(trajectory, 0, configuration)
+        return trajectory
+
+    file = open(file_path, 'r+b')
+    file.truncate(resume_at)
+    log = _read_header(file)
+    keyframes, last_mcs = _scan(file, log, resume_at)
+    file.seek(resume_at)
+    return {'file_path': file_path, 'file': file, 'L': lattice_length,
+            'keyframe_interval': log['header']['keyframe_interval'], 'dtype': log['dtype'], 'keyframes': keyframes,
+            'last_mcs': last_mcs}
+
+
+def record(trajectory: dict[str, object], mcs: int, configuration: list[list[int]], flips: list[int]) -> None:
+    """
+    Records the configuration after the MCS: a keyframe every keyframe_interval MCSs, otherwise the flipped sites
+    in the order of flips (a site flipped twice is listed twice).
+    """
+    if mcs % trajectory['keyframe_interval'] == 0:
+        _write_keyframe(trajectory, mcs, configuration)
+        return
+
+    file = trajectory['file']
+    trajectory['last_mcs'] = mcs
+    file.write(FLIPS + mcs.to_bytes(4, 'little') + len(flips).to_bytes(4, 'little'))
+    file.write(np.asarray(flips, dtype=trajectory['dtype']).tobytes())
+
+
+def flush(trajectory: dict[str, object]) -> int:
+    """Writes the recorded MCSs to the disk and returns the size of the log."""
+    file = trajectory['file']
+    file.flush()
+    os.fsync(file.fileno())
+    return file.tell()
+
+
+def close(trajectory: dict[str, object]) -> None:
+    """Appends the index of keyframes (pairs MCS, offset; the last MCS; their number) and closes the log."""
+    file = trajectory['file']
+    last_mcs = trajectory['last_mcs']
+    index = np.array(trajectory['keyframes'], dtype='<u8').reshape(-1, 2)
+    file.write(index.tobytes() + last_mcs.to_bytes(8, 'little') + len(index).to_bytes(8, 'little') + INDEX_MAGIC)
+    file.close()
+
+
+def open_log(file_path: str) -> dict[str, object]:
+    """
+    Returns a log of a trajectory opened for the replay: its header, the keyframes and the last recorded MCS.
+
+    A log not closed by the recorder (an interrupted run) is indexed by reading all its records,
+    an incomplete last record is ignored.
+    """
+    file = open(file_path, 'rb')
+    log = _read_header(file)
+    size = file.seek(0, os.SEEK_END)
+
+    tail = b''
+    if size - log['start'] >= 24:
+        file.seek(size - 24)
+        tail = file.read(24)
+    if tail[16:] == INDEX_MAGIC:
+        count = int.from_bytes(tail[8:16], 'little')
+        log['end'] = size - 24 - 16*count
+        file.seek(log['end'])
+        log['keyframes'] = np.frombuffer(file.read(16*count), dtype='<u8').reshape(-1, 2).tolist()
+        log['last_mcs'] = int.from_bytes(tail[:8], 'little')
+    else:
+        log['end'] = size
+        log['keyframes'], log['last_mcs'] = _scan(file, log, size)
+    return log
+
+
+def frames(log: dict[str, object], mcss: list[int]):
+    """
+    Yields pairs (MCS, configuration as an (L, L) array of int8) of the given MCSs in the ascending order,
+    MCSs after the last recorded one are skipped. Every configuration is rebuilt from the keyframe
+    at or before its MCS by applying the flips recorded after the keyframe.
+    """
+    file = log['file']
+    lattice_length = log['L']
+    keyframe_mcss = [mcs for mcs, offset in log['keyframes']]
+
+    spins = None
+    mcs = -1                            # MCS of the current state
+    for target in mcss:
+        if target > log['last_mcs']:
+            return
+        keyframe_mcs, offset = log['keyframes'][bisect_right(keyframe_mcss, target) - 1]
+        if spins is None or target < mcs or keyframe_mcs > mcs:
+            file.seek(offset)           # the keyframe is nearer than the current state
+            mcs = -1
+
+        while mcs < target:
+            kind, mcs, payload = _read_record(log)
+            if kind == KEYFRAME:
+                spins = storage.unpack_rows(payload, lattice_length).reshape(-1)
+            else:
+                flipped = np.bincount(payload, minlength=spins.size) & 1
+                spins[flipped.astype(bool)] *= -1
+        yield mcs, spins.reshape(lattice_length, lattice_length).copy()
+
+
+def configuration_at(log: dict[str, object], mcs: int) -> np.ndarray:
+    """Returns the configuration after the MCS as an (L, L) array of int8."""
+    for mcs, configuration in frames(log, [mcs]):
+        return configuration
+    raise ValueError('the MCS was not recorded')
+
+
+def _write_keyframe(trajectory: dict[str, object], mcs: int, configuration: list[list[int]]) -> None:
+    """Writes a keyframe of the configuration and adds it to the index."""
+    file = trajectory['file']
+    trajectory['keyframes'].append((mcs, file.tell()))
+    lattice = np.asarray(configuration, dtype=np.int8)
+    file.write(KEYFRAME + mcs.to_bytes(4, 'little') + np.packbits(lattice > 0, axis=1).tobytes())
+    trajectory['last_mcs'] = mcs
+
+
+def _read_header(file) -> dict[str, object]:
+    """Reads the header of a log from the beginning of the file."""
+    file.seek(0)
+    if file.read(len(TRAJECTORY_MAGIC)) != TRAJECTORY_MAGIC:
+        raise ValueError('the file is not a log of a trajectory')
+    header_length = int.from_bytes(file.read(4), 'little')
+    header = json.loads(file.read(header_length).decode('UTF-8'))
+    return {'file': file,
+            'header': header,
+            'L': header['L'],
+            'dtype': np.dtype(header['index_dtype']),
+            'start': len(TRAJECTORY_MAGIC) + 4 + header_length}
+
+
+def _read_record(log: dict[str, object]) -> tuple[bytes, int, np.ndarray] | None:
+    """Reads the record at the current position: its kind, MCS and content, or None at an incomplete record."""
+    file = log['file']
+    head = file.read(5)
+    if len(head) < 5:
+        return None
+    kind, mcs = head[:1], int.from_bytes(head[1:], 'little')
+
+    if kind == KEYFRAME:
+        size = log['L']*((log['L'] + 7)//8)
+        content = file.read(size)
+        if len(content) < size:
+            return None
+        return kind, mcs, np.frombuffer(content, dtype=np.uint8).reshape(log['L'], -1)
+
+    count = file.read(4)
+    if len(count) < 4:
+        return None
+    size = int.from_bytes(count, 'little')*log['dtype'].itemsize
+    content = file.read(size)
+    if len(content) < size:
+        return None
+    return kind, mcs, np.frombuffer(content, dtype=log['dtype'])
+
+
+def _scan(file, log: dict[str, object], end: int) -> tuple[list[tuple[int, int]], int]:
+    """Returns the keyframes (pairs MCS, offset) and the last MCS of the complete records before the offset end."""
+    keyframes = []
+    last_mcs = 0
+    file.seek(log['start'])
+    while file.tell() < end:
+        offset = file.tell()
+        result = _read_record(log)
+        if result is None or file.tell() > end:
+            break
+        kind, last_mcs, content = result
+        if kind == KEYFRAME:
+            keyframes.append((last_mcs, offset))
+    log['end'] = end
+    return keyframes, last_mcs
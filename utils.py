@@ -1,63 +1,77 @@
 """Common functions used in core modules"""
-import os
-
-from platform import system as pl_sys
 from types import FunctionType
 
+import analysis
+import checkpoints
+import movies
+import observables
+import reweighting
+import terminal
+import trajectories
+
+
+def acceptance_table(acceptance: FunctionType,
+                     interaction_parameter: float,
+                     external_magnetic_field: float,
+                     beta: float,
+                     coordination: int = 4
+                    ) -> list[list[float]]:
+    """
+    Returns probabilities of flipping a spin, computed once for every possible change of energy
+    of a lattice of the given number of nearest neighbours (see lattice.geometry).
+
+    The table is read as table[spin][neighbours_sum]. Negative indices wrap around the lists,
+    so the spin -1 and negative sums of the nearest neighbours need no shifting.
+    """
+    table = [[0.0]*(2*coordination + 1) for spin in range(3)]
+    for spin in (1, -1):
+        for neighbours_sum in range(-coordination, coordination + 1):
+            delta = 2*interaction_parameter*spin*neighbours_sum + 2*external_magnetic_field*spin
+            table[spin][neighbours_sum] = acceptance(delta, beta)
+
+    return table
+
+
+def record_mcs(mcs: int,
+               configuration: list[list[int]],
+               nodes_number: int,
+               total_spin: int,
+               bonds: int,
+               interaction_parameter: float,
+               external_magnetic_field: float,
+               generator: object,
+               mag: list[float],
+               flips: list[int] | None,
+               accumulator: dict[str, float] | None,
+               checkpoint: dict[str, object] | None,
+               trajectory: dict[str, object] | None,
+               movie: dict[str, object] | None,
+               monitor: dict[str, object] | None,
+               histogram: dict[str, object] | None
+              ) -> bool:
+    """
+    Records the system after the MCS of a core loop: appends its magnetization to mag and passes the state
+    to every given recorder (see the parameters of core_metropolis.mc_raw), in the order accumulator, histogram,
+    trajectory, movie and checkpoint. Returns whether the monitor stops the run at its effective samples.
+    """
+    m = 1/nodes_number*total_spin                       # magnetization after the MCS
+    mag.append(m)
+    if accumulator is not None:
+        observables.add(accumulator, m, (-interaction_parameter*bonds - external_magnetic_field*total_spin)/nodes_number)
+    if histogram is not None:
+        reweighting.add(histogram, bonds, total_spin)
+    if trajectory is not None:
+        trajectories.record(trajectory, mcs, configuration, flips)
+    if movie is not None:
+        movies.capture(movie, mcs, configuration)
+    if checkpoint is not None and checkpoints.due(checkpoint, mcs):
+        checkpoints.save(checkpoint, mcs, configuration, generator, accumulator, mag, trajectory)
+    return monitor is not None and analysis.observe(monitor, m, (-interaction_parameter*bonds - external_magnetic_field*total_spin)/nodes_number)
+
 
-def magnetization(number_nodes: int, lattice: list[list[int]]) -> float:
-    """Returns magnetization of a system."""
-    return 1/number_nodes*sum([sum(row) for row in lattice])
-
-
-def chose_print_function(lattice_length: int) -> FunctionType:
-    """Returns an essential function for displaying the visualization."""
-    match pl_sys():
-        case 'Windows':
-            os.system(''.join(['MODE ', str(lattice_length), ',', str(lattice_length)]))  # resizing the window
-            return print_configuration_powershell
-        case 'Linux':
-            os.system(''.join(['resize -s ', str(lattice_length), ' ', str(lattice_length)]))  # resizing the window
-            return print_configuration_bash
-
-    return print_configuration_empty
-
-
-def print_configuration_powershell(configuration_spins: list[list[int]],
-                                   marker_up: str,
-                                   marker_down: str
-                                  ) -> None:
-    """Prints given configuration of spins."""
-    configuration = ""
-    for row in configuration_spins:
-        for spin in row:
-            configuration = "".join([configuration, str(spin)])
-        configuration = "".join([configuration, '\n'])
-    configuration = configuration.replace('-1', marker_down)
-    configuration = configuration.replace('1', marker_up)
-    os.system('cls')
-    print(configuration)
-
-
-def print_configuration_bash(configuration_spins: list[list[int]],
-                             marker_up: str,
-                             marker_down: str
-                            ) -> None:
-    """Prints given configuration of spins."""
-    configuration = ""
-    for row in configuration_spins:
-        for spin in row:
-            configuration = "".join([configuration, str(spin)])
-        configuration = "".join([configuration, '\n'])
-    configuration = configuration.replace('-1', marker_down)
-    configuration = configuration.replace('1', marker_up)
-    os.system('clear')
-    print(configuration)
-
-
-def print_configuration_empty(configuration_spins: list[list[int]],
-                              marker_up: str,
-                              marker_down: str
-                             ) -> None:
-    """An empty function."""
-    return None
+def chose_print_function(lattice_length: int) -> terminal.Renderer:
+    """
+    Returns an essential function for displaying the visualization, a differential renderer of the terminal
+    (see terminal.Renderer) drawing only changed cells without blocking the simulation.
+    """
+    return terminal.Renderer(lattice_length)